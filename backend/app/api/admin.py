@@ -0,0 +1,122 @@
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import FileResponse, PlainTextResponse
+import asyncio
+import os
+from app.api.auth import require_admin
+from app.api.chat import reload_indexes, upsert_article, delete_article, get_vector_store
+from app.models.types import ArticleRequest
+from app.rag.profiler import SamplingProfiler, list_profiles, profile_path
+
+# Longest capture /profile accepts, and the one capture allowed at a time
+MAX_PROFILE_SECONDS = 120
+_profile_lock = asyncio.Lock()
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.post("/reload-index")
+async def reload_index_endpoint(force: bool = False):
+    """
+    Switch to the index versions the CURRENT pointers name.
+
+    The new index is loaded and validated in a worker thread while the current
+    one keeps serving; the old index is released once its in-flight requests finish.
+    With several workers this only reloads the worker that handles the request;
+    the others follow the CURRENT pointers through their index watcher.
+    """
+    results = await asyncio.to_thread(reload_indexes, force)
+    return {"results": results, "worker_pid": os.getpid()}
+
+def require_writable_index():
+    """Articles are written into the Chroma collections; compact, artifact and remote indexes are rebuilt offline."""
+    if not get_vector_store().serves_chroma:
+        raise HTTPException(
+            status_code=409,
+            detail="Články sa dajú meniť len pri indexe v Chroma (MITO_INDEX_MODE=chroma), inak cez setup_rag.py"
+        )
+
+@router.post("/articles")
+async def upsert_article_endpoint(article: ArticleRequest):
+    """
+    Index an article in every configured variant, replacing a previous version
+    of it (same URL), and store it in the articles directory.
+
+    Only indexes served from Chroma (MITO_INDEX_MODE=chroma) are updated; the
+    other index modes answer 409. The chunks are searchable in this worker when
+    the call returns, with no rebuild or restart. Indexes derived from the
+    collections in this worker (article, keyword and sentence indexes) are
+    updated and precomputed answers are discarded until they are regenerated.
+    Run a single worker to publish articles this way: other workers keep their
+    already opened indexes, and nothing tells them to reopen them.
+    """
+    from app.rag.data_processor import MIN_CONTENT_CHARS, get_article_id
+    article_data = article.model_dump()
+    if len(article.content.strip()) < MIN_CONTENT_CHARS:
+        raise HTTPException(status_code=400, detail=f"Obsah článku musí mať aspoň {MIN_CONTENT_CHARS} znakov")
+    if not get_article_id(article_data):
+        raise HTTPException(status_code=400, detail="Z URL článku sa nedá určiť jeho identifikátor")
+    if article_data["word_count"] is None:
+        article_data["word_count"] = len(article.content.split())
+    await asyncio.to_thread(require_writable_index)
+    result = await asyncio.to_thread(upsert_article, article_data)
+    return {**result, "worker_pid": os.getpid()}
+
+@router.delete("/articles/{article_id}")
+async def delete_article_endpoint(article_id: str):
+    """
+    Remove an article (by the last path segment of its URL) from every variant
+    and the articles directory; same index modes and worker caveat as POST /articles.
+    """
+    await asyncio.to_thread(require_writable_index)
+    result = await asyncio.to_thread(delete_article, article_id)
+    results = result["results"]
+    if all(entry["updated"] and not entry["chunks_removed"] for entry in results) and result["article_file"] is None:
+        raise HTTPException(status_code=404, detail="Článok neexistuje")
+    return {**result, "worker_pid": os.getpid()}
+
+@router.post("/profile")
+async def profile_endpoint(seconds: float = 10.0, interval_ms: float = 5.0, include_idle: bool = False):
+    """
+    Sample this worker's Python stacks for ``seconds`` and return them as
+    collapsed stacks (flamegraph.pl / speedscope input).
+
+    The profile is also saved under MITO_PROFILE_DIR. The sampler thread only
+    exists during the capture. With several workers this profiles the worker
+    that handles the request.
+    """
+    if not 0 < seconds <= MAX_PROFILE_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds musí byť medzi 0 a {MAX_PROFILE_SECONDS}")
+    if not 1 <= interval_ms <= 1000:
+        raise HTTPException(status_code=400, detail="interval_ms musí byť medzi 1 a 1000")
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="Profilovanie už prebieha")
+    
+    async with _profile_lock:
+        profiler = SamplingProfiler(interval=interval_ms / 1000, include_idle=include_idle).start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.stop()
+    
+    name = profiler.save("process")
+    print(f"🔥 Captured {profiler.samples} samples over {profiler.duration:.1f}s into {name}")
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}"',
+            "X-Profile-Samples": str(profiler.samples),
+            "X-Worker-Pid": str(os.getpid())
+        }
+    )
+
+@router.get("/profiles")
+async def list_profiles_endpoint():
+    """Saved profiles of this host, newest first."""
+    return {"profiles": list_profiles()}
+
+@router.get("/profiles/{name}")
+async def get_profile_endpoint(name: str):
+    """Download a saved profile (collapsed stacks)."""
+    path = profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profil neexistuje")
+    return FileResponse(path, media_type="text/plain", filename=name)
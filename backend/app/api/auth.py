@@ -0,0 +1,16 @@
+from fastapi import HTTPException, Header
+from typing import Optional
+import hmac
+import os
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """Whether ``token`` matches ADMIN_API_TOKEN (never true while the admin API is disabled)."""
+    expected = os.getenv("ADMIN_API_TOKEN")
+    return bool(expected and token and hmac.compare_digest(token, expected))
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Allow the request only with the X-Admin-Token header matching ADMIN_API_TOKEN."""
+    if not os.getenv("ADMIN_API_TOKEN"):
+        raise HTTPException(status_code=403, detail="Admin API nie je povolené")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=401, detail="Neplatný admin token")
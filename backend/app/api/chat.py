@@ -1,56 +1,280 @@
-from fastapi import APIRouter, HTTPException, Depends
-from app.models.types import ChatRequest, ChatResponse, HealthResponse, ComparisonResponse, VariantResponse, RAGVariant
+from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.models.types import (
+    ChatRequest, ChatResponse, HealthResponse, ComparisonResponse, VariantResponse,
+    RetrieveRequest, RetrievalResponse, VariantRetrieval, RetrievalOverlap
+)
 from app.rag.vector_store import MitoVectorStore
 from app.rag.chain import MitoRAGChain
+from app.rag.variant_registry import VariantRegistry
 from app.rag.rag_factory import RAGServiceFactory
+from app.rag.hedging import hedged_completion
+from app.rag.profiler import SamplingProfiler
+from app.rag.circuit_breaker import CircuitOpenError, embedding_breaker, breaker_status
+from app.rag.remote_index import RemoteIndexError
+from app.rag.precomputed_answers import discard_answers, precomputed_root
+from app.rag.article_updates import articles_dir, article_file_path, write_article_file, remove_article_file, chunk_article
+from app.api.auth import is_admin_token
+from app.api.compact import FastJSONResponse, compact_chat_payload, compact_comparison_payload
 import os
 import time
 import uuid
 import asyncio
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from functools import lru_cache
+from itertools import combinations
+from collections import OrderedDict
+from typing import List, Optional, Union
 
 router = APIRouter()
 
-# Global variables for RAG system (initialized once)
-vector_store = None
-rag_chain = None
-rag_chains = {}  # Cache for different variants
-
-@lru_cache()
-def get_vector_store():
-    """Get or create vector store instance (backward compatibility)."""
-    global vector_store
-    if vector_store is None:
-        vector_store = MitoVectorStore(persist_directory="./chroma_db", variant="fixed")
-    return vector_store
-
-@lru_cache()
-def get_rag_chain():
-    """Get or create RAG chain instance (backward compatibility)."""
-    global rag_chain
-    if rag_chain is None:
-        vs = get_vector_store()
-        rag_chain = MitoRAGChain(vs, RAGVariant.FIXED_SIZE)
-    return rag_chain
+# Configured variants (see app/rag/variants.py), each with a hot-swappable chain
+# loaded on first use and evicted when idle under MITO_VARIANT_MEMORY_BUDGET_MB.
+# /api/chat serves the default variant and shares its chain with /api/chat/compare.
+variant_registry = VariantRegistry.from_env()
+
+def get_vector_store() -> MitoVectorStore:
+    """Get the vector store /api/chat serves from (backward compatibility)."""
+    return get_rag_chain().vector_store
 
-def get_rag_chain_for_variant(variant: RAGVariant) -> MitoRAGChain:
+def get_rag_chain() -> MitoRAGChain:
+    """Get the RAG chain /api/chat serves from (backward compatibility)."""
+    return get_rag_chain_for_variant(variant_registry.default_variant)
+
+def get_rag_chain_for_variant(variant: str) -> MitoRAGChain:
     """Get or create RAG chain for specific variant."""
-    global rag_chains
+    return variant_registry.get(getattr(variant, "value", variant))
+
+def preload_rag_chains():
+    """Open the variants' indexes up front so the first request doesn't pay for loading them."""
+    variant_registry.preload()
+
+def reload_indexes(force: bool = False) -> list:
+    """Swap every loaded variant whose CURRENT index version changed (blocking)."""
+    results = []
+    for variant, manager in variant_registry.managers().items():
+        try:
+            results.append(manager.swap(force=force))
+        except Exception as e:
+            print(f"Error reloading {variant} index: {e}")
+            results.append({"variant": variant, "swapped": False, "error": str(e)})
+    return results
+
+# One article update at a time; each one writes every variant's collection
+_article_lock = threading.Lock()
+
+@contextmanager
+def _variant_for_update(variant: str):
+    """(vector store, chain or None) of a variant to write an article into.
     
-    if variant not in rag_chains:
-        rag_chains[variant] = RAGServiceFactory.create_rag_chain(variant)
+    A loaded variant is updated in place and its searches see the change at once;
+    one that is not loaded is opened just for the update, the way it would be
+    served, so a variant served from a read-only index is refused either way.
+    """
+    if variant_registry.manager(variant).loaded:
+        with variant_registry.lease(variant) as chain:
+            yield chain.vector_store, chain
+        return
+    vector_store = RAGServiceFactory.create_vector_store(variant)
+    try:
+        yield vector_store, None
+    finally:
+        vector_store.close()
+
+def _invalidate_answers(variant: str, vector_store: MitoVectorStore, chain: Optional[MitoRAGChain]) -> bool:
+    """Stop serving precomputed answers generated before the variant's articles changed."""
+    if chain is not None and chain.precomputed is not None:
+        return chain.precomputed.invalidate()
+    return discard_answers(precomputed_root(), variant, vector_store.index_version)
+
+def upsert_article(article: dict) -> dict:
+    """Index one article in every configured variant, replacing its previous version (blocking).
     
-    return rag_chains[variant]
+    Each variant chunks it with its own chunker; the article file is written to the
+    articles directory once a variant was updated, so the next rebuild keeps it.
+    """
+    from app.rag.data_processor import get_article_id
+    article_id = get_article_id(article)
+    with _article_lock:
+        path = article_file_path(articles_dir(), article_id)
+        article = {**article, 'source_file': os.path.basename(path)}
+        results = []
+        for variant in variant_registry.names():
+            try:
+                with _variant_for_update(variant) as (vector_store, chain):
+                    documents, vectors, text, sentences = chunk_article(
+                        variant_registry.configs[variant], article,
+                        with_sentences=vector_store.sentence_index() is not None
+                    )
+                    result = vector_store.upsert_article(article_id, documents, vectors, text, sentences)
+                    result["precomputed_answers_discarded"] = _invalidate_answers(variant, vector_store, chain)
+                    results.append({"variant": variant, "updated": True, **result})
+            except Exception as e:
+                print(f"Error upserting article '{article_id}' into {variant}: {e}")
+                results.append({"variant": variant, "updated": False, "error": str(e)})
+        if any(result["updated"] for result in results):
+            write_article_file(path, article)
+        return {"article_id": article_id, "article_file": path, "results": results}
+
+def delete_article(article_id: str) -> dict:
+    """Remove one article from every configured variant and from the articles directory (blocking)."""
+    with _article_lock:
+        results = []
+        for variant in variant_registry.names():
+            try:
+                with _variant_for_update(variant) as (vector_store, chain):
+                    removed = vector_store.delete_article(article_id)
+                    discarded = _invalidate_answers(variant, vector_store, chain) if removed else False
+                    results.append({"variant": variant, "updated": True, "chunks_removed": removed,
+                                    "precomputed_answers_discarded": discarded})
+            except Exception as e:
+                print(f"Error deleting article '{article_id}' from {variant}: {e}")
+                results.append({"variant": variant, "updated": False, "error": str(e)})
+        path = remove_article_file(articles_dir(), article_id) if any(result["updated"] for result in results) else None
+        return {"article_id": article_id, "article_file": path, "results": results}
+
+async def watch_index_versions(interval: float):
+    """Poll the CURRENT pointers and swap indexes when a rebuild has been published."""
+    while True:
+        await asyncio.sleep(interval)
+        # has_update may ask a remote index server, so it stays off the event loop
+        if await asyncio.to_thread(lambda: any(manager.has_update() for manager in variant_registry.managers().values())):
+            await asyncio.to_thread(reload_indexes)
+
+async def evict_idle_variants(interval: float):
+    """Periodically evict idle variants while the loaded indexes exceed the memory budget."""
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(variant_registry.enforce_budget)
+
+# Recent query embeddings, so repeating a diagnostics query skips the embedding call
+QUERY_EMBEDDING_CACHE_SIZE = 256
+_query_embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+
+async def embed_query_cached(message: str) -> List[float]:
+    """Embed a query once for all variants (they share the embedding model)."""
+    key = message.strip()
+    if key in _query_embeddings:
+        _query_embeddings.move_to_end(key)
+        return _query_embeddings[key]
+    embeddings = get_vector_store().embeddings
+    embedding = await embedding_breaker.call(asyncio.to_thread, embeddings.embed_query, key)
+    _query_embeddings[key] = embedding
+    if len(_query_embeddings) > QUERY_EMBEDDING_CACHE_SIZE:
+        _query_embeddings.popitem(last=False)
+    return embedding
+
+def retrieval_overlap(first: VariantRetrieval, second: VariantRetrieval) -> RetrievalOverlap:
+    """Compare which articles two variants retrieved (their chunks differ, so articles are compared)."""
+    first_articles = {chunk.metadata.get('url', '') for chunk in first.chunks if chunk.metadata}
+    second_articles = {chunk.metadata.get('url', '') for chunk in second.chunks if chunk.metadata}
+    union = first_articles | second_articles
+    return RetrievalOverlap(
+        variants=[first.variant, second.variant],
+        shared_articles=sorted(first_articles & second_articles),
+        article_jaccard=len(first_articles & second_articles) / len(union) if union else 0.0,
+        shared_top_sources=len({source.url for source in first.sources} & {source.url for source in second.sources}),
+        top_article_match=bool(first.sources and second.sources and first.sources[0].url == second.sources[0].url)
+    )
+
+async def retrieve_variants(message: str, variants: List[str], k: int = 6) -> RetrievalResponse:
+    """Retrieve for each variant from one shared query embedding, without calling the LLM."""
+    start_time = time.perf_counter()
+    # In lexical retrieval mode the variants search without an embedding
+    query_embedding = await embed_query_cached(message) if get_vector_store().uses_embeddings else None
+    embedding_time = time.perf_counter() - start_time
+    
+    async def retrieve_variant(variant: str) -> VariantRetrieval:
+        variant_start = time.perf_counter()
+        with variant_registry.lease(variant) as chain:
+            chunks, sources = await chain.aretrieve(message, k=k, query_embedding=query_embedding)
+            index_version = chain.vector_store.index_version
+        return VariantRetrieval(
+            variant=variant,
+            variant_name=variant_registry.display_name(variant),
+            chunks=chunks,
+            sources=sources,
+            retrieval_time_ms=(time.perf_counter() - variant_start) * 1000,
+            index_version=index_version
+        )
+    
+    # Local indexes are searched inline one after another; remote searches of
+    # all variants go to the index server together as one batched request
+    results = await asyncio.gather(*[retrieve_variant(variant) for variant in variants])
+    
+    return RetrievalResponse(
+        query=message,
+        results=list(results),
+        overlap=[retrieval_overlap(first, second) for first, second in combinations(results, 2)],
+        embedding_time_ms=embedding_time * 1000,
+        total_time_ms=(time.perf_counter() - start_time) * 1000,
+        timestamp=datetime.now()
+    )
+
+@router.post("/retrieve", response_model=RetrievalResponse)
+async def retrieve_endpoint(request: RetrieveRequest):
+    """
+    Retrieval diagnostics: scored chunks and sources per variant, plus overlap
+    statistics between variants. One query embedding, no LLM call.
+    """
+    try:
+        if not request.message or len(request.message.strip()) < 2:
+            raise HTTPException(
+                status_code=400,
+                detail="Otázka musí obsahovať aspoň 2 znaky"
+            )
+        if not 1 <= request.k <= 50:
+            raise HTTPException(status_code=400, detail="k musí byť medzi 1 a 50")
+        unknown = [variant for variant in request.variants or [] if variant not in variant_registry.configs]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Neznámy variant: {', '.join(unknown)}")
+        
+        return await retrieve_variants(request.message, request.variants or variant_registry.compare_variants(), request.k)
+        
+    except HTTPException:
+        raise
+    except (CircuitOpenError, RemoteIndexError):
+        raise HTTPException(status_code=503, detail="Služba na vyhľadávanie je dočasne nedostupná, skúste to o chvíľu")
+    except Exception as e:
+        print(f"Error in retrieve endpoint: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Nastala chyba pri vyhľadávaní: {str(e)}"
+        )
+
+def profiled_response(profiler: SamplingProfiler, response: ChatResponse, compact: bool) -> JSONResponse:
+    """Render the response while still sampling (encoding is part of the call), then save the profile."""
+    if compact:
+        rendered = FastJSONResponse(compact_chat_payload(response))
+    else:
+        rendered = JSONResponse(response.model_dump(mode="json"))
+    profiler.stop()
+    name = profiler.save("chat")
+    print(f"🔥 Profiled /api/chat: {profiler.samples} samples over {profiler.duration * 1000:.0f} ms into {name}")
+    rendered.headers["X-Profile"] = name
+    rendered.headers["X-Profile-Samples"] = str(profiler.samples)
+    return rendered
 
 @router.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest):
+async def chat_endpoint(request: ChatRequest, x_admin_token: Optional[str] = Header(None)):
     """
     Chat endpoint pre MITO - slovenský zdravotný asistent.
     
     Prijíma otázky v slovenčine a odpoveda na základe databázy článkov
     o zdraví, epigenetike a kvantovej biológii.
+    
+    With ``profile`` (admin token required) the call is sampled and the saved
+    profile's name is returned in the X-Profile header
+    (GET /api/admin/profiles/{name}).
     """
+    # Without the flag no profiler exists, so normal requests pay nothing
+    profiler = None
+    if request.profile:
+        if not is_admin_token(x_admin_token):
+            raise HTTPException(status_code=403, detail="Profilovanie vyžaduje admin token")
+        profiler = SamplingProfiler().start()
+    
     try:
         if not request.message or len(request.message.strip()) < 2:
             raise HTTPException(
@@ -58,15 +282,19 @@ async def chat_endpoint(request: ChatRequest):
                 detail="Otázka musí obsahovať aspoň 2 znaky"
             )
         
-        # Get RAG chain
-        chain = get_rag_chain()
-        
-        # Process the chat message
-        response = await chain.chat(
-            message=request.message,
-            session_id=request.session_id
-        )
+        # Get RAG chain, held for the whole request so an index swap drains it first
+        with variant_registry.lease(variant_registry.default_variant) as chain:
+            # Process the chat message
+            response = await chain.chat(
+                message=request.message,
+                session_id=request.session_id,
+                use_precomputed=True
+            )
         
+        if profiler is not None:
+            return profiled_response(profiler, response, request.compact)
+        if request.compact:
+            return FastJSONResponse(compact_chat_payload(response))
         return response
         
     except Exception as e:
@@ -75,12 +303,22 @@ async def chat_endpoint(request: ChatRequest):
             status_code=500,
             detail=f"Nastala chyba pri spracovaní: {str(e)}"
         )
+    finally:
+        if profiler is not None:
+            profiler.stop()
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """
     Health check endpoint pre monitoring.
+    
+    While an OpenAI circuit breaker is open the status is "obmedzený" and
+    /api/chat answers in degraded mode (sources and excerpts, no generation).
+    Once its open period is over the breaker is reported half-open, since the
+    next request goes through to OpenAI again.
     """
+    breakers = breaker_status()
+    degraded = any(breaker["state"] == "open" for breaker in breakers.values())
     try:
         # Check vector store status
         vs = get_vector_store()
@@ -89,16 +327,20 @@ async def health_check():
         vs_status = "zdravý" if vs_stats.get('document_count', 0) > 0 else "prázdny"
         
         return HealthResponse(
-            status="zdravý",
-            model="gpt-4-turbo-preview",
-            vector_store_status=vs_status
+            status="obmedzený" if degraded else "zdravý",
+            model=get_rag_chain().llm.model_name,
+            vector_store_status=vs_status,
+            degraded=degraded,
+            circuit_breakers=breakers
         )
         
     except Exception as e:
         return HealthResponse(
             status="chyba",
             model="gpt-4-turbo-preview", 
-            vector_store_status=f"chyba: {str(e)}"
+            vector_store_status=f"chyba: {str(e)}",
+            degraded=degraded,
+            circuit_breakers=breakers
         )
 
 @router.get("/stats")
@@ -113,7 +355,9 @@ async def get_stats():
         return {
             "vector_store": stats,
             "api_status": "aktívne",
-            "supported_language": "slovenčina"
+            "supported_language": "slovenčina",
+            "variants": variant_registry.status(),
+            "worker_pid": os.getpid()
         }
         
     except Exception as e:
@@ -122,49 +366,66 @@ async def get_stats():
             detail=f"Chyba pri získavaní štatistík: {str(e)}"
         )
 
-async def process_variant(variant: RAGVariant, message: str, session_id: str) -> VariantResponse:
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """
+    LLM completion metrics of this worker (Prometheus text format):
+    requests, hedges, hedge wins, tokens billed for hedge attempts that did
+    not produce the answer and first-token latency per model.
+    """
+    return PlainTextResponse(hedged_completion.prometheus(), media_type="text/plain; version=0.0.4")
+
+@router.get("/variants")
+async def list_variants():
+    """
+    Configured variants with their loaded state, resident index size and idle time.
+    """
+    return variant_registry.status()
+
+async def process_variant(variant: str, message: str, session_id: str) -> VariantResponse:
     """Process a single RAG variant and return the response."""
     try:
         start_time = time.time()
         
         # Get RAG chain for this variant
-        chain = get_rag_chain_for_variant(variant)
-        
-        # Process the chat message
-        response = await chain.chat(
-            message=message,
-            session_id=session_id
-        )
+        with variant_registry.lease(variant) as chain:
+            # Process the chat message
+            response = await chain.chat(
+                message=message,
+                session_id=session_id
+            )
         
         processing_time = time.time() - start_time
         
         # Create variant response
         return VariantResponse(
-            variant_name=RAGServiceFactory.get_variant_display_name(variant),
+            variant_name=variant_registry.display_name(variant),
             response=response.response,
             sources=response.sources,
             processing_time=processing_time,
-            usage=response.usage
+            usage=response.usage,
+            degraded=response.degraded
         )
         
     except Exception as e:
         print(f"Error processing variant {variant}: {e}")
         # Return error response for this variant
         return VariantResponse(
-            variant_name=RAGServiceFactory.get_variant_display_name(variant),
-            response=f"Chyba pri spracovaní pomocou {RAGServiceFactory.get_variant_display_name(variant)}: {str(e)}",
+            variant_name=variant_registry.display_name(variant),
+            response=f"Chyba pri spracovaní pomocou {variant_registry.display_name(variant)}: {str(e)}",
             sources=[],
             processing_time=0.0,
             usage=None
         )
 
-@router.post("/chat/compare", response_model=ComparisonResponse)
+@router.post("/chat/compare", response_model=Union[ComparisonResponse, RetrievalResponse])
 async def chat_compare_endpoint(request: ChatRequest):
     """
     Compare responses from different RAG variants.
     
-    Returns responses from both fixed-size and semantic chunking variants.
-    Processes both variants in parallel to reduce response time.
+    Returns responses from every variant configured for comparison (by default
+    fixed-size and semantic chunking), processed in parallel.
+    With ``retrieval_only`` returns what /api/retrieve returns instead, without generating.
     """
     try:
         if not request.message or len(request.message.strip()) < 2:
@@ -173,22 +434,29 @@ async def chat_compare_endpoint(request: ChatRequest):
                 detail="Otázka musí obsahovať aspoň 2 znaky"
             )
         
-        session_id = request.session_id or str(uuid.uuid4())
+        # Get responses from the compared variants in parallel
+        variants_to_compare = variant_registry.compare_variants()
         
-        # Get responses from both variants in parallel
-        variants_to_compare = [RAGVariant.FIXED_SIZE, RAGVariant.SEMANTIC]
+        if request.retrieval_only:
+            return await retrieve_variants(request.message, variants_to_compare)
         
-        # Process both variants concurrently using asyncio.gather
+        session_id = request.session_id or str(uuid.uuid4())
+        
+        # Process the variants concurrently using asyncio.gather
         responses = await asyncio.gather(
             *[process_variant(variant, request.message, session_id) for variant in variants_to_compare]
         )
         
-        return ComparisonResponse(
+        comparison = ComparisonResponse(
             responses=responses,
             session_id=session_id,
             timestamp=datetime.now()
         )
         
+        if request.compact:
+            return FastJSONResponse(compact_comparison_payload(comparison))
+        return comparison
+        
     except Exception as e:
         print(f"Error in chat compare endpoint: {e}")
         raise HTTPException(
@@ -0,0 +1,117 @@
+from typing import Any, Dict, List, Optional
+import orjson
+from fastapi.responses import JSONResponse
+from app.models.types import ChatResponse, ComparisonResponse, Source, UsageData
+
+# Metadata keys shared by every chunk of an article; sent once per article
+ARTICLE_METADATA_KEYS = (
+    'title', 'url', 'date', 'word_count', 'source_file', 'language', 'article_id', 'topic'
+)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the standard library encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class CompactPayloadBuilder:
+    """Builds the compact response schema from regular ``Source`` objects.
+
+    Every chunk is sent once in a ``chunks`` table and every article's metadata once
+    in an ``articles`` table; sources and chunks refer to them by list index. The
+    legacy ``Source`` fields (``chunk_text``, ``chunk_size``, ``document_id``,
+    ``metadata``) and values derivable on the client (excerpts, chunk sizes) are
+    dropped. Shape::
+
+        sources:  [{title, url, relevance_score, article, chunks: [chunk index, ...]}]
+        chunks:   [{id, content, chunk_type, relevance_score, article, metadata}]
+        articles: [{title, url, date, ...}]
+    """
+
+    def __init__(self):
+        self.chunks: List[Dict[str, Any]] = []
+        self.articles: List[Dict[str, Any]] = []
+        self._chunk_refs: Dict[str, int] = {}
+        self._article_refs: Dict[str, int] = {}
+
+    def _article_ref(self, metadata: Dict[str, Any], url: str) -> int:
+        key = metadata.get('article_id') or url
+        if key not in self._article_refs:
+            self._article_refs[key] = len(self.articles)
+            self.articles.append({k: metadata[k] for k in ARTICLE_METADATA_KEYS if k in metadata})
+        return self._article_refs[key]
+
+    def add_sources(self, sources: List[Source]) -> List[Dict[str, Any]]:
+        """Register the chunks of ``sources`` and return the compact source entries."""
+        compact_sources = []
+        for source in sources:
+            article = self._article_ref(source.metadata or {}, source.url)
+            chunk_refs = []
+            for chunk in source.chunks:
+                if chunk.id not in self._chunk_refs:
+                    metadata = chunk.metadata or {}
+                    self._chunk_refs[chunk.id] = len(self.chunks)
+                    self.chunks.append({
+                        'id': chunk.id,
+                        'content': chunk.content,
+                        'chunk_type': chunk.chunk_type,
+                        'relevance_score': chunk.relevance_score,
+                        'article': self._article_ref(metadata, source.url),
+                        'metadata': {k: v for k, v in metadata.items() if k not in ARTICLE_METADATA_KEYS}
+                    })
+                chunk_refs.append(self._chunk_refs[chunk.id])
+
+            compact_sources.append({
+                'title': source.title,
+                'url': source.url,
+                'relevance_score': source.relevance_score,
+                'article': article,
+                'chunks': chunk_refs
+            })
+        return compact_sources
+
+    def tables(self) -> Dict[str, Any]:
+        return {'chunks': self.chunks, 'articles': self.articles}
+
+
+def _usage(usage: Optional[UsageData]) -> Optional[Dict[str, Any]]:
+    return usage.model_dump() if usage is not None else None
+
+
+def compact_chat_payload(response: ChatResponse) -> Dict[str, Any]:
+    """Compact form of a ``ChatResponse``."""
+    builder = CompactPayloadBuilder()
+    payload = {
+        'response': response.response,
+        'sources': builder.add_sources(response.sources),
+        'session_id': response.session_id,
+        'timestamp': response.timestamp.isoformat(),
+        'usage': _usage(response.usage),
+        'degraded': response.degraded
+    }
+    payload.update(builder.tables())
+    return payload
+
+
+def compact_comparison_payload(comparison: ComparisonResponse) -> Dict[str, Any]:
+    """Compact form of a ``ComparisonResponse``; all variants share one chunk and article table."""
+    builder = CompactPayloadBuilder()
+    payload = {
+        'responses': [
+            {
+                'variant_name': variant.variant_name,
+                'response': variant.response,
+                'sources': builder.add_sources(variant.sources),
+                'processing_time': variant.processing_time,
+                'usage': _usage(variant.usage),
+                'degraded': variant.degraded
+            }
+            for variant in comparison.responses
+        ],
+        'session_id': comparison.session_id,
+        'timestamp': comparison.timestamp.isoformat()
+    }
+    payload.update(builder.tables())
+    return payload
@@ -42,6 +42,16 @@ class CostTrackingCallback(BaseCallbackHandler):
         # Extract token usage from the response
         if response.llm_output and "token_usage" in response.llm_output:
             self.token_usage = response.llm_output["token_usage"]
+        elif response.generations and response.generations[0]:
+            # Streamed completions report usage on the message instead
+            message = getattr(response.generations[0][0], "message", None)
+            usage = getattr(message, "usage_metadata", None)
+            if usage:
+                self.token_usage = {
+                    "prompt_tokens": usage.get("input_tokens", 0),
+                    "completion_tokens": usage.get("output_tokens", 0),
+                    "total_tokens": usage.get("total_tokens", 0)
+                }
             
         # If model name not set, try to get it from response
         if not self.model_name or self.model_name == "unknown":
@@ -1,12 +1,26 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.chat import router as chat_router
+from fastapi.middleware.gzip import GZipMiddleware
+from app.api.chat import (
+    router as chat_router, preload_rag_chains, reload_indexes, watch_index_versions,
+    evict_idle_variants, variant_registry
+)
+from app.api.admin import router as admin_router
 import os
+import signal
+import asyncio
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Number of uvicorn worker processes the server was started with (see Dockerfile).
+# Workers share nothing but the files they map, so multi-worker serving expects
+# MITO_INDEX_MODE=artifact: every worker maps the same read-only artifact files
+# and the page cache holds one copy of them. With MITO_INDEX_MODE=remote workers
+# hold no index at all and search the one an index server serves (index_server.py)
+WORKERS = int(os.getenv("MITO_WORKERS", "1"))
+
 # Create FastAPI app
 app = FastAPI(
     title="MITO - Slovenský Zdravotný Asistent",
@@ -33,8 +47,48 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Optional gzip for clients that send Accept-Encoding: gzip
+if os.getenv("MITO_GZIP", "false").lower() == "true":
+    app.add_middleware(GZipMiddleware, minimum_size=int(os.getenv("MITO_GZIP_MIN_SIZE", "1000")))
+
 # Include API routers
 app.include_router(chat_router, prefix="/api", tags=["chat"])
+app.include_router(admin_router, prefix="/api/admin", tags=["admin"])
+
+@app.on_event("startup")
+async def load_index_artifacts():
+    """Open prebuilt index artifacts at startup so new containers serve immediately."""
+    if WORKERS > 1 and os.getenv("MITO_INDEX_MODE") not in ("artifact", "remote"):
+        print(f"⚠️  Running {WORKERS} workers without MITO_INDEX_MODE=artifact: every worker loads "
+              f"its own copy of each index and opens the same Chroma directories")
+    if os.getenv("MITO_INDEX_MODE") in ("artifact", "remote"):
+        preload_rag_chains()
+
+@app.on_event("startup")
+async def start_index_swap_triggers():
+    """Swap to rebuilt indexes on SIGHUP and, if configured, when a CURRENT pointer changes.
+
+    With several workers the uvicorn supervisor takes SIGHUP and restarts the
+    workers instead, and an admin reload only reaches the worker that serves it;
+    the watcher is what keeps all workers on the published version, so it is on
+    by default in that mode.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGHUP, lambda: loop.create_task(asyncio.to_thread(reload_indexes)))
+    except (NotImplementedError, RuntimeError, AttributeError):
+        print("SIGHUP index reload is not available on this platform")
+    
+    watch_interval = float(os.getenv("MITO_INDEX_WATCH_INTERVAL") or ("10" if WORKERS > 1 else "0"))
+    if watch_interval > 0:
+        app.state.index_watcher = asyncio.create_task(watch_index_versions(watch_interval))
+
+@app.on_event("startup")
+async def start_variant_eviction():
+    """Evict idle variants periodically when a variant memory budget is set."""
+    if variant_registry.memory_budget_bytes:
+        interval = float(os.getenv("MITO_VARIANT_EVICT_INTERVAL", "30"))
+        app.state.variant_evictor = asyncio.create_task(evict_idle_variants(interval))
 
 @app.get("/ping")
 async def ping():
@@ -1,15 +1,28 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict
+from typing import Dict, List, Optional
 from datetime import datetime
 from enum import Enum
 
 class RAGVariant(str, Enum):
+    """The built-in variants; more are defined in configuration (see app/rag/variants.py)."""
     FIXED_SIZE = "fixed"
     SEMANTIC = "semantic"
 
 class ChatRequest(BaseModel):
     message: str
     session_id: Optional[str] = None
+    compact: bool = False  # Opt-in compact response schema (see app/api/compact.py)
+    retrieval_only: bool = False  # /api/chat/compare: return retrieval diagnostics without generating
+    profile: bool = False  # /api/chat: record a sampling profile of this call (needs X-Admin-Token)
+
+class ArticleRequest(BaseModel):
+    """An article in the shape of data/articles/*.json (POST /api/admin/articles)."""
+    model_config = ConfigDict(extra="allow")  # e.g. scraped_at, stored with the article
+    url: str  # Its last path segment is the article_id
+    title: str
+    content: str
+    date: str = ""
+    word_count: Optional[int] = None  # Counted from the content when missing
 
 class Chunk(BaseModel):
     id: str
@@ -33,12 +46,20 @@ class Source(BaseModel):
     document_id: Optional[str] = None  # Document identifier
     metadata: Optional[dict] = None  # Additional metadata from vector store
 
+class AttemptUsage(BaseModel):
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    estimated: bool = False  # Cancelled mid-stream, so OpenAI reported no usage: counted from the stream
+
 class UsageData(BaseModel):
     model: str
     prompt_tokens: int
     completion_tokens: int
     total_tokens: int
     response_time_ms: Optional[int] = None
+    hedge_overhead: List[AttemptUsage] = []  # Hedged attempts that lost or failed, billed on top of the answer
 
 class ChatResponse(BaseModel):
     response: str
@@ -46,6 +67,7 @@ class ChatResponse(BaseModel):
     session_id: str
     timestamp: datetime
     usage: Optional[UsageData] = None
+    degraded: bool = False  # OpenAI unavailable: keyword-matched sources and excerpts, nothing generated
 
 class VariantResponse(BaseModel):
     variant_name: str
@@ -53,6 +75,7 @@ class VariantResponse(BaseModel):
     sources: List[Source]
     processing_time: float
     usage: Optional[UsageData] = None
+    degraded: bool = False  # Answered without generation (see ChatResponse)
 
 class ComparisonResponse(BaseModel):
     responses: List[VariantResponse]
@@ -62,4 +85,34 @@ class ComparisonResponse(BaseModel):
 class HealthResponse(BaseModel):
     status: str
     model: str
-    vector_store_status: str
\ No newline at end of file
+    vector_store_status: str
+    degraded: bool = False  # An OpenAI circuit breaker is open; /api/chat answers without generation
+    circuit_breakers: Dict[str, dict] = {}  # State of the embeddings and chat circuit breakers
+
+class RetrieveRequest(BaseModel):
+    message: str
+    k: int = 6
+    variants: Optional[List[str]] = None  # Variant names; default: the compared variants
+
+class VariantRetrieval(BaseModel):
+    variant: str
+    variant_name: str
+    chunks: List[Chunk]  # Every retrieved chunk in rank order
+    sources: List[Source]  # Chunks grouped by source, as /api/chat returns them
+    retrieval_time_ms: float
+    index_version: Optional[str] = None
+
+class RetrievalOverlap(BaseModel):
+    variants: List[str]
+    shared_articles: List[str]  # URLs retrieved by both variants
+    article_jaccard: float
+    shared_top_sources: int  # Sources among both variants' top sources
+    top_article_match: bool  # Both variants rank the same article first
+
+class RetrievalResponse(BaseModel):
+    query: str
+    results: List[VariantRetrieval]
+    overlap: List[RetrievalOverlap]
+    embedding_time_ms: float
+    total_time_ms: float
+    timestamp: datetime
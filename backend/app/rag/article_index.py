@@ -0,0 +1,73 @@
+from typing import Any, Dict, List, Sequence, Tuple
+import numpy as np
+from .compact_index import CompactIndex
+from .vectors import normalize
+
+
+class ArticleIndex:
+    """Coarse article-level index: one centroid vector per article.
+
+    A centroid is the re-normalized mean of the article's chunk vectors,
+    optionally truncated to a Matryoshka prefix. Searching it first and
+    then only the chunks of the top ``M`` articles makes a query cost
+    ``articles + M * chunks per article`` rows instead of every chunk.
+    """
+
+    def __init__(self, keys: List[Any], centroids: np.ndarray, rows: List[np.ndarray]):
+        self.keys = keys
+        self.centroids = centroids
+        self.rows = rows
+        self.dims = centroids.shape[1]
+
+    @classmethod
+    def from_vectors(cls, row_keys: Sequence[Any], vectors, dims: int = None) -> "ArticleIndex":
+        """Build from one article key and one vector per chunk (e.g. a Chroma collection)."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if dims:
+            vectors = vectors[:, :dims]
+        groups: Dict[Any, List[int]] = {}
+        for row, key in enumerate(row_keys):
+            groups.setdefault(key, []).append(row)
+        keys = list(groups)
+        rows = [np.asarray(groups[key], dtype=np.int64) for key in keys]
+        centroids = np.stack([normalize(vectors[members]).mean(axis=0) for members in rows])
+        return cls(keys, normalize(centroids), rows)
+
+    @classmethod
+    def from_compact_index(cls, index: CompactIndex, field: str = "article_id", dims: int = None) -> "ArticleIndex":
+        """Build from a compact index, grouping chunks by metadata ``field``.
+
+        Centroids use the first ``dims`` dimensions (all by default) of the full
+        vectors, or the in-memory compact prefix when ``dims`` fits in it.
+        There are far fewer articles than chunks, so even full-dimension
+        centroids cost less per query than scanning the compact matrix.
+        """
+        partitions = index.partitions(field)
+        keys = list(partitions)
+        rows = [partitions[key] for key in keys]
+        if dims and dims <= index.dims:
+            vectors = [index.compact_vectors(members)[:, :dims] for members in rows]
+        else:
+            vectors = [np.asarray(index.full_vectors[members], dtype=np.float32)[:, :dims] for members in rows]
+        centroids = np.stack([normalize(members).mean(axis=0) for members in vectors])
+        return cls(keys, normalize(centroids), rows)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def top_articles(self, query_embedding, m: int) -> List[Tuple[int, float]]:
+        """(article position, cosine score) of the ``m`` articles closest to the query, best first."""
+        query = normalize(np.asarray(query_embedding, dtype=np.float32)[:self.dims])
+        scores = self.centroids @ query
+        m = min(m, len(scores))
+        top = np.argpartition(-scores, m - 1)[:m] if m < len(scores) else np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        return [(int(position), float(scores[position])) for position in top]
+
+    def candidate_rows(self, query_embedding, m: int) -> np.ndarray:
+        """Sorted chunk rows of the top ``m`` articles."""
+        parts = [self.rows[position] for position, _ in self.top_articles(query_embedding, m)]
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+    def memory_bytes(self) -> int:
+        return int(self.centroids.nbytes + sum(rows.nbytes for rows in self.rows))
@@ -0,0 +1,86 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+# Chunking, dedup and sentence embedding are ingestion code: they are imported
+# when an article is updated, never on the serving import path
+
+
+def articles_dir() -> str:
+    """Directory of the article JSON files setup_rag.py indexes."""
+    return os.getenv("MITO_ARTICLES_DIR", "./data/articles")
+
+
+def sentence_cache_dir() -> str:
+    """Sentence embedding cache shared with setup_rag.py --sentence-index and sweep_chunking.py."""
+    return os.getenv("MITO_SENTENCE_CACHE_DIR", "./chunk_sweep_cache")
+
+
+def find_article_file(directory: str, article_id: str) -> Optional[str]:
+    """Path of the JSON file holding an article, or None."""
+    from .data_processor import get_article_id
+    if not os.path.isdir(directory):
+        return None
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith('.json'):
+            continue
+        path = os.path.join(directory, filename)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading {filename}: {e}")
+            continue
+        if get_article_id({**stored, 'source_file': filename}) == article_id:
+            return path
+    return None
+
+
+def article_file_path(directory: str, article_id: str) -> str:
+    """The file an article is stored in: its existing file, or ``<article_id>.json`` for a new one."""
+    return find_article_file(directory, article_id) or os.path.join(directory, f"{article_id}.json")
+
+
+def write_article_file(path: str, article: Dict[str, Any]):
+    """Store an article where setup_rag.py reads it, so the next rebuild indexes it too."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({key: value for key, value in article.items() if key != 'source_file'}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def remove_article_file(directory: str, article_id: str) -> Optional[str]:
+    """Delete an article's file; returns its path, or None if there was none."""
+    path = find_article_file(directory, article_id)
+    if path is not None:
+        os.remove(path)
+    return path
+
+
+def chunk_article(
+    config: Dict[str, Any],
+    article: Dict[str, Any],
+    with_sentences: bool = False
+) -> Tuple[List[Any], Optional[List[Any]], str, Any]:
+    """Chunk one article the way setup_rag.py chunks it for a variant.
+
+    Returns (documents, chunk vectors or None, article text, sentences). The
+    chunk vectors are the ones the chunker derived itself (chunk_vectors="pooled"),
+    None entries still need embedding. With ``with_sentences`` the article's
+    sentences come from the shared sentence cache (embedded on a miss) for the
+    index's context compression, otherwise they are None. Cross-article passage
+    deduplication (setup_rag.py --dedup) needs the whole corpus and is not applied.
+    """
+    from .data_processor import SlovakArticleProcessor, get_article_id
+    from .variants import create_chunker
+    chunker = create_chunker(config)
+    sentence_cache = None
+    if with_sentences:
+        from .chunk_sweep import SentenceCache
+        sentence_cache = SentenceCache(sentence_cache_dir(), min_sentence_chars=getattr(chunker, "min_sentence_chars", 40))
+    processor = SlovakArticleProcessor(chunker, sentence_cache=sentence_cache)
+    documents = processor.process_article(article)
+    article_id = get_article_id(article)
+    vectors = processor.chunk_vectors if any(vector is not None for vector in processor.chunk_vectors) else None
+    return documents, vectors, processor.article_texts[article_id], processor.article_sentences.get(article_id)
@@ -1,25 +1,73 @@
 from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
-from langchain.schema.runnable import RunnablePassthrough
 from langchain.schema.output_parser import StrOutputParser
 from langchain.schema import Document
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
 import uuid
 from datetime import datetime
-from app.models.types import ChatResponse, Source, Chunk, RAGVariant, UsageData
+from app.models.types import ChatResponse, Source, Chunk, RAGVariant, UsageData, AttemptUsage
 from app.callbacks.cost_tracking import CostTrackingCallback
+from .model_routing import ModelRouter
+from .hedging import hedged_completion
+from .precomputed_answers import PrecomputedAnswers
+from .circuit_breaker import embedding_breaker, chat_breaker
+from .remote_index import RemoteIndexError
+from .chunk_corpus import merge_adjacent_chunks
+from .context_compression import compress_documents
+import os
+import asyncio
+
+# Degraded answers (OpenAI unavailable): retrieved excerpts instead of a generated answer
+DEGRADED_MESSAGE = ("Jazykový model je momentálne nedostupný, preto vám teraz nemôžem odpovedať vlastnými slovami. "
+                    "Tu sú najrelevantnejšie úryvky z článkov:")
+DEGRADED_NO_SOURCES = ("Jazykový model je momentálne nedostupný a k vašej otázke som nenašiel súvisiace články. "
+                       "Skúste to prosím o chvíľu znova.")
+# The index server (remote index mode) is unavailable: nothing to answer from, so nothing is generated
+INDEX_UNAVAILABLE = ("Prepáčte, nastala chyba pri spracovaní vašej otázky: vyhľadávanie v článkoch je momentálne "
+                     "nedostupné. Skúste to prosím o chvíľu znova.")
+
+# ChatOpenAI clients by model setting, shared by the chains of every variant so
+# a dozen loaded variants don't each hold their own HTTP clients
+_shared_llms: Dict[tuple, ChatOpenAI] = {}
+
+def format_context(docs: List[Document], merge_adjacent: bool = True) -> str:
+    """The prompt's context: retrieved documents numbered, with their titles."""
+    if merge_adjacent:
+        docs = merge_adjacent_chunks(docs)
+    formatted = []
+    for i, doc in enumerate(docs, 1):
+        title = doc.metadata.get('title', 'Bez názvu')
+        content = doc.page_content
+        formatted.append(f"Dokument {i} - {title}:\n{content}\n")
+    return "\n".join(formatted)
 
 class MitoRAGChain:
-    def __init__(self, vector_store, variant: RAGVariant = RAGVariant.FIXED_SIZE):
+    def __init__(self, vector_store, variant: Union[RAGVariant, str] = RAGVariant.FIXED_SIZE):
         self.vector_store = vector_store
-        self.variant = variant
+        # Variant name, e.g. "fixed" or a configured variant (see app/rag/variants.py)
+        self.variant = variant.value if isinstance(variant, RAGVariant) else variant
         
-        # Configure LLM optimized for Slovak responses
-        self.llm = ChatOpenAI(
-            model="gpt-4-turbo-preview",
-            temperature=0.3,  # Factual but slightly creative for Slovak
-            max_tokens=1000
-        )
+        # Model settings per variant and request class (see model_routing.py);
+        # one ChatOpenAI per distinct setting, created on first use
+        self.model_router = ModelRouter.from_env()
+        self.hedger = hedged_completion
+        self._llms = _shared_llms
+        self._chains = {}
+        self.llm = self._get_llm(self.model_router.route(self.variant))
+        
+        # Answers precomputed for frequent questions against this index version
+        # (see precompute_answers.py); served by /api/chat on a close match
+        self.precomputed = None
+        if os.getenv("MITO_PRECOMPUTED", "true").lower() == "true":
+            self.precomputed = PrecomputedAnswers(self.variant, self.vector_store.index_version)
+        
+        # Send overlapping or touching chunks of one article to the model as one passage
+        self.merge_adjacent = os.getenv("MITO_MERGE_ADJACENT_CHUNKS", "true").lower() == "true"
+        
+        # Query-focused compression: send only the retrieved sentences most similar to the
+        # question, up to MITO_CONTEXT_TOKEN_BUDGET tokens (needs setup_rag.py --sentence-index)
+        self.compress_context = os.getenv("MITO_CONTEXT_COMPRESSION", "false").lower() == "true"
+        self.context_token_budget = int(os.getenv("MITO_CONTEXT_TOKEN_BUDGET", "600"))
         
         # Create Slovak-optimized prompt with specific pre-prompt instructions
         self.prompt = ChatPromptTemplate.from_messages([
@@ -59,23 +107,44 @@ Otázka: {question}
 Odpoveď:""")
         ])
         
-        # Create the RAG chain
-        self.retriever = vector_store.get_retriever(k=6)
-        self.chain = (
-            {"context": self.retriever | self._format_docs, "question": RunnablePassthrough()}
-            | self.prompt
-            | self.llm
-            | StrOutputParser()
-        )
+        # Create the RAG chain. Retrieval runs once in chat() so the prompt context
+        # and the returned sources come from the same search
+        self.chain = self._get_chain(self.model_router.route(self.variant))
+    
+    def _get_llm(self, route: Dict[str, Any], model: str = None) -> ChatOpenAI:
+        """ChatOpenAI for a route, optionally with another model (used for hedging)."""
+        key = (model or route["model"], route.get("temperature"), route.get("max_tokens"), route.get("timeout"))
+        if key not in self._llms:
+            self._llms[key] = ChatOpenAI(
+                model=key[0],
+                temperature=route.get("temperature", 0.3),
+                max_tokens=route.get("max_tokens", 1000),
+                timeout=route.get("timeout"),
+                stream_usage=True  # usage for the cost callback when streaming
+            )
+        return self._llms[key]
+    
+    def _get_chain(self, route: Dict[str, Any], model: str = None):
+        llm = self._get_llm(route, model)
+        if id(llm) not in self._chains:
+            self._chains[id(llm)] = self.prompt | llm | StrOutputParser()
+        return self._chains[id(llm)]
+    
+    def _build_inputs(self, message: str, docs_with_scores: List[tuple], query_embedding: List[float] = None) -> Dict[str, str]:
+        """Build the prompt inputs from already retrieved documents."""
+        docs = [doc for doc, _ in docs_with_scores]
+        if self.compress_context and query_embedding is not None:
+            sentence_index = self.vector_store.sentence_index()
+            if sentence_index is not None:
+                docs = compress_documents(docs, query_embedding, sentence_index, self.context_token_budget)
+        return {
+            "context": self._format_docs(docs),
+            "question": message
+        }
     
     def _format_docs(self, docs: List[Document]) -> str:
         """Format retrieved documents for the prompt."""
-        formatted = []
-        for i, doc in enumerate(docs, 1):
-            title = doc.metadata.get('title', 'Bez názvu')
-            content = doc.page_content
-            formatted.append(f"Dokument {i} - {title}:\n{content}\n")
-        return "\n".join(formatted)
+        return format_context(docs, self.merge_adjacent)
     
     def _extract_sources(self, docs: List[Document]) -> List[Source]:
         """Extract source information from retrieved documents."""
@@ -103,6 +172,42 @@ Odpoveď:""")
         
         return sources[:3]  # Return top 3 sources
     
+    def _to_chunk(self, doc: Document, score: float) -> Chunk:
+        """Chunk object for a retrieved document and its distance score."""
+        title = doc.metadata.get('title', 'Bez názvu')
+        content = doc.page_content
+        
+        # Convert distance score to similarity score (0-1 range)
+        # ChromaDB returns distance scores where lower is better
+        similarity_score = 1 / (1 + score)  # Convert distance to similarity
+        
+        return Chunk(
+            id=doc.metadata.get('id', f"{title}_{hash(content) % 10000}"),
+            content=content,
+            excerpt=content[:200] + "..." if len(content) > 200 else content,
+            chunk_size=len(content),
+            chunk_type=self.variant,  # variant name, e.g. "fixed" or "semantic"
+            relevance_score=similarity_score,
+            document_id=doc.metadata.get('id', f"{title}_{hash(content) % 10000}"),
+            metadata=doc.metadata
+        )
+    
+    def retrieve(self, message: str, k: int = 6, query_embedding: List[float] = None) -> Tuple[List[Chunk], List[Source]]:
+        """Retrieval only, no generation: scored chunks in rank order and their grouping into sources."""
+        docs_with_scores = self.vector_store.similarity_search_with_score(
+            message, k=k, query_embedding=query_embedding
+        )
+        chunks = [self._to_chunk(doc, score) for doc, score in docs_with_scores]
+        return chunks, self._extract_sources_with_scores(docs_with_scores)
+    
+    async def aretrieve(self, message: str, k: int = 6, query_embedding: List[float] = None) -> Tuple[List[Chunk], List[Source]]:
+        """``retrieve`` for coroutines; remote index searches don't block the event loop."""
+        docs_with_scores = await self.vector_store.asimilarity_search_with_score(
+            message, k=k, query_embedding=query_embedding
+        )
+        chunks = [self._to_chunk(doc, score) for doc, score in docs_with_scores]
+        return chunks, self._extract_sources_with_scores(docs_with_scores)
+    
     def _extract_sources_with_scores(self, docs_with_scores: List[tuple]) -> List[Source]:
         """Extract source information from retrieved documents with actual similarity scores.
         
@@ -114,23 +219,8 @@ Odpoveď:""")
         for doc, score in docs_with_scores:
             title = doc.metadata.get('title', 'Bez názvu')
             url = doc.metadata.get('url', '')
-            content = doc.page_content
-            
-            # Convert distance score to similarity score (0-1 range)
-            # ChromaDB returns distance scores where lower is better
-            similarity_score = 1 / (1 + score)  # Convert distance to similarity
-            
-            # Create chunk object
-            chunk = Chunk(
-                id=doc.metadata.get('id', f"{title}_{hash(content) % 10000}"),
-                content=content,
-                excerpt=content[:200] + "..." if len(content) > 200 else content,
-                chunk_size=len(content),
-                chunk_type=self.variant.value,  # "fixed" or "semantic"
-                relevance_score=similarity_score,
-                document_id=doc.metadata.get('id', f"{title}_{hash(content) % 10000}"),
-                metadata=doc.metadata
-            )
+            chunk = self._to_chunk(doc, score)
+            similarity_score = chunk.relevance_score
             
             # Group by source URL
             if url not in source_chunks_map:
@@ -176,35 +266,119 @@ Odpoveď:""")
         sources.sort(key=lambda x: x.relevance_score, reverse=True)
         return sources[:3]
     
-    async def chat(self, message: str, session_id: str = None) -> ChatResponse:
-        """Process a chat message and return response with sources."""
+    def _precomputed_response(self, query_embedding: List[float], session_id: str) -> Optional[ChatResponse]:
+        """A precomputed answer for a close match of a frequent question, if there is one."""
+        match = self.precomputed.lookup(query_embedding)
+        if match is None:
+            return None
+        print(f"DEBUG [{self.variant}]: Serving precomputed answer for '{match['question']}' "
+              f"(similarity: {match['similarity']:.3f})")
+        return ChatResponse(
+            response=match["response"],
+            sources=[Source(**source) for source in match["sources"]],
+            session_id=session_id,
+            timestamp=datetime.now()
+        )
+    
+    async def _embed_query(self, message: str) -> List[float]:
+        """Embed the query off the event loop, through the embeddings circuit breaker."""
+        return await embedding_breaker.call(asyncio.to_thread, self.vector_store.embeddings.embed_query, message)
+    
+    async def _degraded_response(
+        self,
+        message: str,
+        session_id: str,
+        error: Exception,
+        docs_with_scores: Optional[List[tuple]] = None
+    ) -> ChatResponse:
+        """Sources and their excerpts without generation, for when OpenAI is unavailable.
+        
+        Without ``docs_with_scores`` (the query could not be embedded) the chunks
+        come from the keyword index, which needs no API call.
+        """
+        print(f"⚠️  [{self.variant}] Degraded answer without generation: {error}")
+        if docs_with_scores is None:
+            docs_with_scores = await self.vector_store.alexical_search(message, k=6)
+        sources = self._extract_sources_with_scores(docs_with_scores)
+        if sources:
+            excerpts = "\n\n".join(f"{i}. {source.title}\n{source.excerpt}" for i, source in enumerate(sources, 1))
+            response = f"{DEGRADED_MESSAGE}\n\n{excerpts}"
+        else:
+            response = DEGRADED_NO_SOURCES
+        return ChatResponse(
+            response=response,
+            sources=sources,
+            session_id=session_id,
+            timestamp=datetime.now(),
+            degraded=True
+        )
+    
+    async def chat(self, message: str, session_id: str = None, use_precomputed: bool = False) -> ChatResponse:
+        """Process a chat message and return response with sources.
+        
+        With ``use_precomputed`` a close match of a frequent question is answered
+        from the precomputed answers without retrieval or generation. When the
+        embedding or chat call fails, or its circuit breaker is open, the answer
+        is degraded: the retrieved sources and excerpts, nothing generated. When
+        the index server cannot be searched nothing is generated either.
+        """
         if not session_id:
             session_id = str(uuid.uuid4())
         
-        # Initialize cost tracking callback
-        callback = CostTrackingCallback()
-        
+        # Cost tracking comes from the winning attempt, plus the hedge overhead (see hedging.py)
         try:
+            # Lexical retrieval needs no embedding (and then no precomputed answer lookup)
+            query_embedding = None
+            if self.vector_store.uses_embeddings:
+                try:
+                    query_embedding = await self._embed_query(message)
+                except Exception as e:
+                    return await self._degraded_response(message, session_id, e)
+            
+            if use_precomputed and self.precomputed is not None and query_embedding is not None:
+                precomputed = self._precomputed_response(query_embedding, session_id)
+                if precomputed is not None:
+                    return precomputed
+            
             # Get relevant documents with scores for source extraction
-            relevant_docs_with_scores = self.vector_store.similarity_search_with_score(message, k=6)
+            relevant_docs_with_scores = await self.vector_store.asimilarity_search_with_score(
+                message, k=6, query_embedding=query_embedding
+            )
             
             # Debug logging for source extraction
             vs_stats = self.vector_store.get_stats()
-            print(f"DEBUG [{self.variant.value}]: Vector store has {vs_stats.get('document_count', 0)} documents")
-            print(f"DEBUG [{self.variant.value}]: Found {len(relevant_docs_with_scores)} documents for query: '{message}'")
+            print(f"DEBUG [{self.variant}]: Vector store has {vs_stats.get('document_count', 0)} documents")
+            print(f"DEBUG [{self.variant}]: Found {len(relevant_docs_with_scores)} documents for query: '{message}'")
             if len(relevant_docs_with_scores) == 0:
-                print(f"WARNING [{self.variant.value}]: No documents found! Vector store might be empty.")
+                print(f"WARNING [{self.variant}]: No documents found! Vector store might be empty.")
             for i, (doc, score) in enumerate(relevant_docs_with_scores[:3]):
                 title = doc.metadata.get('title', 'No title')
                 print(f"  Doc {i+1}: '{title}' (score: {score})")
             
-            # Generate response using the chain with cost tracking
-            response = await self.chain.ainvoke(message, config={"callbacks": [callback]})
+            # Generate response with the routed model; a slow first token starts a
+            # hedged second attempt and the first to finish wins
+            route = self.model_router.route_message(self.variant, message)
+            hedge_model = route.get("hedge_model")
+            try:
+                response, callback, hedge_info = await chat_breaker.call(
+                    self.hedger.complete,
+                    self._get_chain(route),
+                    self._build_inputs(message, relevant_docs_with_scores, query_embedding),
+                    model=route["model"],
+                    hedge_chain=self._get_chain(route, hedge_model) if hedge_model else None,
+                    hedge_model=hedge_model,
+                    first_response=True
+                )
+            except Exception as e:
+                return await self._degraded_response(message, session_id, e, relevant_docs_with_scores)
+            if hedge_info["hedged"]:
+                print(f"DEBUG [{self.variant}]: Hedged {route['request_class']} request, "
+                      f"{hedge_info['winner']} attempt won")
             
             # Extract sources with actual scores
             sources = self._extract_sources_with_scores(relevant_docs_with_scores)
             
-            print(f"DEBUG [{self.variant.value}]: Extracted {len(sources)} sources")
+            print(f"DEBUG [{self.variant}]: Extracted {len(sources)} sources")
             
             # Get usage data (no cost calculation - Rails will handle that)
             usage_data = None
@@ -216,7 +390,8 @@ Odpoveď:""")
                     prompt_tokens=usage_info["prompt_tokens"],
                     completion_tokens=usage_info["completion_tokens"],
                     total_tokens=usage_info["total_tokens"],
-                    response_time_ms=usage_info["response_time_ms"]
+                    response_time_ms=usage_info["response_time_ms"],
+                    hedge_overhead=[AttemptUsage(**usage) for usage in hedge_info["overhead"]]
                 )
             
             return ChatResponse(
@@ -227,8 +402,16 @@ Odpoveď:""")
                 usage=usage_data
             )
             
+        except RemoteIndexError as e:
+            print(f"❌ [{self.variant}] Index server unavailable, not answering: {e}")
+            return ChatResponse(
+                response=INDEX_UNAVAILABLE,
+                sources=[],
+                session_id=session_id,
+                timestamp=datetime.now()
+            )
         except Exception as e:
-            print(f"Error in chat [{self.variant.value}]: {e}")
+            print(f"Error in chat [{self.variant}]: {e}")
             return ChatResponse(
                 response=f"Prepáčte, nastala chyba pri spracovaní vašej otázky: {str(e)}",
                 sources=[],
@@ -248,8 +431,12 @@ Odpoveď:""")
             # Get relevant documents with scores for source extraction
             relevant_docs_with_scores = self.vector_store.similarity_search_with_score(message, k=6)
             
-            # Generate response using the chain with cost tracking
-            response = self.chain.invoke(message, config={"callbacks": [callback]})
+            # Generate response using the routed model with cost tracking
+            route = self.model_router.route_message(self.variant, message)
+            response = self._get_chain(route).invoke(
+                self._build_inputs(message, relevant_docs_with_scores),
+                config={"callbacks": [callback]}
+            )
             
             # Extract sources with actual scores
             sources = self._extract_sources_with_scores(relevant_docs_with_scores)
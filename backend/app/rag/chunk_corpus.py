@@ -0,0 +1,123 @@
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+from langchain.schema import Document
+
+# Written at ingest next to the Chroma collection of a version: the article texts
+# the chunks were cut from, which compact indexes and artifacts store chunks as spans of
+CORPUS_FILE = "articles_corpus.json"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def collapse_whitespace(text: str) -> str:
+    """Text with every run of whitespace replaced by one space."""
+    return _WHITESPACE.sub(" ", text)
+
+
+def _collapse_with_positions(text: str) -> Tuple[str, List[int]]:
+    """``collapse_whitespace(text)`` plus the position in ``text`` of every character of it."""
+    collapsed, positions, cursor = [], [], 0
+    for match in _WHITESPACE.finditer(text):
+        collapsed.append(text[cursor:match.start()])
+        positions.extend(range(cursor, match.start()))
+        collapsed.append(" ")
+        positions.append(match.start())
+        cursor = match.end()
+    collapsed.append(text[cursor:])
+    positions.extend(range(cursor, len(text)))
+    return "".join(collapsed), positions
+
+
+def locate_chunks(text: str, chunks: List[str]) -> List[Optional[Tuple[int, int]]]:
+    """Character (start, end) of each chunk in the text it was cut from, or None if not found.
+
+    Chunks are searched in order from the previous match, so repeated passages
+    resolve to the right occurrence. Matching ignores whitespace differences:
+    the semantic chunker joins sentences with single spaces, and such a chunk
+    maps to the span from its first to its last sentence.
+    """
+    collapsed, positions = _collapse_with_positions(text)
+    spans, cursor = [], 0
+    for chunk in chunks:
+        needle = collapse_whitespace(chunk.strip())
+        found = collapsed.find(needle, cursor) if needle else -1
+        if found < 0 and needle:
+            found = collapsed.find(needle)
+        if found < 0:
+            spans.append(None)
+            continue
+        spans.append((positions[found], positions[found + len(needle) - 1] + 1))
+        cursor = found + 1
+    return spans
+
+
+def save_article_corpus(path: str, article_texts: Dict[str, str]):
+    """Write the corpus to a temp file and rename it, so readers never see half a file."""
+    os.makedirs(path, exist_ok=True)
+    corpus_path = os.path.join(path, CORPUS_FILE)
+    tmp_path = f"{corpus_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(article_texts, f, ensure_ascii=False)
+    os.replace(tmp_path, corpus_path)
+
+
+def load_article_corpus(path: str) -> Optional[Dict[str, str]]:
+    """Article texts saved at ingest, or None for collections built before they were kept."""
+    corpus_path = os.path.join(path, CORPUS_FILE)
+    if not os.path.exists(corpus_path):
+        return None
+    with open(corpus_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def update_article_corpus(path: str, article_id: str, text: Optional[str] = None) -> bool:
+    """Replace one article's text in a saved corpus (remove it when ``text`` is None).
+
+    Collections without a saved corpus are left without one; returns whether it was updated.
+    """
+    article_texts = load_article_corpus(path)
+    if article_texts is None:
+        return False
+    if text is None:
+        article_texts.pop(article_id, None)
+    else:
+        article_texts[article_id] = text
+    save_article_corpus(path, article_texts)
+    return True
+
+
+def merge_adjacent_chunks(docs: List[Document]) -> List[Document]:
+    """Join retrieved chunks of the same article whose spans overlap or touch.
+
+    Uses the 'chunk_start'/'chunk_end' offsets recorded at ingest, so the
+    overlap FixedSizeChunker repeats between neighbours is sent once. A merged
+    document takes the place of its first chunk in ``docs``; chunks without
+    offsets, or whose text is not exactly their span, are left as they are.
+    """
+    merged: List[Document] = []
+    open_spans: Dict[str, List[Document]] = {}
+    for doc in docs:
+        metadata = doc.metadata
+        start, end = metadata.get('chunk_start'), metadata.get('chunk_end')
+        article_id = metadata.get('article_id')
+        if article_id is None or start is None or end is None or len(doc.page_content) != end - start:
+            merged.append(doc)
+            continue
+        doc = Document(page_content=doc.page_content, metadata=dict(metadata))
+        for other in open_spans.setdefault(article_id, []):
+            other_start, other_end = other.metadata['chunk_start'], other.metadata['chunk_end']
+            if start <= other_end and other_start <= end:
+                content = other.page_content
+                if start < other_start:
+                    content = doc.page_content[:other_start - start] + content
+                if end > other_end:
+                    content = content + doc.page_content[other_end - start:]
+                other.page_content = content
+                other.metadata['chunk_start'], other.metadata['chunk_end'] = min(start, other_start), max(end, other_end)
+                break
+        else:
+            open_spans[article_id].append(doc)
+            merged.append(doc)
+    return merged
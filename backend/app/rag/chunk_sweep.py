@@ -0,0 +1,448 @@
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from .vectors import normalize, pool_sentence_vectors
+from .segmentation import split_sentence_spans, merge_short_spans
+from .chunk_corpus import locate_chunks
+
+SENTENCES_DIR = "sentences"
+QUESTIONS_FILE = "questions.json"
+QUESTION_VECTORS_FILE = "questions.npy"
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def token_counter() -> Callable[[str], int]:
+    """Token count with the chat models' tokenizer, or a chars/4 estimate without it."""
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text))
+    except Exception:
+        print("⚠️  tiktoken encoding unavailable, estimating tokens as characters / 4")
+        return lambda text: max(1, len(text) // 4)
+
+
+class ArticleSentences:
+    """Sentence spans, lengths, token counts and embeddings of one article."""
+
+    def __init__(self, article_id: str, text: str, spans: np.ndarray, tokens: np.ndarray, embeddings: np.ndarray):
+        self.article_id = article_id
+        self.text = text
+        self.spans = spans
+        self.lengths = (spans[:, 1] - spans[:, 0]).astype(np.int64)
+        self.tokens = tokens
+        self.embeddings = embeddings
+        self._similarity = None
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    @property
+    def similarity(self) -> np.ndarray:
+        """Cosine similarity of every sentence pair, computed once and reused by all configs."""
+        if self._similarity is None:
+            vectors = normalize(self.embeddings.astype(np.float32))
+            self._similarity = vectors @ vectors.T
+        return self._similarity
+
+    def sentence(self, row: int) -> str:
+        start, end = self.spans[row]
+        return self.text[start:end]
+
+
+class SentenceCache:
+    """Sentence embeddings per article, computed once and reused by every sweep.
+
+    Each article is stored as ``sentences/<article_id>.npz`` together with the
+    hash of the text it was segmented from, the segmentation setting and the
+    embedding model; a changed article is segmented and embedded again.
+    """
+
+    def __init__(self, root: str, embedding_model: str = "text-embedding-3-large", min_sentence_chars: int = 40):
+        self.root = root
+        self.embedding_model = embedding_model
+        self.min_sentence_chars = min_sentence_chars
+        os.makedirs(os.path.join(root, SENTENCES_DIR), exist_ok=True)
+
+    def _path(self, article_id: str) -> str:
+        return os.path.join(self.root, SENTENCES_DIR, f"{article_id}.npz")
+
+    def _load(self, article_id: str, text: str) -> Optional[ArticleSentences]:
+        path = self._path(article_id)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as stored:
+            if (str(stored["text_hash"]) != _text_hash(text)
+                    or str(stored["embedding_model"]) != self.embedding_model
+                    or int(stored["min_sentence_chars"]) != self.min_sentence_chars):
+                return None
+            return ArticleSentences(article_id, text, stored["spans"], stored["tokens"], stored["embeddings"])
+
+    def _save(self, sentences: ArticleSentences):
+        np.savez(
+            self._path(sentences.article_id),
+            spans=sentences.spans,
+            tokens=sentences.tokens,
+            embeddings=sentences.embeddings,
+            text_hash=_text_hash(sentences.text),
+            embedding_model=self.embedding_model,
+            min_sentence_chars=self.min_sentence_chars
+        )
+
+    def get(self, article_id: str, text: str, embed_documents: Callable, count_tokens: Callable) -> ArticleSentences:
+        """Cached sentences of an article, embedding them with ``embed_documents`` on a miss."""
+        cached = self._load(article_id, text)
+        if cached is not None:
+            return cached
+        spans = merge_short_spans(split_sentence_spans(text), self.min_sentence_chars)
+        sentences = [text[start:end] for start, end in spans]
+        embeddings = np.asarray(embed_documents(sentences), dtype=np.float32) if sentences else \
+            np.empty((0, 0), dtype=np.float32)
+        result = ArticleSentences(
+            article_id,
+            text,
+            np.asarray(spans, dtype=np.int64).reshape(-1, 2),
+            np.asarray([count_tokens(sentence) for sentence in sentences], dtype=np.int64),
+            embeddings
+        )
+        self._save(result)
+        return result
+
+
+def group_starts(similarity: np.ndarray, threshold: float) -> np.ndarray:
+    """First sentence of each of SemanticChunker's similarity groups.
+
+    A sentence joins the current group while it is at least ``threshold``
+    similar to the group's first sentence, so the next group starts at the
+    first sentence below the threshold: one vectorized scan per group.
+    """
+    count = len(similarity)
+    if count == 0:
+        return np.empty(0, dtype=np.int64)
+    starts = [0]
+    while True:
+        start = starts[-1]
+        below = np.flatnonzero(similarity[start, start + 1:] < threshold)
+        if not len(below):
+            break
+        starts.append(start + 1 + int(below[0]))
+    return np.asarray(starts, dtype=np.int64)
+
+
+def chunk_bounds(lengths: np.ndarray, starts: np.ndarray, min_chunk_size: int, max_chunk_size: int) -> np.ndarray:
+    """[start, end) sentence rows of each chunk, as SemanticChunker sizes its groups.
+
+    Sentences are joined with one space, so a chunk of rows [a, b) has
+    ``cum[b] - cum[a] + (b - a - 1)`` characters. Groups above the maximum are
+    split greedily with a binary search per piece; groups below the minimum
+    are merged into the previous chunk when both fit into the maximum.
+    """
+    count = len(lengths)
+    cum = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(lengths, out=cum[1:])
+    # A piece starting at row a can take row j while offset[j + 1] <= offset[a] + max + 2
+    offset = cum + np.arange(count + 1)
+
+    def text_length(a: int, b: int) -> int:
+        return int(cum[b] - cum[a] + (b - a - 1))
+
+    chunks: List[List[int]] = []
+    ends = np.append(starts[1:], count)
+    for group_start, group_end in zip(starts.tolist(), ends.tolist()):
+        length = text_length(group_start, group_end)
+        if length > max_chunk_size:
+            a = group_start
+            while a < group_end:
+                b = int(np.searchsorted(offset, offset[a] + max_chunk_size + 2, side="right")) - 1
+                b = min(max(b, a + 1), group_end)
+                chunks.append([a, b])
+                a = b
+        elif length < min_chunk_size and chunks:
+            previous = chunks[-1]
+            if text_length(*previous) + length <= max_chunk_size:
+                previous[1] = group_end
+            else:
+                chunks.append([group_start, group_end])
+        else:
+            chunks.append([group_start, group_end])
+    return np.asarray(chunks, dtype=np.int64).reshape(-1, 2)
+
+
+def chunk_texts(sentences: ArticleSentences, bounds: np.ndarray) -> List[str]:
+    """Chunk texts exactly as SemanticChunker joins them."""
+    return [" ".join(sentences.sentence(row) for row in range(a, b)) for a, b in bounds]
+
+
+def embedding_dims(articles: List[ArticleSentences]) -> int:
+    """Sentence embedding dimensions (0 when no article has sentences)."""
+    return max((sentences.embeddings.shape[1] for sentences in articles if len(sentences)), default=0)
+
+
+class ChunkSet:
+    """Chunks of every article for one parameter configuration."""
+
+    def __init__(self, config: Dict[str, Any], articles: List[ArticleSentences]):
+        self.config = config
+        self.articles = articles
+        bounds, owners = [], []
+        for index, sentences in enumerate(articles):
+            if not len(sentences):
+                continue
+            starts = group_starts(sentences.similarity, config["similarity_threshold"])
+            article_bounds = chunk_bounds(sentences.lengths, starts, config["min_chunk_size"], config["max_chunk_size"])
+            bounds.append(article_bounds)
+            owners.append(np.full(len(article_bounds), index, dtype=np.int64))
+        self.bounds = np.concatenate(bounds) if bounds else np.empty((0, 2), dtype=np.int64)
+        self.owners = np.concatenate(owners) if owners else np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.bounds)
+
+    def _per_article(self):
+        # Chunks are stored article by article, so each article's chunks are one slice
+        edges = np.searchsorted(self.owners, np.arange(len(self.articles) + 1))
+        for index, sentences in enumerate(self.articles):
+            yield sentences, self.bounds[edges[index]:edges[index + 1]]
+
+    def pooled_vectors(self) -> np.ndarray:
+        vectors = [
+            pool_sentence_vectors(sentences.embeddings, sentences.lengths, bounds)
+            for sentences, bounds in self._per_article() if len(bounds)
+        ]
+        return np.concatenate(vectors) if vectors else np.zeros((0, embedding_dims(self.articles)), dtype=np.float32)
+
+    def token_counts(self) -> np.ndarray:
+        counts = []
+        for sentences, bounds in self._per_article():
+            cum = np.concatenate([[0], np.cumsum(sentences.tokens)])
+            counts.append(cum[bounds[:, 1]] - cum[bounds[:, 0]])
+        return np.concatenate(counts) if counts else np.empty(0, dtype=np.int64)
+
+    def char_ranges(self) -> np.ndarray:
+        """[start, end) character offsets of each chunk in its article text."""
+        ranges = []
+        for sentences, bounds in self._per_article():
+            ranges.append(np.stack([sentences.spans[bounds[:, 0], 0], sentences.spans[bounds[:, 1] - 1, 1]], axis=1))
+        return np.concatenate(ranges) if ranges else np.empty((0, 2), dtype=np.int64)
+
+    def texts(self) -> List[str]:
+        texts = []
+        for sentences, bounds in self._per_article():
+            texts.extend(chunk_texts(sentences, bounds))
+        return texts
+
+
+class FixedChunkSet:
+    """Chunks of every article for one FixedSizeChunker configuration (``chunk_size``, ``chunk_overlap``).
+
+    The cached article texts are split with the chunker's own text splitter, so
+    the chunks are the ones an ingest would create. Chunk vectors and token
+    counts come from the cached sentences each chunk overlaps, weighted by the
+    overlapping characters; no embedding calls. Same interface as ChunkSet.
+    """
+
+    def __init__(self, config: Dict[str, Any], articles: List[ArticleSentences]):
+        from .chunkers.fixed_size import FixedSizeChunker
+        splitter = FixedSizeChunker(config["chunk_size"], config["chunk_overlap"]).text_splitter
+        self.config = config
+        self.articles = articles
+        self._texts: List[str] = []
+        ranges, owners = [], []
+        for index, sentences in enumerate(articles):
+            if not len(sentences):
+                continue
+            chunks = splitter.split_text(sentences.text)
+            for chunk, span in zip(chunks, locate_chunks(sentences.text, chunks)):
+                if span is None:
+                    continue
+                self._texts.append(chunk)
+                ranges.append(span)
+                owners.append(index)
+        self.ranges = np.asarray(ranges, dtype=np.int64).reshape(-1, 2)
+        self.owners = np.asarray(owners, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.ranges)
+
+    def _overlaps(self):
+        """Per article: (sentences, characters each of its chunks shares with each sentence)."""
+        edges = np.searchsorted(self.owners, np.arange(len(self.articles) + 1))
+        for index, sentences in enumerate(self.articles):
+            ranges = self.ranges[edges[index]:edges[index + 1]]
+            if not len(ranges):
+                continue
+            overlap = (np.minimum(ranges[:, 1:2], sentences.spans[None, :, 1])
+                       - np.maximum(ranges[:, 0:1], sentences.spans[None, :, 0]))
+            yield sentences, np.maximum(overlap, 0).astype(np.float32)
+
+    def pooled_vectors(self) -> np.ndarray:
+        vectors = [
+            normalize(overlap @ sentences.embeddings.astype(np.float32)) for sentences, overlap in self._overlaps()
+        ]
+        return np.concatenate(vectors) if vectors else np.zeros((0, embedding_dims(self.articles)), dtype=np.float32)
+
+    def token_counts(self) -> np.ndarray:
+        counts = [
+            np.rint(overlap @ (sentences.tokens / np.maximum(sentences.lengths, 1))).astype(np.int64)
+            for sentences, overlap in self._overlaps()
+        ]
+        return np.concatenate(counts) if counts else np.empty(0, dtype=np.int64)
+
+    def char_ranges(self) -> np.ndarray:
+        return self.ranges
+
+    def texts(self) -> List[str]:
+        return list(self._texts)
+
+
+def build_chunk_set(config: Dict[str, Any], articles: List[ArticleSentences]):
+    """The chunks of a semantic (ChunkSet) or fixed-size (FixedChunkSet) configuration."""
+    if "chunk_size" in config:
+        return FixedChunkSet(config, articles)
+    return ChunkSet(config, articles)
+
+
+def load_labelled_questions(path: str) -> List[Dict[str, Any]]:
+    """Read a labelled question set.
+
+    A JSON list of ``{"question": ..., "article_ids": [...], "answer": ...}``;
+    ``article_ids`` are the article slugs (``get_article_id``) that answer the
+    question and the optional ``answer`` is a verbatim excerpt of one of them.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        questions = json.load(f)
+    for entry in questions:
+        if "article_id" in entry:
+            entry["article_ids"] = [entry.pop("article_id")]
+        if not entry.get("question") or not entry.get("article_ids"):
+            raise ValueError(f"Labelled question without question or article_ids: {entry}")
+    return questions
+
+
+def cached_question_vectors(root: str, questions: List[str], embed_documents: Callable) -> np.ndarray:
+    """Normalized question embeddings, embedding only questions not seen before."""
+    names_path = os.path.join(root, QUESTIONS_FILE)
+    vectors_path = os.path.join(root, QUESTION_VECTORS_FILE)
+    known: List[str] = []
+    vectors = None
+    if os.path.exists(names_path) and os.path.exists(vectors_path):
+        with open(names_path, 'r', encoding='utf-8') as f:
+            known = json.load(f)
+        vectors = np.load(vectors_path)
+    seen = set(known)
+    missing = [question for question in dict.fromkeys(questions) if question not in seen]
+    if missing:
+        new_vectors = np.asarray(embed_documents(missing), dtype=np.float32)
+        vectors = new_vectors if vectors is None else np.concatenate([vectors, new_vectors])
+        known = known + missing
+        np.save(vectors_path, vectors)
+        with open(names_path, 'w', encoding='utf-8') as f:
+            json.dump(known, f, ensure_ascii=False)
+    rows = {question: row for row, question in enumerate(known)}
+    return normalize(vectors[[rows[question] for question in questions]])
+
+
+class RelevanceLabels:
+    """Which chunks answer which labelled question.
+
+    With an ``answer`` excerpt a chunk is relevant when it covers at least half
+    of the excerpt; otherwise any chunk of a listed article is relevant.
+    """
+
+    def __init__(self, questions: List[Dict[str, Any]], articles: List[ArticleSentences]):
+        rows = {sentences.article_id: row for row, sentences in enumerate(articles)}
+        self.articles: List[np.ndarray] = []
+        self.spans: List[Optional[Tuple[int, int, int]]] = []
+        for entry in questions:
+            article_rows = [rows[article_id] for article_id in entry["article_ids"] if article_id in rows]
+            if not article_rows:
+                print(f"⚠️  No cached article for '{entry['question']}': {entry['article_ids']}")
+            self.articles.append(np.asarray(article_rows, dtype=np.int64))
+            span = None
+            answer = entry.get("answer")
+            if answer:
+                for row in article_rows:
+                    position = articles[row].text.find(answer)
+                    if position >= 0:
+                        span = (row, position, position + len(answer))
+                        break
+                else:
+                    print(f"⚠️  Answer of '{entry['question']}' not found verbatim, using article-level labels")
+            self.spans.append(span)
+
+    def relevant(self, query: int, owners: np.ndarray, ranges: np.ndarray) -> np.ndarray:
+        """Boolean mask over the given chunks (article rows and character ranges)."""
+        span = self.spans[query]
+        if span is None:
+            return np.isin(owners, self.articles[query])
+        row, start, end = span
+        overlap = np.minimum(ranges[:, 1], end) - np.maximum(ranges[:, 0], start)
+        return (owners == row) & (overlap * 2 >= end - start)
+
+
+def score_chunk_set(
+    chunk_set: ChunkSet,
+    chunk_vectors: np.ndarray,
+    query_vectors: np.ndarray,
+    labels: RelevanceLabels,
+    k_values: List[int]
+) -> Dict[str, Any]:
+    """Recall@k, MRR and context tokens per query of one configuration."""
+    if not len(chunk_set):
+        # Nothing to retrieve (empty corpus or a setting that chunks nothing)
+        return {"chunks": 0, "mean_chunk_tokens": 0.0, "mrr": 0.0,
+                **{f"{name}@{k}": 0.0 for k in k_values for name in ("recall", "tokens")}}
+    scores = query_vectors @ chunk_vectors.T
+    depth = min(max(k_values), scores.shape[1])
+    top = np.argpartition(-scores, depth - 1, axis=1)[:, :depth]
+    order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+    top = np.take_along_axis(top, order, axis=1)
+
+    owners, ranges, tokens = chunk_set.owners, chunk_set.char_ranges(), chunk_set.token_counts()
+    hits = np.stack([
+        labels.relevant(query, owners[top[query]], ranges[top[query]])
+        for query in range(len(query_vectors))
+    ])
+    first_hit = np.where(hits.any(axis=1), hits.argmax(axis=1) + 1, 0)
+
+    result = {
+        "chunks": len(chunk_set),
+        "mean_chunk_tokens": float(tokens.mean()) if len(tokens) else 0.0,
+        "mrr": float(np.mean(np.where(first_hit > 0, 1.0 / np.maximum(first_hit, 1), 0.0)))
+    }
+    for k in k_values:
+        result[f"recall@{k}"] = float(hits[:, :k].any(axis=1).mean())
+        result[f"tokens@{k}"] = float(tokens[top[:, :k]].sum(axis=1).mean())
+    return result
+
+
+def parameter_grid(thresholds: List[float], min_sizes: List[int], max_sizes: List[int]) -> List[Dict[str, Any]]:
+    """Every valid (threshold, min size, max size) combination."""
+    return [
+        {"similarity_threshold": threshold, "min_chunk_size": min_size, "max_chunk_size": max_size}
+        for threshold in thresholds
+        for min_size in min_sizes
+        for max_size in max_sizes
+        if min_size < max_size
+    ]
+
+
+def fixed_parameter_grid(chunk_sizes: List[int], overlaps: List[int]) -> List[Dict[str, Any]]:
+    """Every valid (chunk size, overlap) combination of FixedSizeChunker."""
+    return [
+        {"chunk_size": chunk_size, "chunk_overlap": overlap}
+        for chunk_size in chunk_sizes
+        for overlap in overlaps
+        if overlap < chunk_size
+    ]
+
+
+def config_name(config: Dict[str, Any]) -> str:
+    if "chunk_size" in config:
+        return f"fixed{config['chunk_size']}_o{config['chunk_overlap']}"
+    return f"t{config['similarity_threshold']:g}_min{config['min_chunk_size']}_max{config['max_chunk_size']}"
@@ -1,5 +1,15 @@
 from .base import BaseChunker
-from .fixed_size import FixedSizeChunker
-from .semantic import SemanticChunker
 
-__all__ = ["BaseChunker", "FixedSizeChunker", "SemanticChunker"]
\ No newline at end of file
+__all__ = ["BaseChunker", "FixedSizeChunker", "SemanticChunker"]
+
+
+def __getattr__(name: str):
+    # Chunkers load their splitters and embedding clients on first use, so
+    # importing the package (e.g. for BaseChunker) stays cheap
+    if name == "FixedSizeChunker":
+        from .fixed_size import FixedSizeChunker
+        return FixedSizeChunker
+    if name == "SemanticChunker":
+        from .semantic import SemanticChunker
+        return SemanticChunker
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
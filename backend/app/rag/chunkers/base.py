@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
 from langchain.schema import Document
 
 class BaseChunker(ABC):
@@ -22,6 +23,13 @@ class BaseChunker(ABC):
         """
         pass
     
+    def chunk_text_with_vectors(self, text: str, metadata: Dict[str, Any]) -> Tuple[List[Document], Optional[np.ndarray]]:
+        """Chunk the text and return the chunks' embeddings if the chunker derives them itself.
+        
+        None means the chunks still have to be embedded (the default).
+        """
+        return self.chunk_text(text, metadata), None
+    
     @abstractmethod
     def get_chunker_name(self) -> str:
         """Return the display name of this chunking strategy."""
@@ -32,6 +40,10 @@ class BaseChunker(ABC):
         """Return a description of this chunking strategy."""
         pass
     
+    def get_config(self) -> Dict[str, Any]:
+        """Return the parameters that determine how text is chunked."""
+        return {"chunker_name": self.get_chunker_name()}
+    
     def get_stats(self) -> Dict[str, Any]:
         """Return statistics about the chunking process."""
         return {
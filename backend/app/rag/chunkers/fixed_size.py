@@ -49,5 +49,10 @@ class FixedSizeChunker(BaseChunker):
     def get_chunker_name(self) -> str:
         return "Fixed Size"
     
+    def get_config(self) -> Dict[str, Any]:
+        config = super().get_config()
+        config.update({"chunk_size": self.chunk_size, "chunk_overlap": self.chunk_overlap})
+        return config
+    
     def get_chunker_description(self) -> str:
         return f"Fixed-size chunking with {self.chunk_size} characters and {self.chunk_overlap} overlap"
\ No newline at end of file
@@ -1,39 +1,47 @@
-import re
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from langchain.schema import Document
 from langchain_openai import OpenAIEmbeddings
-from sklearn.metrics.pairwise import cosine_similarity
 from .base import BaseChunker
+from ..segmentation import split_sentence_spans, merge_short_spans
+from ..vectors import pool_sentence_vectors
+
+CHUNK_VECTOR_MODES = ("embedded", "pooled")
 
 class SemanticChunker(BaseChunker):
     """Semantic chunking strategy using sentence embeddings and similarity clustering."""
     
-    def __init__(self, similarity_threshold: float = 0.75, max_chunk_size: int = 1000, min_chunk_size: int = 600):
+    def __init__(self, similarity_threshold: float = 0.75, max_chunk_size: int = 1000, min_chunk_size: int = 600,
+                 min_sentence_chars: int = 40, chunk_vectors: str = "embedded"):
         super().__init__()
         self.similarity_threshold = similarity_threshold
         self.max_chunk_size = max_chunk_size
         self.min_chunk_size = min_chunk_size
+        # Headings and one-word questions are embedded together with the next sentence
+        self.min_sentence_chars = min_sentence_chars
         
         # Initialize embeddings model
         self.embeddings = OpenAIEmbeddings(
             model="text-embedding-3-large",
             chunk_size=50  # Smaller batch size for sentence embeddings
         )
-    
-    def _split_into_sentences(self, text: str) -> List[str]:
-        """Split text into sentences using basic punctuation rules for Slovak."""
-        # Enhanced Slovak sentence splitting
-        # Handle common abbreviations and special cases
-        text = re.sub(r'\b(Dr|Prof|Mgr|Ing|PhD|RNDr|MUDr|MVDr|JUDr|PhDr|PaedDr|ThDr|etc|tzn|napr|resp|tzv|apod|č|s|r|o|z|v|k|na|po|pre|pri|cca|min|max|kg|g|mg|ml|l|cm|m|km|°C|%)\\.', r'\\1<DOT>', text)
         
-        # Split on sentence endings
-        sentences = re.split(r'[.!?]+(?=\s+[A-ZÁČĎÉÍĹĽŇÓŔŠŤÚÝŽ]|\s*$)', text)
+        # How chunk vectors are made at ingest: "embedded" sends each chunk text to the
+        # embedding model, "pooled" derives them from the sentence embeddings above
+        # without further API calls (compare_chunk_vectors.py compares the two)
+        if chunk_vectors not in CHUNK_VECTOR_MODES:
+            raise ValueError(f"Unknown chunk_vectors '{chunk_vectors}', expected one of {CHUNK_VECTOR_MODES}")
+        self.chunk_vectors = chunk_vectors
         
-        # Restore dots in abbreviations and clean up
-        sentences = [re.sub(r'<DOT>', '.', sentence.strip()) for sentence in sentences if sentence.strip()]
-        
-        return sentences
+        # Optional (article_id, text) -> chunk_sweep.ArticleSentences; set by
+        # SlovakArticleProcessor when ingest keeps sentence embeddings, so each
+        # sentence is embedded once for chunking and context compression
+        self.sentence_source = None
+    
+    def _split_into_sentences(self, text: str) -> List[str]:
+        """Split text into sentences using the shared Slovak segmenter."""
+        spans = merge_short_spans(split_sentence_spans(text), self.min_sentence_chars)
+        return [text[start:end] for start, end in spans]
     
     def _get_sentence_embeddings(self, sentences: List[str]) -> List[np.ndarray]:
         """Get embeddings for a list of sentences."""
@@ -72,6 +80,11 @@ class SemanticChunker(BaseChunker):
         
         print(f"  🔗 Grouping {len(sentences)} sentences by similarity (threshold: {self.similarity_threshold})...")
         
+        # Unit vectors, so cosine similarity is a dot product (no scikit-learn needed)
+        vectors = np.asarray(embeddings, dtype=np.float64)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1.0, norms)
+        
         groups = []
         current_group = [0]
         similarity_calculations = 0
@@ -79,10 +92,7 @@ class SemanticChunker(BaseChunker):
         for i in range(1, len(sentences)):
             # Calculate similarity with the first sentence in current group
             first_idx = current_group[0]
-            similarity = cosine_similarity(
-                embeddings[first_idx].reshape(1, -1),
-                embeddings[i].reshape(1, -1)
-            )[0][0]
+            similarity = float(vectors[first_idx] @ vectors[i])
             similarity_calculations += 1
             
             # Show progress for longer texts
@@ -104,10 +114,11 @@ class SemanticChunker(BaseChunker):
         print(f"  ✅ Created {len(groups)} semantic groups from {len(sentences)} sentences")
         return groups
     
-    def _create_chunks_from_groups(self, sentences: List[str], groups: List[List[int]]) -> List[str]:
-        """Create text chunks from sentence groups, respecting size limits."""
+    def _create_chunks_from_groups(self, sentences: List[str], groups: List[List[int]]) -> Tuple[List[str], List[List[int]]]:
+        """Create text chunks from sentence groups, respecting size limits; also the sentences of each chunk."""
         print(f"  📝 Creating chunks from {len(groups)} semantic groups...")
         chunks = []
+        chunk_sentences = []
         merged_count = 0
         split_count = 0
         
@@ -122,26 +133,32 @@ class SemanticChunker(BaseChunker):
             # If the group is too large, split it further
             if len(group_text) > self.max_chunk_size:
                 # Split large group into smaller chunks
-                sub_chunks = self._split_large_group(sentences, group)
+                sub_chunks, sub_sentences = self._split_large_group(sentences, group)
                 chunks.extend(sub_chunks)
+                chunk_sentences.extend(sub_sentences)
                 split_count += 1
             elif len(group_text) < self.min_chunk_size and chunks:
                 # If too small, try to merge with previous chunk
                 if len(chunks[-1]) + len(group_text) <= self.max_chunk_size:
                     chunks[-1] = chunks[-1] + ' ' + group_text
+                    chunk_sentences[-1] = chunk_sentences[-1] + list(group)
                     merged_count += 1
                 else:
                     chunks.append(group_text)
+                    chunk_sentences.append(list(group))
             else:
                 chunks.append(group_text)
+                chunk_sentences.append(list(group))
         
         print(f"  ✅ Created {len(chunks)} final chunks (merged: {merged_count}, split: {split_count})")
-        return chunks
+        return chunks, chunk_sentences
     
-    def _split_large_group(self, sentences: List[str], group: List[int]) -> List[str]:
+    def _split_large_group(self, sentences: List[str], group: List[int]) -> Tuple[List[str], List[List[int]]]:
         """Split a large semantic group into smaller chunks."""
         chunks = []
+        chunk_sentences = []
         current_chunk = ""
+        current_sentences = []
         
         for idx in group:
             sentence = sentences[idx]
@@ -149,50 +166,73 @@ class SemanticChunker(BaseChunker):
             # Check if adding this sentence would exceed max size
             if current_chunk and len(current_chunk) + len(sentence) > self.max_chunk_size:
                 chunks.append(current_chunk.strip())
+                chunk_sentences.append(current_sentences)
                 current_chunk = sentence
+                current_sentences = [idx]
             else:
                 current_chunk = current_chunk + ' ' + sentence if current_chunk else sentence
+                current_sentences.append(idx)
         
         # Add the last chunk
         if current_chunk:
             chunks.append(current_chunk.strip())
+            chunk_sentences.append(current_sentences)
         
-        return chunks
+        return chunks, chunk_sentences
     
     def chunk_text(self, text: str, metadata: Dict[str, Any]) -> List[Document]:
         """Chunk text using semantic similarity strategy."""
+        return self.chunk_text_with_vectors(text, metadata)[0]
+    
+    def chunk_text_with_vectors(self, text: str, metadata: Dict[str, Any]) -> Tuple[List[Document], Optional[np.ndarray]]:
+        """Chunk text, and with ``chunk_vectors="pooled"`` also return each chunk's vector:
+        the length-weighted, re-normalized mean of its sentence embeddings."""
         article_title = metadata.get('title', 'Unknown Article')
         print(f"\n🧠 SEMANTIC CHUNKING: {article_title}")
         
-        # Split into sentences
-        print("  📄 Splitting text into sentences...")
-        sentences = self._split_into_sentences(text)
+        sentences, embeddings = None, None
+        if self.sentence_source is not None and metadata.get('article_id'):
+            try:
+                stored = self.sentence_source(metadata['article_id'], text)
+                sentences = [stored.sentence(row) for row in range(len(stored))]
+                embeddings = list(stored.embeddings)
+                print(f"  📄 Using {len(sentences)} stored sentence embeddings...")
+            except Exception as e:
+                print(f"  ⚠️  Stored sentence embeddings unavailable ({e}), embedding sentences here...")
+        if sentences is None:
+            # Split into sentences
+            print("  📄 Splitting text into sentences...")
+            sentences = self._split_into_sentences(text)
         
         if not sentences:
             print("  ⚠️  No sentences found in text")
-            return []
+            return [], None
         
         print(f"  ✅ Found {len(sentences)} sentences")
         
         # Get embeddings for sentences
-        embeddings = self._get_sentence_embeddings(sentences)
+        if embeddings is None:
+            embeddings = self._get_sentence_embeddings(sentences)
         
         if not embeddings:
             print("  ⚠️  Embedding generation failed, using fallback chunking...")
             # Fallback to simple sentence grouping if embeddings fail
             chunks = [' '.join(sentences[i:i+3]) for i in range(0, len(sentences), 3)]
+            chunk_sentences = None
         else:
             # Group sentences by semantic similarity
             groups = self._group_sentences_by_similarity(sentences, embeddings)
             # Create chunks from groups
-            chunks = self._create_chunks_from_groups(sentences, groups)
+            chunks, chunk_sentences = self._create_chunks_from_groups(sentences, groups)
         
         # Create Document objects
         print(f"  📦 Creating {len(chunks)} Document objects...")
         documents = []
+        kept = []
         for i, chunk in enumerate(chunks):
             if not chunk.strip():
                 continue
+            kept.append(i)
                 
             # Create metadata for each chunk
             chunk_metadata = metadata.copy()
@@ -213,10 +253,29 @@ class SemanticChunker(BaseChunker):
         
         self.chunk_count += len(documents)
         print(f"  ✅ COMPLETED: Generated {len(documents)} semantic chunks for '{article_title}'")
-        return documents
+        
+        vectors = None
+        if self.chunk_vectors == "pooled" and chunk_sentences is not None:
+            # Chunks are runs of consecutive sentences, so [first, last + 1) bounds each one
+            bounds = np.asarray([[chunk_sentences[i][0], chunk_sentences[i][-1] + 1] for i in kept], dtype=np.int64)
+            lengths = np.asarray([len(sentence) for sentence in sentences], dtype=np.float32)
+            vectors = pool_sentence_vectors(np.asarray(embeddings, dtype=np.float32), lengths, bounds.reshape(-1, 2))
+        return documents, vectors
     
     def get_chunker_name(self) -> str:
         return "Semantic"
     
+    def get_config(self) -> Dict[str, Any]:
+        config = super().get_config()
+        config.update({
+            "similarity_threshold": self.similarity_threshold,
+            "min_chunk_size": self.min_chunk_size,
+            "max_chunk_size": self.max_chunk_size,
+            "min_sentence_chars": self.min_sentence_chars,
+            "sentence_embedding_model": "text-embedding-3-large",
+            "chunk_vectors": self.chunk_vectors
+        })
+        return config
+    
     def get_chunker_description(self) -> str:
         return f"Semantic chunking with similarity threshold {self.similarity_threshold}"
\ No newline at end of file
@@ -0,0 +1,211 @@
+import asyncio
+import os
+import time
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit breaker is open."""
+
+
+class SlowCallError(Exception):
+    """Raised when a call through a circuit breaker did not answer within its slow-call threshold."""
+
+
+class CircuitBreaker:
+    """Fails fast while a dependency (OpenAI embeddings or chat) keeps failing or is slow.
+
+    The outcomes of the last ``window`` calls are kept; a call that raises or
+    has not answered within ``slow_call_seconds`` counts as a failure, and the
+    slow call is cancelled (SlowCallError) instead of waited out. Once at least
+    ``min_calls`` are recorded and the failure rate reaches ``failure_rate`` the
+    breaker opens: calls raise CircuitOpenError immediately for
+    ``open_seconds``. Then it is half-open and lets ``half_open_calls`` trial
+    calls through; a successful trial closes it, a failed one opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        open_seconds: float = 30.0,
+        half_open_calls: int = 1,
+        enabled: bool = True
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.enabled = enabled
+        self.outcomes = deque(maxlen=window)  # True for a failed or slow call
+        self.state = self.CLOSED
+        self.opened_at: Optional[float] = None
+        self.trials = 0
+        self.counters = {"calls": 0, "failures": 0, "slow_calls": 0, "rejected": 0, "opened": 0}
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, name: str, slow_call_seconds: float) -> "CircuitBreaker":
+        """Shared MITO_BREAKER_* settings; the slow-call threshold is per dependency
+        (MITO_BREAKER_EMBEDDINGS_SLOW_SECONDS, MITO_BREAKER_CHAT_SLOW_SECONDS for the first token)."""
+        return cls(
+            name,
+            window=int(os.getenv("MITO_BREAKER_WINDOW", "20")),
+            min_calls=int(os.getenv("MITO_BREAKER_MIN_CALLS", "5")),
+            failure_rate=float(os.getenv("MITO_BREAKER_FAILURE_RATE", "0.5")),
+            slow_call_seconds=float(os.getenv(f"MITO_BREAKER_{name.upper()}_SLOW_SECONDS", str(slow_call_seconds))),
+            open_seconds=float(os.getenv("MITO_BREAKER_OPEN_SECONDS", "30")),
+            enabled=os.getenv("MITO_BREAKER", "true").lower() == "true"
+        )
+
+    def allow(self) -> bool:
+        """Whether a call may go through now (counts a half-open trial if it does)."""
+        if not self.enabled:
+            return True
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    self.counters["rejected"] += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self.trials = 0
+                print(f"🟡 Circuit breaker '{self.name}' half-open, trying the dependency again")
+            if self.state == self.HALF_OPEN:
+                if self.trials >= self.half_open_calls:
+                    self.counters["rejected"] += 1
+                    return False
+                self.trials += 1
+            return True
+
+    def record(self, duration: float, error: Optional[BaseException] = None):
+        """Record the outcome of a call that ``allow`` let through."""
+        if not self.enabled:
+            return
+        slow = isinstance(error, SlowCallError) or (error is None and duration > self.slow_call_seconds)
+        failed = error is not None or slow
+        with self._lock:
+            self.counters["calls"] += 1
+            if error is not None and not slow:
+                self.counters["failures"] += 1
+                self.last_error = f"{type(error).__name__}: {error}"[:200]
+            if slow:
+                self.counters["slow_calls"] += 1
+                self.last_error = f"slow call ({duration:.1f}s)"
+            self.outcomes.append(failed)
+
+            if self.state == self.HALF_OPEN:
+                if failed:
+                    self._open()
+                else:
+                    self.state = self.CLOSED
+                    self.outcomes.clear()
+                    print(f"🟢 Circuit breaker '{self.name}' closed")
+            elif self.state == self.CLOSED and len(self.outcomes) >= self.min_calls:
+                if sum(self.outcomes) / len(self.outcomes) >= self.failure_rate:
+                    self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.counters["opened"] += 1
+        print(f"🔴 Circuit breaker '{self.name}' open for {self.open_seconds:.0f}s ({self.last_error})")
+
+    async def call(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        *args,
+        first_response: bool = False,
+        **kwargs
+    ) -> Any:
+        """Await ``func(*args, **kwargs)`` through the breaker; raises CircuitOpenError while open.
+
+        Blocking functions go through ``asyncio.to_thread`` as ``func``. A call
+        that has not answered within ``slow_call_seconds`` is cancelled and
+        raises SlowCallError. With ``first_response`` ``func`` also gets a
+        ``responded`` asyncio.Event to set when the dependency starts answering
+        (a streamed completion's first token): only the wait for it is timed,
+        so a long answer that keeps streaming is neither slow nor cut off.
+        """
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit breaker open)")
+        started = time.monotonic()
+        responded = asyncio.Event() if first_response else None
+        if responded is not None:
+            kwargs["responded"] = responded
+        task = asyncio.ensure_future(func(*args, **kwargs))
+        try:
+            duration = await self._answered(task, responded, started)
+            result = await task
+        except Exception as e:
+            self.record(time.monotonic() - started, e)
+            raise
+        except BaseException:
+            # Cancelled (e.g. the client went away): says nothing about the dependency
+            task.cancel()
+            with self._lock:
+                if self.state == self.HALF_OPEN:
+                    self.trials -= 1
+            raise
+        self.record(duration)
+        return result
+
+    async def _answered(self, task: asyncio.Future, responded: Optional[asyncio.Event], started: float) -> float:
+        """Seconds until ``task`` finished or ``responded`` was set; SlowCallError after ``slow_call_seconds``."""
+        waiter = asyncio.ensure_future(responded.wait()) if responded is not None else None
+        try:
+            done, _ = await asyncio.wait({task, waiter} - {None}, timeout=self.slow_call_seconds,
+                                         return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if waiter is not None:
+                waiter.cancel()
+        if not done:
+            task.cancel()
+            raise SlowCallError(f"{self.name} did not answer within {self.slow_call_seconds:g}s")
+        return time.monotonic() - started
+
+    @property
+    def is_open(self) -> bool:
+        """Open and still within ``open_seconds`` (new calls fail fast)."""
+        return self.state == self.OPEN and time.monotonic() - self.opened_at < self.open_seconds
+
+    @property
+    def effective_state(self) -> str:
+        """The state the next call sees: an open breaker past ``open_seconds`` is half-open,
+        though ``state`` only changes when that call arrives."""
+        if self.state == self.OPEN and not self.is_open:
+            return self.HALF_OPEN
+        return self.state
+
+    def status(self) -> Dict[str, Any]:
+        outcomes = list(self.outcomes)
+        status = {
+            "state": self.effective_state,
+            "failure_rate": round(sum(outcomes) / len(outcomes), 3) if outcomes else 0.0,
+            "window_calls": len(outcomes),
+            **self.counters,
+            "last_error": self.last_error
+        }
+        if self.is_open:
+            status["retry_in_seconds"] = round(self.open_seconds - (time.monotonic() - self.opened_at), 1)
+        return status
+
+
+# Shared by all chains of this process, so every request sees the same OpenAI health
+embedding_breaker = CircuitBreaker.from_env("embeddings", slow_call_seconds=5.0)
+# The chat breaker times the first streamed token, not the whole answer
+chat_breaker = CircuitBreaker.from_env("chat", slow_call_seconds=15.0)
+
+def breaker_status() -> Dict[str, Dict[str, Any]]:
+    return {breaker.name: breaker.status() for breaker in (embedding_breaker, chat_breaker)}
@@ -0,0 +1,477 @@
+import json
+import os
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from langchain.schema import Document
+from .chunk_corpus import collapse_whitespace
+from .vectors import normalize
+
+QUANTIZATIONS = ("float32", "float16", "int8")
+
+# Rows scored per block when searching the compact matrix, bounds the
+# temporary float32 copy made while de-quantizing
+SCORE_BLOCK_ROWS = 4096
+
+
+class StringTable:
+    """Read-only sequence of strings stored as one UTF-8 blob plus row offsets.
+
+    Loaded memory-mapped, the blob lives in the page cache and is shared by every
+    process serving the same file; a string is only decoded when it is accessed.
+    """
+
+    def __init__(self, blob, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings: List[str]) -> "StringTable":
+        encoded = [string.encode("utf-8") for string in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(data) for data in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets)
+
+    def save(self, path: str, name: str):
+        with open(os.path.join(path, f"{name}.bin"), "wb") as f:
+            f.write(np.asarray(self.blob, dtype=np.uint8).tobytes())
+        np.save(os.path.join(path, f"{name}_offsets.npy"), self.offsets)
+
+    @classmethod
+    def load(cls, path: str, name: str, mmap: bool = True) -> "StringTable":
+        blob_path = os.path.join(path, f"{name}.bin")
+        if os.path.getsize(blob_path) == 0:
+            blob = np.empty(0, dtype=np.uint8)  # an empty file cannot be memory-mapped
+        elif mmap:
+            blob = np.memmap(blob_path, dtype=np.uint8, mode="r")
+        else:
+            blob = np.fromfile(blob_path, dtype=np.uint8)
+        offsets = np.load(os.path.join(path, f"{name}_offsets.npy"), mmap_mode="r" if mmap else None)
+        return cls(blob, offsets)
+
+    @staticmethod
+    def exists(path: str, name: str) -> bool:
+        return os.path.exists(os.path.join(path, f"{name}.bin"))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> str:
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return bytes(self.blob[start:end]).decode("utf-8")
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+    @property
+    def nbytes(self) -> int:
+        return int(len(self.blob) + self.offsets.nbytes)
+
+
+class JsonTable:
+    """A StringTable of JSON documents, decoded on access."""
+
+    def __init__(self, strings: StringTable):
+        self.strings = strings
+
+    @classmethod
+    def from_objects(cls, objects: List[Any]) -> "JsonTable":
+        return cls(StringTable.from_strings([json.dumps(obj, ensure_ascii=False) for obj in objects]))
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def __getitem__(self, row: int) -> Any:
+        return json.loads(self.strings[row])
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+
+class ChunkTexts:
+    """Chunk texts stored as byte spans into one UTF-8 corpus of whole articles.
+
+    Overlapping chunks (FixedSizeChunker repeats 200 characters) share their
+    bytes instead of each holding a copy; chunk ``row`` is
+    ``corpus.blob[spans[row, 0]:spans[row, 1]]`` within article
+    ``articles[row]`` and is decoded only when accessed. Reads like a
+    StringTable, so CompactIndex and the lexical index use either alike.
+    """
+
+    def __init__(self, corpus: StringTable, article_ids: List[Optional[str]], spans: np.ndarray, articles: np.ndarray):
+        self.corpus = corpus
+        self.article_ids = article_ids  # per corpus entry; None for chunks stored on their own
+        self.spans = spans
+        self.articles = articles
+
+    @classmethod
+    def from_chunks(
+        cls,
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        article_texts: Dict[str, str]
+    ) -> "ChunkTexts":
+        """Point every chunk at its span of its article (the 'chunk_start'/'chunk_end' character
+        offsets recorded at ingest). Chunks without offsets, or whose span no longer reads as
+        their text, are appended to the corpus as entries of their own, so nothing is lost.
+        """
+        article_ids = list(article_texts)
+        strings = [article_texts[article_id] for article_id in article_ids]
+        entries = {article_id: entry for entry, article_id in enumerate(article_ids)}
+        located = []
+        for text, metadata in zip(texts, metadatas):
+            metadata = metadata or {}
+            entry = entries.get(metadata.get('article_id'))
+            start, end = metadata.get('chunk_start'), metadata.get('chunk_end')
+            if entry is not None and start is not None and end is not None:
+                span = strings[entry][start:end]
+                # Semantic chunks join their sentences with single spaces
+                if span == text or collapse_whitespace(span) == collapse_whitespace(text):
+                    located.append((entry, start, end))
+                    continue
+            strings.append(text)
+            article_ids.append(None)
+            located.append((len(strings) - 1, 0, len(text)))
+
+        corpus = StringTable.from_strings(strings)
+        spans = np.empty((len(located), 2), dtype=np.int64)
+        for row, (entry, start, end) in enumerate(located):
+            # Character offsets to byte offsets into the blob
+            base = int(corpus.offsets[entry]) + len(strings[entry][:start].encode("utf-8"))
+            spans[row] = (base, base + len(strings[entry][start:end].encode("utf-8")))
+        return cls(corpus, article_ids, spans, np.asarray([entry for entry, _, _ in located], dtype=np.int32))
+
+    def save(self, path: str):
+        self.corpus.save(path, "corpus")
+        np.save(os.path.join(path, "chunk_spans.npy"), np.asarray(self.spans))
+        np.save(os.path.join(path, "chunk_articles.npy"), np.asarray(self.articles))
+        with open(os.path.join(path, "corpus.json"), "w", encoding="utf-8") as f:
+            json.dump({"article_ids": self.article_ids}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "ChunkTexts":
+        mmap_mode = "r" if mmap else None
+        with open(os.path.join(path, "corpus.json"), "r", encoding="utf-8") as f:
+            article_ids = json.load(f)["article_ids"]
+        return cls(
+            StringTable.load(path, "corpus", mmap=mmap),
+            article_ids,
+            np.load(os.path.join(path, "chunk_spans.npy"), mmap_mode=mmap_mode),
+            np.load(os.path.join(path, "chunk_articles.npy"), mmap_mode=mmap_mode)
+        )
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return os.path.exists(os.path.join(path, "chunk_spans.npy"))
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def __getitem__(self, row: int) -> str:
+        start, end = int(self.spans[row, 0]), int(self.spans[row, 1])
+        return bytes(self.corpus.blob[start:end]).decode("utf-8")
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.corpus.nbytes + self.spans.nbytes + self.articles.nbytes)
+
+
+def _quantize(vectors: np.ndarray, quantization: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Quantize normalized vectors, returning (matrix, per-row scales or None)."""
+    if quantization == "float32":
+        return vectors.astype(np.float32), None
+    if quantization == "float16":
+        return vectors.astype(np.float16), None
+    if quantization == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.round(vectors / scales[:, None]).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+    raise ValueError(f"Unsupported quantization '{quantization}', expected one of {QUANTIZATIONS}")
+
+
+class CompactIndex:
+    """Reduced-dimension index with two-stage full-precision re-ranking.
+
+    text-embedding-3-large is trained Matryoshka-style, so a re-normalized prefix
+    of each vector is a usable embedding on its own. The compact prefix matrix is
+    kept in memory and scanned first; the top candidates are then re-scored with
+    the full 3072-dimension vectors, which stay on disk and are memory-mapped.
+
+    Scores are returned as squared L2 distances between unit vectors
+    (``2 - 2 * cosine``), the same scale Chroma reports, so callers can treat
+    both backends alike.
+    """
+
+    def __init__(
+        self,
+        ids: List[str],
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        compact: np.ndarray,
+        scales: Optional[np.ndarray],
+        full_vectors: np.ndarray,
+        dims: int,
+        quantization: str,
+        embedding_model: str = "text-embedding-3-large"
+    ):
+        self.ids = ids
+        self.texts = texts
+        self.metadatas = metadatas
+        self.compact = compact
+        self.scales = scales
+        self.full_vectors = full_vectors
+        self.dims = dims
+        self.quantization = quantization
+        self.embedding_model = embedding_model
+        self.path: Optional[str] = None  # Directory the index was loaded from
+        self.sentences = None  # context_compression.SentenceIndex saved along, if any
+        self._partitions: Dict[str, Dict[Any, np.ndarray]] = {}
+
+    @classmethod
+    def build(
+        cls,
+        ids: List[str],
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        embeddings,
+        dims: int = 256,
+        quantization: str = "float16",
+        embedding_model: str = "text-embedding-3-large",
+        article_texts: Optional[Dict[str, str]] = None
+    ) -> "CompactIndex":
+        """Build an index from full-dimension embeddings.
+
+        With ``article_texts`` (article_id -> text chunked at ingest) chunk texts are
+        stored as spans of those articles, see ChunkTexts.
+        """
+        full = normalize(np.asarray(embeddings, dtype=np.float32))
+        if full.ndim != 2 or len(full) != len(ids):
+            raise ValueError("Embeddings must be a 2-D array with one row per document")
+        if not 0 < dims <= full.shape[1]:
+            raise ValueError(f"Compact dims must be between 1 and {full.shape[1]}, got {dims}")
+
+        compact, scales = _quantize(normalize(full[:, :dims]), quantization)
+        if article_texts:
+            texts = ChunkTexts.from_chunks(texts, metadatas, article_texts)
+        return cls(ids, texts, metadatas, compact, scales, full, dims, quantization, embedding_model)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def save(self, path: str):
+        """Write the index to a directory."""
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "compact.npy"), self.compact)
+        np.save(os.path.join(path, "full.npy"), np.asarray(self.full_vectors, dtype=np.float32))
+        if self.scales is not None:
+            np.save(os.path.join(path, "scales.npy"), self.scales)
+
+        # Texts and metadata go into string tables so servers can map them instead
+        # of holding a decoded copy per process; chunk spans of an article corpus when there is one
+        if isinstance(self.texts, ChunkTexts):
+            self.texts.save(path)
+        else:
+            texts = self.texts if isinstance(self.texts, StringTable) else StringTable.from_strings(list(self.texts))
+            texts.save(path, "texts")
+        metadatas = self.metadatas if isinstance(self.metadatas, JsonTable) else JsonTable.from_objects(list(self.metadatas))
+        metadatas.strings.save(path, "metadatas")
+        with open(os.path.join(path, "documents.json"), "w", encoding="utf-8") as f:
+            json.dump({"ids": self.ids}, f, ensure_ascii=False)
+        if self.sentences is not None:
+            self.sentences.save(path)
+
+        with open(os.path.join(path, "index.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "dims": self.dims,
+                "full_dims": int(self.full_vectors.shape[1]),
+                "quantization": self.quantization,
+                "count": len(self.ids),
+                "embedding_model": self.embedding_model
+            }, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str, mmap_compact: bool = False) -> "CompactIndex":
+        """Load an index written by ``save``; full vectors are memory-mapped read-only.
+
+        With ``mmap_compact`` the compact matrix, texts and metadata are memory-mapped
+        as well, so loading reads no vector data up front and every process serving
+        the same files shares one copy of them in the page cache. Chunk texts are
+        spans of corpus.bin when the index was built with article texts. Indexes saved
+        before the string tables existed keep their texts in documents.json.
+        """
+        mmap_mode = "r" if mmap_compact else None
+        with open(os.path.join(path, "index.json"), "r", encoding="utf-8") as f:
+            info = json.load(f)
+        with open(os.path.join(path, "documents.json"), "r", encoding="utf-8") as f:
+            documents = json.load(f)
+
+        if ChunkTexts.exists(path):
+            texts = ChunkTexts.load(path, mmap=mmap_compact)
+            metadatas = JsonTable(StringTable.load(path, "metadatas", mmap=mmap_compact))
+        elif StringTable.exists(path, "texts"):
+            texts = StringTable.load(path, "texts", mmap=mmap_compact)
+            metadatas = JsonTable(StringTable.load(path, "metadatas", mmap=mmap_compact))
+        else:
+            texts, metadatas = documents["texts"], documents["metadatas"]
+
+        scales_path = os.path.join(path, "scales.npy")
+        index = cls(
+            ids=documents["ids"],
+            texts=texts,
+            metadatas=metadatas,
+            compact=np.load(os.path.join(path, "compact.npy"), mmap_mode=mmap_mode),
+            scales=np.load(scales_path, mmap_mode=mmap_mode) if os.path.exists(scales_path) else None,
+            full_vectors=np.load(os.path.join(path, "full.npy"), mmap_mode="r"),
+            dims=info["dims"],
+            quantization=info["quantization"],
+            embedding_model=info.get("embedding_model", "text-embedding-3-large")
+        )
+        index.path = path
+        from .context_compression import SentenceIndex  # imports this module
+        if SentenceIndex.exists(path):
+            index.sentences = SentenceIndex.load(path, mmap=mmap_compact)
+        return index
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return os.path.exists(os.path.join(path, "index.json"))
+
+    def memory_bytes(self) -> Dict[str, int]:
+        """Bytes held in memory by the compact stage vs. the on-disk full vectors."""
+        compact_bytes = self.compact.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+        sizes = {
+            "compact_bytes": int(compact_bytes),
+            "full_vector_bytes": int(self.full_vectors.size * 4)
+        }
+        if isinstance(self.texts, (StringTable, ChunkTexts)):
+            sizes["text_bytes"] = self.texts.nbytes
+        if isinstance(self.metadatas, JsonTable):
+            sizes["metadata_bytes"] = self.metadatas.strings.nbytes
+        return sizes
+
+    def partitions(self, field: str) -> Dict[Any, np.ndarray]:
+        """Rows per value of metadata ``field``, built once per field."""
+        if field not in self._partitions:
+            partitions = {}
+            for row, metadata in enumerate(self.metadatas):
+                partitions.setdefault((metadata or {}).get(field), []).append(row)
+            self._partitions[field] = {
+                key: np.asarray(rows, dtype=np.int64) for key, rows in partitions.items()
+            }
+        return self._partitions[field]
+
+    def partition_rows(self, field: str, values: List[str]) -> np.ndarray:
+        """Rows whose metadata ``field`` is one of ``values``."""
+        partitions = self.partitions(field)
+        parts = [partitions[value] for value in values if value in partitions]
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+    def compact_vectors(self, rows: np.ndarray) -> np.ndarray:
+        """De-quantized compact prefix vectors of ``rows`` as float32."""
+        vectors = np.asarray(self.compact[rows], dtype=np.float32)
+        if self.scales is not None:
+            vectors *= np.asarray(self.scales[rows])[:, None]
+        return vectors
+
+    def _compact_scores(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Cosine scores of the compact prefix against the index (or a subset of rows)."""
+        prefix = normalize(query[:self.dims].astype(np.float32))
+        matrix = self.compact if rows is None else self.compact[rows]
+        scales = self.scales if rows is None or self.scales is None else self.scales[rows]
+
+        scores = np.empty(len(matrix), dtype=np.float32)
+        for start in range(0, len(matrix), SCORE_BLOCK_ROWS):
+            block = matrix[start:start + SCORE_BLOCK_ROWS].astype(np.float32)
+            block_scores = block @ prefix
+            if scales is not None:
+                block_scores *= scales[start:start + SCORE_BLOCK_ROWS]
+            scores[start:start + SCORE_BLOCK_ROWS] = block_scores
+        return scores
+
+    def _compact_scores_many(self, queries: np.ndarray) -> np.ndarray:
+        """Compact-prefix cosine scores of several queries at once, shape (queries, rows)."""
+        prefixes = normalize(queries[:, :self.dims].astype(np.float32))
+        scores = np.empty((len(prefixes), len(self.compact)), dtype=np.float32)
+        for start in range(0, len(self.compact), SCORE_BLOCK_ROWS):
+            block = self.compact[start:start + SCORE_BLOCK_ROWS].astype(np.float32)
+            block_scores = prefixes @ block.T
+            if self.scales is not None:
+                block_scores *= self.scales[start:start + SCORE_BLOCK_ROWS]
+            scores[:, start:start + SCORE_BLOCK_ROWS] = block_scores
+        return scores
+
+    def _rerank(
+        self,
+        query: np.ndarray,
+        scores: np.ndarray,
+        k: int,
+        candidates: int,
+        rows: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, float]]:
+        """Re-score the top ``candidates`` of the compact stage with full vectors and keep ``k``."""
+        if candidates < len(scores):
+            candidate_rows = np.argpartition(-scores, candidates - 1)[:candidates]
+        else:
+            candidate_rows = np.arange(len(scores))
+        if rows is not None:
+            candidate_rows = rows[candidate_rows]
+
+        candidate_rows = np.sort(candidate_rows)  # sequential reads from the memory map
+        full_scores = np.asarray(self.full_vectors[candidate_rows], dtype=np.float32) @ query
+        order = np.argsort(-full_scores)[:k]
+
+        return [(int(candidate_rows[i]), max(0.0, float(2.0 - 2.0 * full_scores[i]))) for i in order]
+
+    def search_ids(
+        self,
+        query_embedding,
+        k: int = 6,
+        candidates: int = 48,
+        rows: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, float]]:
+        """Return (row, distance) pairs for the top ``k`` rows, optionally only among ``rows``."""
+        population = len(self.ids) if rows is None else len(rows)
+        if population == 0:
+            return []
+
+        query = normalize(np.asarray(query_embedding, dtype=np.float32))
+        k = min(k, population)
+        candidates = min(max(candidates, k), population)
+
+        # Stage 1: scan the compact prefix matrix; stage 2: exact re-score from disk
+        return self._rerank(query, self._compact_scores(query, rows), k, candidates, rows)
+
+    def search_ids_many(self, query_embeddings, k: int = 6, candidates: int = 48) -> List[List[Tuple[int, float]]]:
+        """``search_ids`` for several queries over the whole index, scanning the compact matrix once."""
+        if len(self.ids) == 0:
+            return [[] for _ in query_embeddings]
+
+        queries = normalize(np.asarray(query_embeddings, dtype=np.float32))
+        k = min(k, len(self.ids))
+        candidates = min(max(candidates, k), len(self.ids))
+        scores = self._compact_scores_many(queries)
+        return [self._rerank(query, query_scores, k, candidates) for query, query_scores in zip(queries, scores)]
+
+    def get_document(self, row: int) -> Document:
+        metadata = dict(self.metadatas[row] or {})
+        metadata.setdefault('id', self.ids[row])
+        return Document(page_content=self.texts[row], metadata=metadata)
+
+    def search(
+        self,
+        query_embedding,
+        k: int = 6,
+        candidates: int = 48,
+        rows: Optional[np.ndarray] = None
+    ) -> List[Tuple[Document, float]]:
+        """Return (Document, distance) pairs for the top ``k`` chunks."""
+        return [
+            (self.get_document(row), distance)
+            for row, distance in self.search_ids(query_embedding, k, candidates, rows)
+        ]
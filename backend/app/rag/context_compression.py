@@ -0,0 +1,217 @@
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, List, Optional
+import numpy as np
+from langchain.schema import Document
+from .compact_index import StringTable
+from .vectors import normalize
+
+# Marks left-out sentences between the sentences kept from one chunk
+ELISION = "…"
+
+
+class SentenceIndex:
+    """Sentences of every article with their embeddings, written at ingest.
+
+    Sentence rows are grouped by article: the sentences of article ``a`` are
+    rows ``offsets[a]:offsets[a + 1]`` in text order, each with its character
+    span in the article text, its token count and a normalized Matryoshka
+    prefix of its text-embedding-3-large vector (float16). Loaded memory-mapped
+    like the compact index it is saved with.
+    """
+
+    def __init__(
+        self,
+        article_ids: List[str],
+        offsets: np.ndarray,
+        spans: np.ndarray,
+        tokens: np.ndarray,
+        vectors: np.ndarray,
+        texts: StringTable
+    ):
+        self.article_ids = article_ids
+        self.offsets = offsets
+        self.spans = spans
+        self.tokens = tokens
+        self.vectors = vectors
+        self.texts = texts
+        self.dims = vectors.shape[1] if vectors.ndim == 2 else 0
+        self._articles = {article_id: row for row, article_id in enumerate(article_ids)}
+
+    @classmethod
+    def from_articles(cls, articles: Dict[str, object], dims: int = 256) -> "SentenceIndex":
+        """Build from article_id -> sentences with ``spans``, ``tokens``, ``embeddings``
+        and ``sentence(row)`` (chunk_sweep.ArticleSentences)."""
+        article_ids, counts, spans, tokens, vectors, texts = [], [], [], [], [], []
+        for article_id, sentences in articles.items():
+            if not len(sentences):
+                continue
+            article_ids.append(article_id)
+            counts.append(len(sentences))
+            spans.append(np.asarray(sentences.spans, dtype=np.int32))
+            tokens.append(np.asarray(sentences.tokens, dtype=np.int32))
+            vectors.append(normalize(np.asarray(sentences.embeddings, dtype=np.float32)[:, :dims]).astype(np.float16))
+            texts.extend(sentences.sentence(row) for row in range(len(sentences)))
+        offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(
+            article_ids,
+            offsets,
+            np.concatenate(spans) if spans else np.empty((0, 2), dtype=np.int32),
+            np.concatenate(tokens) if tokens else np.empty(0, dtype=np.int32),
+            np.concatenate(vectors) if vectors else np.empty((0, dims), dtype=np.float16),
+            StringTable.from_strings(texts)
+        )
+
+    def save(self, path: str):
+        """Write the index files; they are renamed into place, so a process that has
+        the previous files memory-mapped keeps reading them unchanged."""
+        os.makedirs(path, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".sentences-", dir=path)
+        try:
+            np.save(os.path.join(staging, "sentence_spans.npy"), self.spans)
+            np.save(os.path.join(staging, "sentence_tokens.npy"), self.tokens)
+            np.save(os.path.join(staging, "sentence_vectors.npy"), np.asarray(self.vectors))
+            self.texts.save(staging, "sentences")
+            with open(os.path.join(staging, "sentences.json"), "w", encoding="utf-8") as f:
+                json.dump({"article_ids": self.article_ids, "offsets": self.offsets.tolist()}, f, ensure_ascii=False)
+            # sentences.json last: exists() and load() start from it
+            for name in sorted(os.listdir(staging), key=lambda name: name == "sentences.json"):
+                os.replace(os.path.join(staging, name), os.path.join(path, name))
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+    
+    def replace_article(self, article_id: str, sentences=None) -> "SentenceIndex":
+        """A copy in memory with the sentences of ``article_id`` replaced by ``sentences``
+        (chunk_sweep.ArticleSentences), or removed when None; the article's rows move to the end."""
+        added = SentenceIndex.from_articles({article_id: sentences} if sentences is not None else {}, dims=self.dims)
+        article = self._articles.get(article_id)
+        article_ids, counts = list(self.article_ids), np.diff(self.offsets).tolist()
+        first = last = len(self)
+        if article is not None:
+            first, last = int(self.offsets[article]), int(self.offsets[article + 1])
+            del article_ids[article], counts[article]
+        offsets = np.zeros(len(counts) + len(added.article_ids) + 1, dtype=np.int64)
+        np.cumsum(counts + np.diff(added.offsets).tolist(), out=offsets[1:])
+        
+        def splice(values: np.ndarray, extra: np.ndarray) -> np.ndarray:
+            return np.concatenate([values[:first], values[last:], extra])
+        
+        text_offsets = self.texts.offsets
+        lo, hi = int(text_offsets[first]), int(text_offsets[last])
+        lengths = np.concatenate([np.diff(text_offsets[:first + 1]), np.diff(text_offsets[last:]), np.diff(added.texts.offsets)])
+        text_offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=text_offsets[1:])
+        blob = np.concatenate([self.texts.blob[:lo], self.texts.blob[hi:], added.texts.blob]).astype(np.uint8)
+        return SentenceIndex(
+            article_ids + added.article_ids,
+            offsets,
+            splice(self.spans, added.spans),
+            splice(self.tokens, added.tokens),
+            splice(self.vectors, added.vectors),
+            StringTable(blob, text_offsets)
+        )
+    
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "SentenceIndex":
+        mmap_mode = "r" if mmap else None
+        with open(os.path.join(path, "sentences.json"), "r", encoding="utf-8") as f:
+            info = json.load(f)
+        return cls(
+            info["article_ids"],
+            np.asarray(info["offsets"], dtype=np.int64),
+            np.load(os.path.join(path, "sentence_spans.npy"), mmap_mode=mmap_mode),
+            np.load(os.path.join(path, "sentence_tokens.npy"), mmap_mode=mmap_mode),
+            np.load(os.path.join(path, "sentence_vectors.npy"), mmap_mode=mmap_mode),
+            StringTable.load(path, "sentences", mmap=mmap)
+        )
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return os.path.exists(os.path.join(path, "sentences.json"))
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def chunk_rows(self, article_id: str, start: int, end: int) -> np.ndarray:
+        """Rows of the sentences overlapping characters [start, end) of an article."""
+        article = self._articles.get(article_id)
+        if article is None:
+            return np.empty(0, dtype=np.int64)
+        first, last = int(self.offsets[article]), int(self.offsets[article + 1])
+        spans = self.spans[first:last]
+        # Sentences are in text order: the first one ending after start up to the last one starting before end
+        lo = int(np.searchsorted(spans[:, 1], start, side="right"))
+        hi = int(np.searchsorted(spans[:, 0], end, side="left"))
+        return np.arange(first + lo, first + max(lo, hi), dtype=np.int64)
+
+    def memory_bytes(self) -> int:
+        return int(self.spans.nbytes + self.tokens.nbytes + self.vectors.nbytes + self.texts.nbytes)
+
+
+def compress_documents(
+    docs: List[Document],
+    query_embedding,
+    sentence_index: SentenceIndex,
+    token_budget: int
+) -> List[Document]:
+    """Keep the sentences of the retrieved chunks most similar to the query, within ``token_budget``.
+
+    Every sentence of every chunk is scored against the query in one matrix
+    product; the best are taken greedily until the budget is spent, and each
+    chunk is rebuilt from its kept sentences in text order (chunks with none
+    are dropped). Sentences shared by overlapping chunks count once. Chunks
+    without ingest offsets or stored sentences are kept whole and counted
+    against the budget first.
+    """
+    rows_per_doc: List[Optional[np.ndarray]] = []
+    seen = set()
+    for doc in docs:
+        metadata = doc.metadata
+        start, end = metadata.get('chunk_start'), metadata.get('chunk_end')
+        rows = None
+        if start is not None and end is not None:
+            rows = sentence_index.chunk_rows(metadata.get('article_id'), start, end)
+            rows = np.asarray([row for row in rows if row not in seen], dtype=np.int64) if len(rows) else None
+            if rows is not None:
+                seen.update(rows.tolist())
+        rows_per_doc.append(rows)
+
+    candidates = [rows for rows in rows_per_doc if rows is not None and len(rows)]
+    if not candidates:
+        return docs
+
+    budget = token_budget - sum(
+        len(doc.page_content) // 4 for doc, rows in zip(docs, rows_per_doc) if rows is None
+    )
+    all_rows = np.concatenate(candidates)
+    query = normalize(np.asarray(query_embedding, dtype=np.float32)[:sentence_index.dims])
+    scores = np.asarray(sentence_index.vectors[all_rows], dtype=np.float32) @ query
+    tokens = np.asarray(sentence_index.tokens[all_rows], dtype=np.int64)
+
+    kept = set()
+    for i in np.argsort(-scores, kind="stable"):
+        if tokens[i] <= budget:
+            kept.add(int(all_rows[i]))
+            budget -= int(tokens[i])
+
+    compressed = []
+    for doc, rows in zip(docs, rows_per_doc):
+        if rows is None:
+            compressed.append(doc)
+            continue
+        parts, previous = [], None
+        for row in rows.tolist():
+            if row not in kept:
+                continue
+            if parts and previous != row - 1:
+                parts.append(ELISION)
+            parts.append(sentence_index.texts[row])
+            previous = row
+        if parts:
+            # No longer the chunk's exact span, so it is not merged with its neighbours
+            metadata = {key: value for key, value in doc.metadata.items() if key not in ('chunk_start', 'chunk_end')}
+            compressed.append(Document(page_content=" ".join(parts), metadata=metadata))
+    return compressed
@@ -3,16 +3,88 @@ import os
 from typing import List, Dict, Any
 from langchain.schema import Document
 from .chunkers.base import BaseChunker
-from .chunkers.fixed_size import FixedSizeChunker
-from .chunkers.semantic import SemanticChunker
+from .dedup import PassageDeduplicator
+from .chunk_corpus import locate_chunks
+from .topic_router import FALLBACK_TOPIC, keyword_hits
+
+# Articles with less content than this are not indexed
+MIN_CONTENT_CHARS = 100
+
+# Keyword hits that assign an article without a topic in its title to a topic
+ARTICLE_TOPIC_MIN_HITS = 10
+
+def classify_article_topic(title: str, content: str = '') -> str:
+    """Assign an article to a topic by its title, or else by the topic keywords in its content.
+
+    A topic is taken from the content when it has at least ARTICLE_TOPIC_MIN_HITS
+    keyword hits and at least half of all of them.
+    """
+    title = title.lower()
+    if 'epigenetika' in title:
+        return 'epigenetika'
+    elif 'mitochondrie' in title or 'mitochondria' in title:
+        return 'mitochondrie'
+    elif 'hormóny' in title or 'hormny' in title:
+        return 'hormóny'
+    elif 'kvantov' in title:
+        return 'kvantová biológia'
+    hits = keyword_hits(content) if content else {}
+    if hits:
+        best = max(hits, key=hits.get)
+        if hits[best] >= ARTICLE_TOPIC_MIN_HITS and hits[best] * 2 >= sum(hits.values()):
+            return best
+    return FALLBACK_TOPIC
+
+def get_article_id(article: Dict[str, Any]) -> str:
+    """Stable article identifier: the URL slug, or the source file name without extension."""
+    url = article.get('url', '').rstrip('/')
+    if url:
+        return url.rsplit('/', 1)[-1]
+    return os.path.splitext(article.get('source_file', ''))[0]
+
+def build_article_text(article: Dict[str, Any]) -> str:
+    """The text an article is chunked from: its title line followed by the content."""
+    return f"Názov: {article.get('title', '')}\n\n{article.get('content', '')}"
 
 class SlovakArticleProcessor:
-    def __init__(self, chunker: BaseChunker = None):
+    def __init__(self, chunker: BaseChunker = None, deduplicator: PassageDeduplicator = None, sentence_cache=None):
         # Use provided chunker or default to fixed size
         if chunker is None:
+            from .chunkers.fixed_size import FixedSizeChunker
             self.chunker = FixedSizeChunker()
         else:
             self.chunker = chunker
+        
+        # Optionally strip boilerplate and repeated passages across articles before chunking
+        self.deduplicator = deduplicator
+        self.dedup_report = None
+        
+        # article_id -> the text its chunks were cut from; chunks carry their
+        # 'chunk_start'/'chunk_end' offsets into it (see chunk_corpus.py)
+        self.article_texts = {}
+        
+        # Optional chunk_sweep.SentenceCache: every article's sentences are embedded
+        # (once, shared with the semantic chunker) and kept in article_sentences for
+        # the SentenceIndex that context compression scores (see context_compression.py)
+        self.sentence_cache = sentence_cache
+        self.article_sentences = {}
+        
+        # Per document: the vector the chunker derived for it, or None to embed its text
+        self.chunk_vectors = []
+        self._count_tokens = None
+        if sentence_cache is not None and hasattr(self.chunker, 'sentence_source'):
+            self.chunker.sentence_source = self.get_sentences
+    
+    def get_sentences(self, article_id: str, text: str):
+        """Sentences and embeddings of an article from the sentence cache, embedded on a miss."""
+        if self._count_tokens is None:
+            from .chunk_sweep import token_counter
+            from .vector_store import shared_embeddings
+            self._count_tokens = token_counter()
+            self._embed_documents = shared_embeddings(self.sentence_cache.embedding_model).embed_documents
+        sentences = self.sentence_cache.get(article_id, text, self._embed_documents, self._count_tokens)
+        self.article_sentences[article_id] = sentences
+        return sentences
     
     def load_articles(self, articles_path: str) -> List[Dict[str, Any]]:
         """Load all JSON articles from the directory."""
@@ -24,6 +96,7 @@ class SlovakArticleProcessor:
                 try:
                     with open(file_path, 'r', encoding='utf-8') as f:
                         article = json.load(f)
+                        article.setdefault('source_file', filename)
                         articles.append(article)
                 except Exception as e:
                     print(f"Error loading {filename}: {e}")
@@ -32,43 +105,66 @@ class SlovakArticleProcessor:
         print(f"Loaded {len(articles)} articles")
         return articles
     
+    def process_article(self, article: Dict[str, Any]) -> List[Document]:
+        """Chunk one article into LangChain documents with proper Slovak handling.
+        
+        Records its text in ``article_texts``, its chunk vectors in ``chunk_vectors``
+        and, with a sentence cache, its sentences in ``article_sentences``.
+        """
+        title = article.get('title', '')
+        
+        # Create the main document text
+        full_text = build_article_text(article)
+        
+        # Create metadata for this article
+        metadata = {
+            'title': title,
+            'url': article.get('url', ''),
+            'date': article.get('date', ''),
+            'word_count': article.get('word_count', 0),
+            'source_file': article.get('source_file', ''),
+            'language': 'sk',
+            # Indexed for metadata pre-filtering at query time
+            'article_id': get_article_id(article),
+            'topic': classify_article_topic(title, article.get('content') or '')
+        }
+        
+        # Use the chunker to create document chunks
+        chunks, vectors = self.chunker.chunk_text_with_vectors(full_text, metadata)
+        self.chunk_vectors.extend(vectors if vectors is not None else [None] * len(chunks))
+        for chunk, span in zip(chunks, locate_chunks(full_text, [chunk.page_content for chunk in chunks])):
+            if span is not None:
+                chunk.metadata['chunk_start'], chunk.metadata['chunk_end'] = span
+        self.article_texts[metadata['article_id']] = full_text
+        if self.sentence_cache is not None and metadata['article_id'] not in self.article_sentences:
+            self.get_sentences(metadata['article_id'], full_text)
+        return chunks
+    
     def process_articles(self, articles_path: str) -> List[Document]:
         """Process articles into LangChain documents with proper Slovak handling."""
         articles = self.load_articles(articles_path)
         documents = []
+        self.article_texts = {}
+        self.article_sentences = {}
+        self.chunk_vectors = []
+        
+        if self.deduplicator is not None:
+            articles, self.dedup_report = self.deduplicator.deduplicate(articles)
+            print(f"🧹 Deduplicated passages: {self.dedup_report.summary()}")
         
         print(f"\n📚 Processing {len(articles)} articles using {self.chunker.get_chunker_name()} chunking...")
         
         for idx, article in enumerate(articles, 1):
-            # Extract content with proper Slovak encoding
-            content = article.get('content', '')
             title = article.get('title', '')
-            url = article.get('url', '')
-            date = article.get('date', '')
-            word_count = article.get('word_count', 0)
             
-            if not content or len(content.strip()) < 100:
+            if len((article.get('content') or '').strip()) < MIN_CONTENT_CHARS:
                 print(f"  ⚠️  Skipping article {idx}/{len(articles)}: '{title}' (content too short)")
                 continue
             
             # Show progress for every article (important for semantic chunking)
             print(f"\n📄 Article {idx}/{len(articles)}: {title[:60]}{'...' if len(title) > 60 else ''}")
             
-            # Create the main document text
-            full_text = f"Názov: {title}\n\n{content}"
-            
-            # Create metadata for this article
-            metadata = {
-                'title': title,
-                'url': url,
-                'date': date,
-                'word_count': word_count,
-                'source_file': article.get('source_file', ''),
-                'language': 'sk'
-            }
-            
-            # Use the chunker to create document chunks
-            chunks = self.chunker.chunk_text(full_text, metadata)
+            chunks = self.process_article(article)
             documents.extend(chunks)
             
             # Show summary for this article
@@ -91,17 +187,8 @@ class SlovakArticleProcessor:
         # Get topics from titles (basic categorization)
         topics = {}
         for article in articles:
-            title = article.get('title', '').lower()
-            if 'epigenetika' in title:
-                topics['epigenetika'] = topics.get('epigenetika', 0) + 1
-            elif 'mitochondrie' in title or 'mitochondria' in title:
-                topics['mitochondrie'] = topics.get('mitochondrie', 0) + 1
-            elif 'hormóny' in title or 'hormny' in title:
-                topics['hormóny'] = topics.get('hormóny', 0) + 1
-            elif 'kvantov' in title:
-                topics['kvantová biológia'] = topics.get('kvantová biológia', 0) + 1
-            else:
-                topics['ostatné'] = topics.get('ostatné', 0) + 1
+            topic = classify_article_topic(article.get('title', ''), article.get('content') or '')
+            topics[topic] = topics.get(topic, 0) + 1
         
         return {
             'total_articles': total_articles,
@@ -0,0 +1,230 @@
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+import numpy as np
+from .slovak_text import tokenize
+
+
+def passage_spans(text: str) -> List[Tuple[int, int]]:
+    """(start, end) offsets of the non-empty lines (paragraphs) of ``text``, stripped."""
+    spans = []
+    offset = 0
+    for line in text.split("\n"):
+        stripped = line.strip()
+        if stripped:
+            start = offset + line.index(stripped)
+            spans.append((start, start + len(stripped)))
+        offset += len(line) + 1
+    return spans
+
+
+def shingle_hashes(text: str, size: int = 5) -> np.ndarray:
+    """CRC32 hashes of the word ``size``-grams of the folded text (one shingle if it is shorter).
+
+    CRC32 rather than ``hash()`` so the same corpus dedups the same way in every process.
+    """
+    words = tokenize(text)
+    if not words:
+        return np.empty(0, dtype=np.uint32)
+    grams = {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+    return np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint32, count=len(grams))
+
+
+class MinHasher:
+    """MinHash signatures with ``num_perm`` multiply-shift hash functions."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    def signature(self, hashes: np.ndarray) -> np.ndarray:
+        with np.errstate(over="ignore"):  # arithmetic modulo 2**64 is the point
+            permuted = (hashes.astype(np.uint64)[:, None] * self.a + self.b) >> np.uint64(32)
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+@dataclass
+class DedupReport:
+    """What the deduplicator removed from a corpus."""
+    articles: int = 0
+    passages: int = 0
+    passage_chars: int = 0
+    boilerplate_removed: int = 0
+    duplicates_removed: int = 0
+    chars_removed: int = 0
+    boilerplate: List[Dict[str, Any]] = field(default_factory=list)  # most widespread first
+
+    @property
+    def passages_removed(self) -> int:
+        return self.boilerplate_removed + self.duplicates_removed
+
+    def summary(self) -> str:
+        share = self.chars_removed / self.passage_chars if self.passage_chars else 0.0
+        return (f"removed {self.passages_removed}/{self.passages} passages "
+                f"({self.boilerplate_removed} boilerplate, {self.duplicates_removed} near-duplicate), "
+                f"{self.chars_removed:,} chars ({share:.1%})")
+
+
+class PassageDeduplicator:
+    """Finds near-duplicate paragraphs across articles with MinHash/LSH and removes them before chunking.
+
+    Paragraphs of at least ``min_passage_chars`` are shingled into word
+    ``shingle_size``-grams and MinHashed; LSH with ``bands`` bands proposes
+    candidate pairs, which are kept if the exact shingle Jaccard similarity is at
+    least ``threshold``. Similar passages form clusters:
+
+    - a cluster that spans ``boilerplate_min_articles`` or more articles is
+      boilerplate (newsletter calls, shop promotions, video consent banners) and
+      is removed from every article;
+    - a smaller cluster (series recaps, reference lists repeated in the next
+      part) keeps only its first occurrence, in the earliest article.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.7,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5,
+        min_passage_chars: int = 50,
+        boilerplate_min_articles: int = 3
+    ):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.min_passage_chars = min_passage_chars
+        self.boilerplate_min_articles = boilerplate_min_articles
+        self.minhasher = MinHasher(num_perm)
+
+    def get_config(self) -> Dict[str, Any]:
+        return {
+            "threshold": self.threshold,
+            "num_perm": self.minhasher.num_perm,
+            "bands": self.bands,
+            "shingle_size": self.shingle_size,
+            "min_passage_chars": self.min_passage_chars,
+            "boilerplate_min_articles": self.boilerplate_min_articles
+        }
+
+    def _candidate_pairs(self, signatures: np.ndarray) -> set:
+        rows = signatures.shape[1] // self.bands
+        pairs = set()
+        for band in range(self.bands):
+            buckets: Dict[bytes, List[int]] = {}
+            for i, key in enumerate(signatures[:, band * rows:(band + 1) * rows]):
+                buckets.setdefault(key.tobytes(), []).append(i)
+            for members in buckets.values():
+                for a in range(len(members)):
+                    for b in range(a + 1, len(members)):
+                        pairs.add((members[a], members[b]))
+        return pairs
+
+    def _clusters(self, hash_sets: List[np.ndarray]) -> List[List[int]]:
+        """Groups of two or more near-duplicates among shingle hash arrays, by index."""
+        if len(hash_sets) < 2:
+            return []
+        signatures = np.stack([self.minhasher.signature(hashes) for hashes in hash_sets])
+        parent = list(range(len(hash_sets)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        shingle_sets = [None] * len(hash_sets)
+        for a, b in self._candidate_pairs(signatures):
+            for i in (a, b):
+                if shingle_sets[i] is None:
+                    shingle_sets[i] = set(hash_sets[i].tolist())
+            union = len(shingle_sets[a] | shingle_sets[b])
+            if union and len(shingle_sets[a] & shingle_sets[b]) / union >= self.threshold:
+                parent[find(a)] = find(b)
+
+        clusters: Dict[int, List[int]] = {}
+        for i in range(len(hash_sets)):
+            clusters.setdefault(find(i), []).append(i)
+        return [sorted(members) for members in clusters.values() if len(members) > 1]
+
+    def cluster(self, texts: List[str]) -> List[List[int]]:
+        """Groups of near-duplicate texts, by index; texts shorter than ``min_passage_chars`` are never grouped."""
+        candidates = [i for i, text in enumerate(texts) if len(text.strip()) >= self.min_passage_chars]
+        hash_sets = [shingle_hashes(texts[i], self.shingle_size) for i in candidates]
+        candidates = [i for i, hashes in zip(candidates, hash_sets) if len(hashes)]
+        hash_sets = [hashes for hashes in hash_sets if len(hashes)]
+        return [[candidates[i] for i in members] for members in self._clusters(hash_sets)]
+
+    def find_removals(self, texts: List[str]) -> Tuple[List[List[Tuple[int, int, str]]], DedupReport]:
+        """Spans to remove from each text as (start, end, reason); texts are in canonical order (earliest first)."""
+        report = DedupReport(articles=len(texts))
+        passages = []  # (text index, start, end)
+        for owner, text in enumerate(texts):
+            for start, end in passage_spans(text):
+                report.passages += 1
+                report.passage_chars += end - start
+                passages.append((owner, start, end))
+
+        removals: List[List[Tuple[int, int, str]]] = [[] for _ in texts]
+        clusters = self.cluster([texts[owner][start:end] for owner, start, end in passages])
+
+        for members in clusters:
+            owners = {passages[i][0] for i in members}
+            if len(owners) >= self.boilerplate_min_articles:
+                removed, reason = members, "boilerplate"
+                report.boilerplate_removed += len(members)
+                first = passages[members[0]]
+                report.boilerplate.append({
+                    "articles": len(owners),
+                    "occurrences": len(members),
+                    "text": texts[first[0]][first[1]:first[2]][:200]
+                })
+            else:
+                removed, reason = members[1:], "duplicate"
+                report.duplicates_removed += len(removed)
+            for i in removed:
+                owner, start, end = passages[i]
+                removals[owner].append((start, end, reason))
+                report.chars_removed += end - start
+
+        report.boilerplate.sort(key=lambda item: -item["articles"])
+        return removals, report
+
+    @staticmethod
+    def strip(text: str, spans: List[Tuple[int, int, str]]) -> str:
+        """``text`` without the paragraphs at the given spans (as returned by ``passage_spans``)."""
+        if not spans:
+            return text
+        removed = {(start, end) for start, end, _ in spans}
+        kept, offset, dropped = [], 0, False
+        for line in text.split("\n"):
+            stripped = line.strip()
+            start = offset + line.index(stripped) if stripped else offset
+            offset += len(line) + 1
+            if stripped and (start, start + len(stripped)) in removed:
+                dropped = True
+                continue
+            if not stripped and dropped and kept and not kept[-1].strip():
+                continue  # don't leave two blank lines where a paragraph was
+            kept.append(line)
+            dropped = False
+        return "\n".join(kept)
+
+    def deduplicate(self, articles: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], DedupReport]:
+        """Copies of the articles with boilerplate and repeated passages removed from their content.
+
+        The earliest article (by date, then file name) keeps a repeated passage;
+        the order of ``articles`` is preserved.
+        """
+        order = sorted(range(len(articles)), key=lambda i: (
+            articles[i].get('date') is None, articles[i].get('date') or '', articles[i].get('source_file', '')
+        ))
+        removals, report = self.find_removals([articles[i].get('content', '') for i in order])
+        deduplicated = list(articles)
+        for position, i in enumerate(order):
+            if removals[position]:
+                deduplicated[i] = dict(articles[i], content=self.strip(articles[i].get('content', ''), removals[position]))
+        return deduplicated, report
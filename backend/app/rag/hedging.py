@@ -0,0 +1,266 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.callbacks.cost_tracking import CostTrackingCallback
+
+
+class LatencyTracker:
+    """Rolling window of time-to-first-token samples for one model."""
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        return float(np.percentile(self.samples, percentile))
+
+
+class _Attempt:
+    """One streamed completion running as a task, with its own usage callback."""
+
+    def __init__(self, chain, inputs: Dict[str, Any], model: str, responded: Optional[asyncio.Event] = None):
+        self.model = model
+        self.responded = responded
+        self.callback = CostTrackingCallback()
+        self.started_at = time.monotonic()
+        self.first_token_at: Optional[float] = None
+        self.first_token = asyncio.Event()
+        self.parts: List[str] = []  # kept after a cancel, for the tokens it was billed for
+        self.task = asyncio.ensure_future(self._run(chain, inputs))
+
+    async def _run(self, chain, inputs: Dict[str, Any]) -> str:
+        async for chunk in chain.astream(inputs, config={"callbacks": [self.callback]}):
+            if self.first_token_at is None:
+                self.first_token_at = time.monotonic()
+                self.first_token.set()
+                if self.responded is not None:
+                    self.responded.set()
+            self.parts.append(chunk)
+        return "".join(self.parts)
+
+    def billed_usage(self, prompt_tokens: int) -> Optional[Dict[str, Any]]:
+        """Tokens this attempt is billed for, or None if it was rejected before generating.
+
+        A cancelled stream never gets OpenAI's usage report; its prompt costs what
+        the winner's prompt cost and each streamed chunk is about one token.
+        """
+        if self.callback.has_usage_data():
+            usage = self.callback.get_usage_data()
+            return {"model": self.model, "prompt_tokens": usage["prompt_tokens"],
+                    "completion_tokens": usage["completion_tokens"], "total_tokens": usage["total_tokens"],
+                    "estimated": False}
+        failed = self.task.done() and not self.task.cancelled() and self.task.exception() is not None
+        if failed and not self.parts:
+            return None
+        completion_tokens = len(self.parts)
+        return {"model": self.model, "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens, "estimated": True}
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        return self.first_token_at - self.started_at if self.first_token_at is not None else None
+
+
+class HedgedCompletion:
+    """Runs chat completions with a hedged second attempt for slow first tokens.
+
+    Every completion is streamed so the time to the first token is known. If
+    the first token has not arrived within the model's hedge delay (the
+    configured percentile of recent first-token latencies, clamped to
+    [min_delay, max_delay]; ``initial_delay`` until ``min_samples`` are seen),
+    a second attempt starts. Whichever attempt finishes first wins and the
+    other is cancelled, which closes its HTTP stream. The tokens the other
+    attempt was billed for are returned as the hedge overhead and counted in
+    the metrics.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        percentile: float = 95.0,
+        min_delay: float = 1.0,
+        max_delay: float = 8.0,
+        initial_delay: float = 4.0,
+        min_samples: int = 20,
+        window: int = 200
+    ):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.window = window
+        self.latencies: Dict[str, LatencyTracker] = {}
+        self.counters: Dict[Tuple[str, str], int] = {}
+
+    @classmethod
+    def from_env(cls) -> "HedgedCompletion":
+        return cls(
+            enabled=os.getenv("MITO_HEDGE", "false").lower() == "true",
+            percentile=float(os.getenv("MITO_HEDGE_PERCENTILE", "95")),
+            min_delay=float(os.getenv("MITO_HEDGE_MIN_DELAY", "1.0")),
+            max_delay=float(os.getenv("MITO_HEDGE_MAX_DELAY", "8.0")),
+            initial_delay=float(os.getenv("MITO_HEDGE_INITIAL_DELAY", "4.0")),
+            min_samples=int(os.getenv("MITO_HEDGE_MIN_SAMPLES", "20"))
+        )
+
+    def _tracker(self, model: str) -> LatencyTracker:
+        if model not in self.latencies:
+            self.latencies[model] = LatencyTracker(self.window)
+        return self.latencies[model]
+
+    def _count(self, name: str, model: str, amount: int = 1):
+        self.counters[(name, model)] = self.counters.get((name, model), 0) + amount
+
+    def hedge_delay(self, model: str) -> float:
+        """Seconds to wait for a first token before hedging a request to ``model``."""
+        tracker = self._tracker(model)
+        if len(tracker.samples) < self.min_samples:
+            return self.initial_delay
+        return min(self.max_delay, max(self.min_delay, tracker.percentile(self.percentile)))
+
+    def _record(self, attempt: _Attempt):
+        latency = attempt.time_to_first_token
+        if latency is None and not attempt.task.done():
+            # About to be cancelled without a first token; it took at least this long
+            latency = time.monotonic() - attempt.started_at
+        if latency is not None:
+            self._tracker(attempt.model).add(latency)
+
+    async def complete(
+        self,
+        chain,
+        inputs: Dict[str, Any],
+        model: str,
+        hedge_chain=None,
+        hedge_model: Optional[str] = None,
+        responded: Optional[asyncio.Event] = None
+    ) -> Tuple[str, CostTrackingCallback, Dict[str, Any]]:
+        """Return (text, usage callback of the winning attempt, hedge info).
+
+        The hedge info's "overhead" lists the billed usage of every other attempt.
+        ``responded`` is set at the first token of any attempt (see CircuitBreaker.call).
+        """
+        self._count("requests", model)
+        primary = _Attempt(chain, inputs, model, responded)
+        attempts = [primary]
+        info = {"hedged": False, "winner": "primary"}
+        try:
+            if self.enabled:
+                delay = self.hedge_delay(model)
+                waiter = asyncio.ensure_future(primary.first_token.wait())
+                done, _ = await asyncio.wait({primary.task, waiter}, timeout=delay,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                if not done:
+                    hedge_model = hedge_model or model
+                    print(f"DEBUG: No first token from {model} after {delay:.2f}s, hedging with {hedge_model}")
+                    self._count("hedged", model)
+                    attempts.append(_Attempt(hedge_chain or chain, inputs, hedge_model, responded))
+                    info.update(hedged=True, delay=delay)
+
+            winner = await self._first_successful(attempts)
+            info["winner"] = "primary" if winner is primary else "hedge"
+            if winner is not primary:
+                self._count("hedge_wins", model)
+            for attempt in attempts:
+                self._record(attempt)
+                if attempt is not winner and not attempt.task.done():
+                    attempt.task.cancel()
+            info["overhead"] = self._overhead(winner, attempts, model)
+            return winner.task.result(), winner.callback, info
+        except Exception:
+            self._count("errors", model)
+            raise
+        finally:
+            for attempt in attempts:
+                if not attempt.task.done():
+                    attempt.task.cancel()
+
+    def _overhead(self, winner: _Attempt, attempts, model: str) -> List[Dict[str, Any]]:
+        """Billed usage of the attempts that did not produce the answer, added to the metrics."""
+        prompt_tokens = winner.callback.get_usage_data()["prompt_tokens"]
+        overhead = []
+        for attempt in attempts:
+            usage = attempt.billed_usage(prompt_tokens) if attempt is not winner else None
+            if usage is None:
+                continue
+            overhead.append(usage)
+            self._count("hedge_overhead_prompt_tokens", model, usage["prompt_tokens"])
+            self._count("hedge_overhead_completion_tokens", model, usage["completion_tokens"])
+        return overhead
+
+    async def _first_successful(self, attempts) -> _Attempt:
+        """The first attempt to finish without error; raises the last error if all fail."""
+        pending = {attempt.task: attempt for attempt in attempts}
+        error = None
+        while pending:
+            done, _ = await asyncio.wait(set(pending), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                attempt = pending.pop(task)
+                if task.exception() is None:
+                    return attempt
+                error = task.exception()
+        raise error
+
+    def metrics(self) -> Dict[str, Any]:
+        """Counters and first-token latency percentiles per model."""
+        models = sorted({model for _, model in self.counters} | set(self.latencies))
+        result = {}
+        for model in models:
+            tracker = self._tracker(model)
+            result[model] = {
+                "requests": self.counters.get(("requests", model), 0),
+                "hedged": self.counters.get(("hedged", model), 0),
+                "hedge_wins": self.counters.get(("hedge_wins", model), 0),
+                "errors": self.counters.get(("errors", model), 0),
+                "hedge_overhead_prompt_tokens": self.counters.get(("hedge_overhead_prompt_tokens", model), 0),
+                "hedge_overhead_completion_tokens": self.counters.get(("hedge_overhead_completion_tokens", model), 0),
+                "first_token_p50": tracker.percentile(50),
+                "first_token_p95": tracker.percentile(95),
+                "hedge_delay": self.hedge_delay(model) if self.enabled else None
+            }
+        return result
+
+    def prometheus(self) -> str:
+        """The metrics in Prometheus text exposition format."""
+        lines = []
+        metrics = self.metrics()
+        for name, help_text in (
+            ("requests", "Chat completions started"),
+            ("hedged", "Completions that started a hedged second attempt"),
+            ("hedge_wins", "Hedged completions won by the second attempt"),
+            ("errors", "Completions that failed in every attempt"),
+            ("hedge_overhead_prompt_tokens", "Prompt tokens billed for attempts that did not produce the answer"),
+            ("hedge_overhead_completion_tokens", "Completion tokens billed for attempts that did not produce the answer")
+        ):
+            lines.append(f"# HELP mito_llm_{name}_total {help_text}")
+            lines.append(f"# TYPE mito_llm_{name}_total counter")
+            for model, values in metrics.items():
+                lines.append(f'mito_llm_{name}_total{{model="{model}"}} {values[name]}')
+
+        lines.append("# HELP mito_llm_first_token_seconds Recent time to first token")
+        lines.append("# TYPE mito_llm_first_token_seconds gauge")
+        for model, values in metrics.items():
+            for quantile, key in (("0.5", "first_token_p50"), ("0.95", "first_token_p95")):
+                if values[key] is not None:
+                    lines.append(f'mito_llm_first_token_seconds{{model="{model}",quantile="{quantile}"}} {values[key]:.4f}')
+
+        if self.enabled:
+            lines.append("# HELP mito_llm_hedge_delay_seconds Current wait before hedging")
+            lines.append("# TYPE mito_llm_hedge_delay_seconds gauge")
+            for model, values in metrics.items():
+                lines.append(f'mito_llm_hedge_delay_seconds{{model="{model}"}} {values["hedge_delay"]:.4f}')
+        return "\n".join(lines) + "\n"
+
+
+# Shared by all chains of this process, so latency percentiles see every request
+hedged_completion = HedgedCompletion.from_env()
@@ -0,0 +1,130 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+
+class IndexHandle:
+    """A loaded RAG chain plus the number of requests currently using it."""
+
+    def __init__(self, chain):
+        self.chain = chain
+        self.version = chain.vector_store.index_version
+        self.in_flight = 0
+        self.retired = False
+
+
+class HotSwapChain:
+    """Holds the serving chain of one variant and swaps it for a rebuilt index.
+
+    Requests take a lease on the current chain. A swap loads and validates the
+    new chain first, then switches atomically; the old chain keeps serving the
+    requests that already hold it and its index is released once they drain.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name = name
+        self._factory = factory
+        self._current: Optional[IndexHandle] = None
+        self._lock = threading.Lock()
+        self._swap_lock = threading.Lock()
+
+    def get(self):
+        """Return the current chain, loading it on first use."""
+        handle = self._current
+        if handle is None:
+            with self._swap_lock:
+                if self._current is None:
+                    self._current = IndexHandle(self._factory())
+                handle = self._current
+        return handle.chain
+
+    @contextmanager
+    def lease(self):
+        """Use the current chain for one request; a swap waits for leases before releasing it."""
+        while True:
+            self.get()
+            with self._lock:
+                handle = self._current
+                if handle is not None:  # None if unloaded since get()
+                    handle.in_flight += 1
+                    break
+        try:
+            yield handle.chain
+        finally:
+            with self._lock:
+                handle.in_flight -= 1
+                release = handle.retired and handle.in_flight == 0
+            if release:
+                self._release(handle)
+
+    def has_update(self) -> bool:
+        """Whether the CURRENT pointer names a different version than the one being served."""
+        handle = self._current
+        if handle is None:
+            return False
+        return handle.chain.vector_store.latest_version() != handle.version
+
+    def swap(self, force: bool = False) -> Dict[str, Any]:
+        """Load the latest index version and switch to it if it validates.
+
+        Blocking; call it from a worker thread so serving continues meanwhile.
+        """
+        with self._swap_lock:
+            old = self._current
+            if old is None:
+                # Not loaded yet; the first request loads the latest version anyway
+                return {"variant": self.name, "swapped": False, "version": None}
+            if not force and not self.has_update():
+                return {"variant": self.name, "swapped": False, "version": old.version}
+
+            new_chain = self._factory()
+            document_count = new_chain.vector_store.get_stats().get('document_count', 0)
+            if document_count == 0:
+                new_chain.vector_store.close()
+                raise RuntimeError(f"New {self.name} index has no documents, keeping the current one")
+
+            with self._lock:
+                self._current = IndexHandle(new_chain)
+                old.retired = True
+                draining = old.in_flight
+            if draining == 0:
+                self._release(old)
+
+            print(f"🔄 Swapped {self.name} index: {old.version} -> {self._current.version} "
+                  f"({document_count} documents)")
+            return {
+                "variant": self.name,
+                "swapped": True,
+                "version": self._current.version,
+                "previous_version": old.version,
+                "document_count": document_count,
+                "draining_requests": draining
+            }
+
+    def peek(self):
+        """The current chain, or None when it is not loaded; never loads it."""
+        handle = self._current
+        return handle.chain if handle is not None else None
+
+    @property
+    def loaded(self) -> bool:
+        return self._current is not None
+
+    @property
+    def in_flight(self) -> int:
+        handle = self._current
+        return handle.in_flight if handle is not None else 0
+
+    def unload(self) -> bool:
+        """Release the loaded chain if no request holds it; the next request loads it again."""
+        with self._swap_lock:
+            with self._lock:
+                handle = self._current
+                if handle is None or handle.in_flight:
+                    return False
+                self._current = None
+            self._release(handle)
+            return True
+
+    def _release(self, handle: IndexHandle):
+        handle.chain.vector_store.close()
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from .compact_index import CompactIndex
+from .index_versions import new_version_name, read_current, write_current
+
+# Bump whenever the on-disk layout changes; servers refuse artifacts of versions
+# they cannot read. Version 2 moved texts and metadata into mapped string tables,
+# version 3 can store chunk texts as spans of an article corpus (corpus.bin).
+ARTIFACT_FORMAT_VERSION = 3
+READABLE_FORMAT_VERSIONS = (1, 2, 3)
+
+MANIFEST_FILE = "manifest.json"
+
+
+class ArtifactError(Exception):
+    """Raised when an index artifact is missing or does not match this server."""
+
+
+def compute_corpus_hash(articles_path: str) -> str:
+    """SHA-256 over the names and contents of all article files, in sorted order."""
+    digest = hashlib.sha256()
+    for filename in sorted(os.listdir(articles_path)):
+        if not filename.endswith('.json'):
+            continue
+        digest.update(filename.encode('utf-8'))
+        with open(os.path.join(articles_path, filename), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def variant_artifact_dir(artifact_root: str, variant: str) -> str:
+    return os.path.join(artifact_root, variant)
+
+
+def read_current_version(artifact_root: str, variant: str) -> Optional[str]:
+    """Return the version the CURRENT pointer of a variant names, if any."""
+    return read_current(variant_artifact_dir(artifact_root, variant))
+
+
+def set_current_version(artifact_root: str, variant: str, version: str):
+    """Atomically point a variant at a version; rolling back is the same call with an older version."""
+    variant_dir = variant_artifact_dir(artifact_root, variant)
+    if not os.path.exists(os.path.join(variant_dir, version, MANIFEST_FILE)):
+        raise ArtifactError(f"Artifact version '{version}' does not exist for variant '{variant}'")
+    write_current(variant_dir, version)
+
+
+def export_artifact(
+    index: CompactIndex,
+    artifact_root: str,
+    variant: str,
+    chunker_config: Dict[str, Any],
+    corpus_hash: str,
+    make_current: bool = True
+) -> str:
+    """Write a self-contained, versioned artifact for one variant and return its path."""
+    created_at = datetime.now()
+    version = new_version_name(corpus_hash[:12])
+    path = os.path.join(variant_artifact_dir(artifact_root, variant), version)
+
+    index.save(path)
+    manifest = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "variant": variant,
+        "version": version,
+        "created_at": created_at.isoformat(),
+        "embedding_model": index.embedding_model,
+        "embedding_dims": int(index.full_vectors.shape[1]),
+        "compact_dims": index.dims,
+        "quantization": index.quantization,
+        "document_count": len(index),
+        "chunker": chunker_config,
+        "corpus_hash": corpus_hash
+    }
+    # The manifest is written last, so a half-written artifact is never loadable
+    with open(os.path.join(path, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    if make_current:
+        set_current_version(artifact_root, variant, version)
+    return path
+
+
+def load_artifact(
+    artifact_root: str,
+    variant: str,
+    version: Optional[str] = None,
+    embedding_model: str = "text-embedding-3-large"
+) -> Tuple[CompactIndex, Dict[str, Any]]:
+    """Open an artifact read-only (memory-mapped) and verify it can be served.
+
+    Loads ``version`` if given, otherwise the one the variant's CURRENT pointer names.
+    """
+    version = version or read_current_version(artifact_root, variant)
+    if not version:
+        raise ArtifactError(f"No current artifact for variant '{variant}' in {artifact_root}")
+
+    path = os.path.join(variant_artifact_dir(artifact_root, variant), version)
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        raise ArtifactError(f"Artifact manifest not found at {manifest_path}")
+
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    if manifest.get("format_version") not in READABLE_FORMAT_VERSIONS:
+        raise ArtifactError(
+            f"Artifact {version} has format version {manifest.get('format_version')}, "
+            f"this server reads versions {READABLE_FORMAT_VERSIONS}"
+        )
+    if manifest.get("variant") != variant:
+        raise ArtifactError(f"Artifact {version} was built for variant '{manifest.get('variant')}', not '{variant}'")
+    if manifest.get("embedding_model") != embedding_model:
+        raise ArtifactError(
+            f"Artifact {version} uses embedding model '{manifest.get('embedding_model')}', "
+            f"queries are embedded with '{embedding_model}'"
+        )
+
+    index = CompactIndex.load(path, mmap_compact=True)
+    if len(index) != manifest.get("document_count"):
+        raise ArtifactError(
+            f"Artifact {version} lists {manifest.get('document_count')} documents but contains {len(index)}"
+        )
+    return index, manifest
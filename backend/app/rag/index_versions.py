@@ -0,0 +1,56 @@
+import os
+import shutil
+from datetime import datetime
+from typing import List, Optional
+
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+
+
+def new_version_name(suffix: Optional[str] = None) -> str:
+    """Sortable version name for a new index build."""
+    version = f"{datetime.now():%Y%m%d%H%M%S}"
+    return f"{version}-{suffix}" if suffix else version
+
+
+def read_current(directory: str) -> Optional[str]:
+    """Return the version named by the CURRENT pointer in ``directory``, if any."""
+    pointer = os.path.join(directory, CURRENT_FILE)
+    if not os.path.exists(pointer):
+        return None
+    with open(pointer, 'r', encoding='utf-8') as f:
+        return f.read().strip() or None
+
+
+def write_current(directory: str, version: str):
+    """Atomically replace the CURRENT pointer in ``directory``."""
+    os.makedirs(directory, exist_ok=True)
+    tmp_pointer = os.path.join(directory, f".{CURRENT_FILE}.{os.getpid()}.tmp")
+    with open(tmp_pointer, 'w', encoding='utf-8') as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_pointer, os.path.join(directory, CURRENT_FILE))
+
+
+def list_versions(versions_dir: str) -> List[str]:
+    """Version directories, oldest first."""
+    if not os.path.isdir(versions_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(versions_dir)
+        if os.path.isdir(os.path.join(versions_dir, name)) and not name.startswith('.')
+    )
+
+
+def prune_versions(versions_dir: str, keep: int, protect: Optional[List[str]] = None) -> List[str]:
+    """Delete all but the newest ``keep`` versions, never touching ``protect``; returns deleted names."""
+    protect = set(protect or [])
+    versions = list_versions(versions_dir)
+    deleted = []
+    for version in versions[:max(0, len(versions) - keep)]:
+        if version in protect:
+            continue
+        shutil.rmtree(os.path.join(versions_dir, version), ignore_errors=True)
+        deleted.append(version)
+    return deleted
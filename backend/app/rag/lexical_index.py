@@ -0,0 +1,130 @@
+import sys
+from typing import Dict, List, Tuple
+import numpy as np
+from .slovak_text import stem_tokens
+
+# Reciprocal rank fusion constant (Cormack et al.); damps the weight of the very top ranks
+RRF_K = 60
+
+
+class LexicalIndex:
+    """In-memory BM25 keyword index over chunk texts, diacritic-insensitive and lightly stemmed.
+
+    Needs no embedding call, so it retrieves without network round trips: on its
+    own (MITO_RETRIEVAL_MODE=lexical), fused with vector results (hybrid), and
+    for the degraded answers of MitoRAGChain while OpenAI is unavailable.
+
+    Postings are stored CSR-style in flat arrays: the rows containing term ``t``
+    are ``rows[offsets[t]:offsets[t + 1]]`` with their term frequencies at the
+    same positions in ``frequencies``. A query scores every chunk at once with
+    numpy instead of walking postings in Python.
+    """
+
+    def __init__(
+        self,
+        vocabulary: Dict[str, int],
+        offsets: np.ndarray,
+        rows: np.ndarray,
+        frequencies: np.ndarray,
+        lengths: np.ndarray,
+        k1: float = 1.2,
+        b: float = 0.75
+    ):
+        self.vocabulary = vocabulary  # stem -> term id
+        self.offsets = offsets
+        self.rows = rows
+        self.frequencies = frequencies
+        self.lengths = lengths
+        self.k1 = k1
+        self.b = b
+        document_frequency = np.diff(offsets).astype(np.float32)
+        self.idf = np.log1p((len(lengths) - document_frequency + 0.5) / (document_frequency + 0.5)).astype(np.float32)
+        average_length = float(lengths.mean()) if len(lengths) else 1.0
+        # Per-chunk BM25 length normalization, the part of the denominator that doesn't depend on the query
+        self.norms = (k1 * (1 - b + b * lengths / (average_length or 1.0))).astype(np.float32)
+
+    @classmethod
+    def build(cls, texts) -> "LexicalIndex":
+        vocabulary: Dict[str, int] = {}
+        term_ids, row_ids, counts, lengths = [], [], [], []
+        for row, text in enumerate(texts):
+            tokens = stem_tokens(text)
+            lengths.append(len(tokens))
+            row_counts: Dict[int, int] = {}
+            for token in tokens:
+                term = vocabulary.setdefault(token, len(vocabulary))
+                row_counts[term] = row_counts.get(term, 0) + 1
+            term_ids.extend(row_counts)
+            counts.extend(row_counts.values())
+            row_ids.extend([row] * len(row_counts))
+
+        # Group the (term, row) pairs by term; rows stay ascending within a term
+        term_ids = np.asarray(term_ids, dtype=np.int32)
+        order = np.argsort(term_ids, kind="stable")
+        offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=len(vocabulary)), out=offsets[1:])
+        return cls(
+            vocabulary,
+            offsets,
+            np.asarray(row_ids, dtype=np.int32)[order],
+            np.minimum(np.asarray(counts, dtype=np.int64)[order], np.iinfo(np.uint16).max).astype(np.uint16),
+            np.asarray(lengths, dtype=np.float32)
+        )
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every chunk for ``query``."""
+        scores = np.zeros(len(self.lengths), dtype=np.float32)
+        terms = {self.vocabulary[token] for token in stem_tokens(query) if token in self.vocabulary}
+        for term in terms:
+            start, end = self.offsets[term], self.offsets[term + 1]
+            rows = self.rows[start:end]
+            frequencies = self.frequencies[start:end].astype(np.float32)
+            # Rows are unique within a term's postings, so fancy-index addition is safe
+            scores[rows] += self.idf[term] * frequencies * (self.k1 + 1) / (frequencies + self.norms[rows])
+        return scores
+
+    def search(self, query: str, k: int = 6) -> List[Tuple[int, float]]:
+        """(row, BM25 score) of the ``k`` best matching chunks, best first; chunks without a match are left out."""
+        scores = self.scores(query)
+        matched = np.flatnonzero(scores)
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(int(row), float(scores[row])) for row in matched]
+
+    def memory_bytes(self) -> int:
+        """Postings and per-chunk arrays plus an estimate of the vocabulary dict."""
+        arrays = (self.offsets, self.rows, self.frequencies, self.lengths, self.idf, self.norms)
+        vocabulary = sys.getsizeof(self.vocabulary) + sum(sys.getsizeof(term) for term in self.vocabulary)
+        return int(sum(array.nbytes for array in arrays) + vocabulary)
+
+
+def lexical_distances(hits: List[Tuple[int, float]]) -> List[Tuple[int, float]]:
+    """Scores as distances like the vector searches return: 0 for the best hit, up to 1."""
+    if not hits:
+        return []
+    best = hits[0][1] or 1.0
+    return [(row, 1.0 - score / best) for row, score in hits]
+
+
+def reciprocal_rank_fusion(rankings: List[List[tuple]], k: int = 6, rrf_k: int = RRF_K) -> List[tuple]:
+    """Fuse rankings of (Document, distance) pairs into one top ``k`` by reciprocal rank.
+
+    Documents are matched by their 'id' metadata (their text without one); the
+    fused score is turned into a distance like ``lexical_distances`` does, so
+    callers that sort by relevance keep the fused order.
+    """
+    fused: Dict[str, list] = {}
+    for ranking in rankings:
+        for rank, (document, _) in enumerate(ranking):
+            key = document.metadata.get('id') or document.page_content
+            entry = fused.setdefault(key, [document, 0.0])
+            entry[1] += 1.0 / (rrf_k + rank + 1)
+    ranked = sorted(fused.values(), key=lambda entry: -entry[1])[:k]
+    if not ranked:
+        return []
+    best = ranked[0][1]
+    return [(document, 1.0 - score / best) for document, score in ranked]
@@ -0,0 +1,47 @@
+from typing import List
+import numpy as np
+
+
+def mmr_select(
+    query_embedding,
+    candidate_embeddings,
+    k: int = 6,
+    lambda_mult: float = 0.7
+) -> List[int]:
+    """Pick ``k`` candidate positions by maximal marginal relevance.
+
+    Each step takes the candidate maximizing
+    ``lambda * sim(query, c) - (1 - lambda) * max sim(c, selected)``, so a chunk
+    that nearly repeats one already chosen loses to a slightly less relevant
+    chunk that adds new information. Similarities are cosine; the candidate
+    similarity matrix is computed once and the running maximum is updated in
+    place, so the loop does O(k * n) work on an ``n x n`` matrix.
+    """
+    candidates = np.asarray(candidate_embeddings, dtype=np.float32)
+    if len(candidates) == 0 or k <= 0:
+        return []
+    k = min(k, len(candidates))
+
+    norms = np.linalg.norm(candidates, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    candidates = candidates / norms
+    query = np.asarray(query_embedding, dtype=np.float32)
+    query = query / (np.linalg.norm(query) or 1.0)
+
+    relevance = candidates @ query
+    similarity = candidates @ candidates.T
+
+    selected = [int(np.argmax(relevance))]
+    max_similarity = similarity[selected[0]].copy()
+    available = np.ones(len(candidates), dtype=bool)
+    available[selected[0]] = False
+
+    for _ in range(k - 1):
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * max_similarity
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_similarity, similarity[best], out=max_similarity)
+
+    return selected
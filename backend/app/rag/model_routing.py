@@ -0,0 +1,84 @@
+import json
+import os
+from typing import Any, Dict, Optional
+from .slovak_text import tokenize
+
+DEFAULT_ROUTE: Dict[str, Any] = {
+    "model": "gpt-4-turbo-preview",
+    "temperature": 0.3,  # Factual but slightly creative for Slovak
+    "max_tokens": 1000
+}
+
+# Diacritic-free openers of questions that ask for a single fact
+FACTUAL_OPENERS = (
+    ("co", "je"), ("co", "su"), ("co", "znamena"), ("kto",), ("kedy",), ("kde",),
+    ("kolko",), ("aky", "je"), ("aka", "je"), ("ake", "je"), ("ake", "su"), ("ktory",), ("ktora",)
+)
+# Words that ask for an explanation rather than a fact
+EXPLANATORY_WORDS = frozenset(("preco", "ako", "vysvetli", "porovnaj", "popis", "rozdiel", "suvislost"))
+
+REQUEST_CLASSES = ("short_factual", "default")
+
+
+def classify_request(message: str, max_words: int = None) -> str:
+    """Classify a question as "short_factual" or "default" from its wording alone."""
+    max_words = max_words if max_words is not None else int(os.getenv("MITO_SHORT_QUESTION_WORDS", "12"))
+    tokens = tokenize(message)
+    if not tokens or len(tokens) > max_words or EXPLANATORY_WORDS.intersection(tokens):
+        return "default"
+    if any(tuple(tokens[:len(opener)]) == opener for opener in FACTUAL_OPENERS):
+        return "short_factual"
+    return "default"
+
+
+class ModelRouter:
+    """Picks the chat model settings for a variant and request class.
+
+    Routes are layered: the default route, then the variant's overrides, then
+    the request class overrides (a variant may override classes too)::
+
+        {
+          "default": {"model": "gpt-4-turbo-preview", "max_tokens": 1000},
+          "variants": {"semantic": {"model": "gpt-4o"}},
+          "classes": {"short_factual": {"model": "gpt-4o-mini", "max_tokens": 400}}
+        }
+
+    A route may also name a ``hedge_model`` for the hedged second attempt.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or {}
+        self.default = {**DEFAULT_ROUTE, **config.get("default", {})}
+        self.variants = config.get("variants", {})
+        self.classes = config.get("classes", {})
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        """Read routes from MITO_MODEL_ROUTES (inline JSON) or MITO_MODEL_ROUTES_FILE."""
+        inline = os.getenv("MITO_MODEL_ROUTES")
+        path = os.getenv("MITO_MODEL_ROUTES_FILE")
+        try:
+            if inline:
+                return cls(json.loads(inline))
+            if path:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return cls(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"❌ Invalid model routes ({e}), using {DEFAULT_ROUTE['model']} for everything")
+        return cls()
+
+    def route(self, variant: str, request_class: str = "default") -> Dict[str, Any]:
+        """Model settings for one request."""
+        variant_config = dict(self.variants.get(variant, {}))
+        variant_classes = variant_config.pop("classes", {})
+        return {
+            **self.default,
+            **variant_config,
+            **self.classes.get(request_class, {}),
+            **variant_classes.get(request_class, {})
+        }
+
+    def route_message(self, variant: str, message: str) -> Dict[str, Any]:
+        """Classify the message and return its route, with the class under "request_class"."""
+        request_class = classify_request(message)
+        return {**self.route(variant, request_class), "request_class": request_class}
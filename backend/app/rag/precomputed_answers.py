@@ -0,0 +1,261 @@
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from .vectors import normalize
+
+CLUSTERS_DIR = "clusters"
+ANSWERS_FILE = "answers.json"
+
+# Answers the chain returns when generation failed; never precomputed
+ERROR_ANSWER_PREFIX = "Prepáčte, nastala chyba"
+
+
+def precomputed_root() -> str:
+    return os.getenv("MITO_PRECOMPUTED_DIR", "./precomputed_answers")
+
+
+def cluster_questions(
+    questions: List[str],
+    embeddings,
+    threshold: float = 0.9,
+    max_members: int = 50
+) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+    """Group near-duplicate questions by embedding similarity.
+
+    ``questions`` may repeat; repeats count towards a cluster's frequency and
+    ``embeddings`` has one row per distinct question in first-seen order.
+    Distinct questions are visited from most to least frequent and join the
+    first cluster whose leader is at least ``threshold`` cosine-similar, so the
+    most asked wording leads its cluster. Returns the clusters, most asked
+    first, and the member vectors (the rows each cluster's "members" refer to).
+    """
+    counts: Dict[str, int] = {}
+    for question in questions:
+        counts[question] = counts.get(question, 0) + 1
+    distinct = list(counts)
+    vectors = normalize(np.asarray(embeddings, dtype=np.float32))
+
+    order = sorted(range(len(distinct)), key=lambda i: -counts[distinct[i]])
+    leaders: List[int] = []
+    assignment: Dict[int, List[int]] = {}
+    for i in order:
+        if leaders:
+            similarity = vectors[leaders] @ vectors[i]
+            best = int(np.argmax(similarity))
+            if similarity[best] >= threshold:
+                assignment[leaders[best]].append(i)
+                continue
+        leaders.append(i)
+        assignment[i] = [i]
+
+    clusters = []
+    for leader in leaders:
+        members = assignment[leader][:max_members]
+        clusters.append({
+            "question": distinct[leader],
+            "count": sum(counts[distinct[i]] for i in assignment[leader]),
+            "members": [distinct[i] for i in members],
+            "rows": members
+        })
+    clusters.sort(key=lambda cluster: -cluster["count"])
+
+    # Re-number member rows so each cluster's vectors are contiguous
+    if not clusters:
+        return [], np.empty((0, vectors.shape[-1]), dtype=np.float32)
+    member_vectors, next_row = [], 0
+    for cluster_id, cluster in enumerate(clusters):
+        cluster["id"] = cluster_id
+        member_vectors.append(vectors[cluster.pop("rows")])
+        cluster["member_rows"] = [next_row, next_row + len(cluster["members"])]
+        next_row += len(cluster["members"])
+    return clusters, np.concatenate(member_vectors)
+
+
+def save_clusters(root: str, clusters: List[Dict[str, Any]], member_vectors: np.ndarray, embedding_model: str):
+    path = os.path.join(root, CLUSTERS_DIR)
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "members.npy"), member_vectors.astype(np.float32))
+    with open(os.path.join(path, "clusters.json"), 'w', encoding='utf-8') as f:
+        json.dump({
+            "created_at": datetime.now().isoformat(),
+            "embedding_model": embedding_model,
+            "clusters": clusters
+        }, f, ensure_ascii=False, indent=2)
+
+
+def load_clusters(root: str) -> Optional[Tuple[Dict[str, Any], np.ndarray]]:
+    """Return (clusters.json contents, member vectors), or None if no clusters were saved."""
+    path = os.path.join(root, CLUSTERS_DIR)
+    if not os.path.exists(os.path.join(path, "clusters.json")):
+        return None
+    with open(os.path.join(path, "clusters.json"), 'r', encoding='utf-8') as f:
+        info = json.load(f)
+    return info, np.load(os.path.join(path, "members.npy"))
+
+
+def answers_path(root: str, variant: str, index_version: Optional[str]) -> str:
+    return os.path.join(root, variant, index_version or "legacy", ANSWERS_FILE)
+
+
+def save_answers(
+    root: str,
+    variant: str,
+    index_version: Optional[str],
+    answers: List[Dict[str, Any]],
+    clusters_created_at: str
+):
+    """Write answers for one index version; written to a temp file and renamed so readers never see half a file."""
+    path = answers_path(root, variant, index_version)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "variant": variant,
+            "index_version": index_version,
+            "generated_at": datetime.now().isoformat(),
+            "clusters_created_at": clusters_created_at,
+            "answers": answers
+        }, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def discard_answers(root: str, variant: str, index_version: Optional[str]) -> bool:
+    """Remove the answers of one index version once its articles changed; precompute_answers.py regenerates them."""
+    path = answers_path(root, variant, index_version)
+    if not os.path.exists(path):
+        return False
+    os.remove(path)
+    return True
+
+
+async def answer_clusters(variant: str, root: str, top: int) -> bool:
+    """Answer the top clusters with the variant's current index and store the answers."""
+    stored = load_clusters(root)
+    if stored is None:
+        print(f"❌ No question clusters in {root}; run with --questions first")
+        return False
+    info, _ = stored
+
+    # The factory builds chains, which import this module
+    from .rag_factory import RAGServiceFactory
+    chain = RAGServiceFactory.create_rag_chain(variant)
+    version = chain.vector_store.index_version
+    print(f"\n💬 Answering {min(top, len(info['clusters']))} clusters with {variant} "
+          f"index version {version or 'legacy'}...")
+
+    answers = []
+    for cluster in info["clusters"][:top]:
+        response = await chain.chat(cluster["question"])
+        if response.response.startswith(ERROR_ANSWER_PREFIX):
+            print(f"  ⚠️  Skipping '{cluster['question']}': {response.response}")
+            continue
+        if response.degraded:
+            print(f"  ⚠️  Skipping '{cluster['question']}': answered without generation (OpenAI unavailable)")
+            continue
+        answers.append({
+            "cluster_id": cluster["id"],
+            "question": cluster["question"],
+            "count": cluster["count"],
+            "response": response.response,
+            "sources": [source.model_dump(mode="json") for source in response.sources],
+            "model": response.usage.model if response.usage else None
+        })
+        print(f"  ✅ {cluster['question']} ({cluster['count']}x)")
+
+    save_answers(root, variant, version, answers, info["created_at"])
+    print(f"💾 Stored {len(answers)} {variant} answers for index version {version or 'legacy'}")
+    chain.vector_store.close()
+    return True
+
+
+def regenerate_answers(variant: str, top: int = None, root: str = None) -> bool:
+    """Answer the stored clusters again for the variant's now current index (no-op without clusters)."""
+    root = root or precomputed_root()
+    if load_clusters(root) is None:
+        return False
+    top = top or int(os.getenv("MITO_PRECOMPUTED_TOP", "50"))
+    return asyncio.run(answer_clusters(variant, root, top))
+
+
+class PrecomputedAnswers:
+    """Precomputed answers of one variant and index version, matched by query embedding.
+
+    A query matches a cluster when it is at least ``threshold`` cosine-similar
+    to one of the cluster's member questions. Answers generated for another
+    index version are never served. Files that are not there yet (the job runs
+    after a reindex is published) are looked for again every ``recheck_interval``
+    seconds.
+    """
+
+    def __init__(
+        self,
+        variant: str,
+        index_version: Optional[str],
+        root: str = None,
+        threshold: float = None,
+        recheck_interval: float = 60.0
+    ):
+        self.variant = variant
+        self.index_version = index_version
+        self.root = root or precomputed_root()
+        self.threshold = threshold if threshold is not None else float(os.getenv("MITO_PRECOMPUTED_THRESHOLD", "0.93"))
+        self.recheck_interval = recheck_interval
+        self.answers: Dict[int, Dict[str, Any]] = {}
+        self.member_vectors: Optional[np.ndarray] = None
+        self.member_clusters: Optional[np.ndarray] = None
+        self._checked_at = None
+
+    def _load(self):
+        self._checked_at = time.monotonic()
+        path = answers_path(self.root, self.variant, self.index_version)
+        clusters = load_clusters(self.root)
+        if clusters is None or not os.path.exists(path):
+            return
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            info, member_vectors = clusters
+            if stored.get("clusters_created_at") != info["created_at"]:
+                print(f"Precomputed answers at {path} belong to older question clusters, ignoring them")
+                return
+            answers = {entry["cluster_id"]: entry for entry in stored["answers"]}
+            rows, owners = [], []
+            for cluster in info["clusters"]:
+                if cluster["id"] in answers:
+                    start, end = cluster["member_rows"]
+                    rows.extend(range(start, end))
+                    owners.extend([cluster["id"]] * (end - start))
+            self.member_vectors = member_vectors[rows]
+            self.member_clusters = np.asarray(owners, dtype=np.int64)
+            self.answers = answers
+            print(f"Loaded {len(answers)} precomputed {self.variant} answers for index version {self.index_version or 'legacy'}")
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error loading precomputed answers from {path}: {e}")
+
+    def lookup(self, query_embedding) -> Optional[Dict[str, Any]]:
+        """The precomputed answer for a query, with its "similarity", or None."""
+        if not self.answers and (
+            self._checked_at is None or time.monotonic() - self._checked_at >= self.recheck_interval
+        ):
+            self._load()
+        if not self.answers or self.member_vectors is None or len(self.member_vectors) == 0:
+            return None
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        similarity = self.member_vectors @ (query / (np.linalg.norm(query) or 1.0))
+        best = int(np.argmax(similarity))
+        if similarity[best] < self.threshold:
+            return None
+        return {**self.answers[int(self.member_clusters[best])], "similarity": float(similarity[best])}
+
+    def invalidate(self) -> bool:
+        """Stop serving the loaded answers and remove their file (the index they were generated from changed)."""
+        self.answers = {}
+        self.member_vectors = None
+        self.member_clusters = None
+        self._checked_at = time.monotonic()
+        return discard_answers(self.root, self.variant, self.index_version)
@@ -0,0 +1,138 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Leaf frames of threads that are blocked waiting rather than running
+# (event loop polling, idle thread pool workers, lock waits)
+IDLE_LEAVES = frozenset({
+    ("selectors.py", "EpollSelector.select"), ("selectors.py", "_PollLikeSelector.select"),
+    ("threading.py", "Condition.wait"), ("threading.py", "Event.wait"),
+    ("threading.py", "Thread._wait_for_tstate_lock"), ("queue.py", "Queue.get"),
+    ("thread.py", "_worker"),
+    ("runners.py", "Runner.run"),  # uvloop polls in C below the runner
+})
+
+PROFILE_NAME_PATTERN = re.compile(r"^[\w.-]+\.folded$")
+
+
+def profile_root() -> str:
+    return os.getenv("MITO_PROFILE_DIR", "./profiles")
+
+
+class SamplingProfiler:
+    """Samples the Python stacks of every thread of the process at a fixed interval.
+
+    A daemon thread reads ``sys._current_frames()`` every ``interval`` seconds
+    and counts each distinct stack, rooted at the thread name, in collapsed
+    ("folded") form: ``thread;outer (file:line);...;leaf (file:line) count``,
+    which flamegraph.pl and speedscope render directly. Threads blocked in
+    a wait (see IDLE_LEAVES) are skipped unless ``include_idle`` is set.
+    Nothing runs until ``start`` and after ``stop``.
+    """
+
+    def __init__(self, interval: float = 0.005, include_idle: bool = False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.duration = 0.0
+        self._labels: Dict[object, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            name = getattr(code, "co_qualname", code.co_name)
+            label = f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _is_idle(self, frame) -> bool:
+        code = frame.f_code
+        return (os.path.basename(code.co_filename), getattr(code, "co_qualname", code.co_name)) in IDLE_LEAVES
+
+    def _sample(self, own_ident: int, thread_names: Dict[int, str]):
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident or (not self.include_idle and self._is_idle(frame)):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(thread_names.get(ident, f"thread-{ident}"))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        thread_names: Dict[int, str] = {}
+        while not self._stop.wait(self.interval):
+            if self.samples % 100 == 0:
+                thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            self._sample(own_ident, thread_names)
+
+    def start(self) -> "SamplingProfiler":
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="mito-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.duration = time.perf_counter() - self.started_at
+        return self
+
+    def collapsed(self) -> str:
+        """The profile as collapsed stacks, most sampled first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit: int = 15) -> List[Dict[str, object]]:
+        """Functions by share of samples in which they were on the stack (inclusive) or the leaf (self)."""
+        inclusive: Counter = Counter()
+        exclusive: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]
+            for frame in set(frames):
+                inclusive[frame] += count
+            if frames:
+                exclusive[frames[-1]] += count
+        total = sum(self.stacks.values()) or 1
+        return [
+            {"function": frame, "inclusive": count / total, "self": exclusive[frame] / total}
+            for frame, count in inclusive.most_common(limit)
+        ]
+
+    def save(self, kind: str, root: str = None) -> str:
+        """Write the collapsed stacks to ``<root>/<kind>_<timestamp>_<pid>.folded``; returns the file name."""
+        root = root or profile_root()
+        os.makedirs(root, exist_ok=True)
+        name = f"{kind}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{os.getpid()}.folded"
+        with open(os.path.join(root, name), "w", encoding="utf-8") as f:
+            f.write(self.collapsed())
+        return name
+
+
+def list_profiles(root: str = None) -> List[Dict[str, object]]:
+    root = root or profile_root()
+    if not os.path.isdir(root):
+        return []
+    names = sorted((name for name in os.listdir(root) if PROFILE_NAME_PATTERN.match(name)), reverse=True)
+    return [{"name": name, "bytes": os.path.getsize(os.path.join(root, name))} for name in names]
+
+
+def profile_path(name: str, root: str = None) -> Optional[str]:
+    """Path of a saved profile, or None for names that are not profile files (or don't exist)."""
+    if not PROFILE_NAME_PATTERN.match(name):
+        return None
+    path = os.path.join(root or profile_root(), name)
+    return path if os.path.exists(path) else None
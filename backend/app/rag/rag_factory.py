@@ -1,50 +1,54 @@
-from typing import Dict
+from typing import Any, Dict, Union
 from .vector_store import MitoVectorStore
 from .chain import MitoRAGChain
-from .chunkers.fixed_size import FixedSizeChunker
-from .chunkers.semantic import SemanticChunker
+from .variants import load_variant_configs, create_chunker
 from app.models.types import RAGVariant
 
 class RAGServiceFactory:
-    """Factory for creating RAG services with different variants."""
-    
+    """Factory for creating RAG services with different variants.
+
+    Variants are defined in configuration (see app/rag/variants.py); the
+    RAGVariant members name the two built-in ones.
+    """
+
+    @staticmethod
+    def get_variant_config(variant: Union[RAGVariant, str]) -> Dict[str, Any]:
+        """Configuration of a variant; raises KeyError for an unknown one."""
+        name = variant.value if isinstance(variant, RAGVariant) else variant
+        configs = load_variant_configs()
+        if name not in configs:
+            raise KeyError(f"Unknown variant '{name}', configured: {', '.join(configs)}")
+        return configs[name]
+
     @staticmethod
-    def create_vector_store(variant: RAGVariant, persist_directory: str = "./chroma_db") -> MitoVectorStore:
+    def create_vector_store(variant: Union[RAGVariant, str], persist_directory: str = None) -> MitoVectorStore:
         """Create a vector store for the specified variant."""
-        if variant == RAGVariant.SEMANTIC:
-            persist_dir = persist_directory.replace("chroma_db", "chroma_db_semantic")
-        else:
-            persist_dir = persist_directory
-            
-        return MitoVectorStore(persist_directory=persist_dir, variant=variant.value)
-    
+        config = RAGServiceFactory.get_variant_config(variant)
+        return MitoVectorStore(
+            persist_directory=persist_directory or config["persist_directory"],
+            variant=config["name"]
+        )
+
     @staticmethod
-    def create_rag_chain(variant: RAGVariant, persist_directory: str = "./chroma_db") -> MitoRAGChain:
+    def create_rag_chain(variant: Union[RAGVariant, str], persist_directory: str = None) -> MitoRAGChain:
         """Create a complete RAG chain for the specified variant."""
         vector_store = RAGServiceFactory.create_vector_store(variant, persist_directory)
-        return MitoRAGChain(vector_store, variant)
-    
+        return MitoRAGChain(vector_store, vector_store.variant)
+
     @staticmethod
-    def create_chunker(variant: RAGVariant):
+    def create_chunker(variant: Union[RAGVariant, str]):
         """Create a chunker for the specified variant."""
-        if variant == RAGVariant.SEMANTIC:
-            return SemanticChunker()
-        else:
-            return FixedSizeChunker()
-    
+        return create_chunker(RAGServiceFactory.get_variant_config(variant))
+
     @staticmethod
-    def get_variant_display_name(variant: RAGVariant) -> str:
+    def get_variant_display_name(variant: Union[RAGVariant, str]) -> str:
         """Get display name for a variant."""
-        display_names = {
-            RAGVariant.FIXED_SIZE: "Fixed-Size Chunking",
-            RAGVariant.SEMANTIC: "Semantic Chunking"
-        }
-        return display_names.get(variant, variant.value)
-    
+        try:
+            return RAGServiceFactory.get_variant_config(variant)["display_name"]
+        except KeyError:
+            return variant.value if isinstance(variant, RAGVariant) else variant
+
     @staticmethod
-    def get_all_variants() -> Dict[RAGVariant, str]:
-        """Get all available variants with their display names."""
-        return {
-            variant: RAGServiceFactory.get_variant_display_name(variant)
-            for variant in RAGVariant
-        }
\ No newline at end of file
+    def get_all_variants() -> Dict[str, str]:
+        """Get all configured variants with their display names."""
+        return {name: config["display_name"] for name, config in load_variant_configs().items()}
@@ -0,0 +1,223 @@
+import asyncio
+import base64
+import os
+import threading
+from typing import Any, Dict, List, Optional
+import httpx
+import numpy as np
+import orjson
+from langchain.schema import Document
+
+
+class RemoteIndexError(Exception):
+    """Raised when the index server cannot answer a request."""
+
+
+def encode_vector(vector) -> str:
+    """float32 little-endian bytes, base64: a fifth of the size of a JSON float list."""
+    return base64.b64encode(np.asarray(vector, dtype="<f4").tobytes()).decode("ascii")
+
+
+def decode_vector(data: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(data), dtype="<f4")
+
+
+class RemoteIndexClient:
+    """Pooled async client for the index server (see index_server.py).
+
+    One ``httpx.AsyncClient`` with a bounded keep-alive pool runs on its own
+    event loop thread, so sync callers (``run``) and coroutines on the API's
+    loop (``arun``) share the same connections. Searches submitted within
+    ``batch_window`` seconds of each other go out as one multi-query request of
+    up to ``max_batch`` queries, and the server scans each index once for all of
+    them. A query the server cannot answer fails only its own caller. Requests
+    time out after ``timeout`` seconds; connection errors, timeouts and 5xx
+    answers are retried ``retries`` times with backoff.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 2.0,
+        retries: int = 2,
+        max_connections: int = 32,
+        batch_window: float = 0.001,
+        max_batch: int = 32
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.max_connections = max_connections
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.requests = 0
+        self.batched_queries = 0
+        self.retried = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._pending: List[tuple] = []
+        self._flush_handle = None
+        self._start_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, base_url: str = None) -> "RemoteIndexClient":
+        return cls(
+            base_url or os.getenv("MITO_INDEX_URL", "http://127.0.0.1:8100"),
+            timeout=float(os.getenv("MITO_INDEX_TIMEOUT", "2.0")),
+            retries=int(os.getenv("MITO_INDEX_RETRIES", "2")),
+            max_connections=int(os.getenv("MITO_INDEX_MAX_CONNECTIONS", "32")),
+            batch_window=float(os.getenv("MITO_INDEX_BATCH_WINDOW_MS", "1")) / 1000,
+            max_batch=int(os.getenv("MITO_INDEX_MAX_BATCH", "32"))
+        )
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    timeout=httpx.Timeout(self.timeout),
+                    limits=httpx.Limits(max_connections=self.max_connections,
+                                        max_keepalive_connections=self.max_connections)
+                )
+                self._thread = threading.Thread(target=loop.run_forever, name="mito-index-client", daemon=True)
+                self._thread.start()
+                self._loop = loop
+        return self._loop
+
+    def run(self, coroutine):
+        """Run a client coroutine from sync code and wait for its result."""
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            coroutine.close()
+            raise RuntimeError("RemoteIndexClient.run() called from the client loop; await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+    async def arun(self, coroutine):
+        """Await a client coroutine from any event loop without blocking it."""
+        loop = self._ensure_loop()
+        if asyncio.get_running_loop() is loop:
+            return await coroutine
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, loop))
+
+    async def _request(self, method: str, path: str, payload: Dict[str, Any] = None) -> Any:
+        content = orjson.dumps(payload) if payload is not None else None
+        headers = {"content-type": "application/json"} if content is not None else None
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.retried += 1
+                await asyncio.sleep(0.05 * 2 ** (attempt - 1))
+            try:
+                self.requests += 1
+                response = await self._client.request(method, path, content=content, headers=headers)
+            except httpx.TransportError as e:  # connect/read errors and timeouts
+                error = f"{type(e).__name__}: {e}"
+                continue
+            if response.status_code >= 500:
+                error = f"HTTP {response.status_code}"
+                continue
+            if response.status_code >= 400:
+                raise RemoteIndexError(f"Index server {method} {path}: HTTP {response.status_code} {response.text[:200]}")
+            return orjson.loads(response.content)
+        raise RemoteIndexError(f"Index server {self.base_url} {method} {path} failed after "
+                               f"{self.retries + 1} attempts: {error}")
+
+    def _flush(self):
+        self._flush_handle = None
+        pending, self._pending = self._pending, []
+        for start in range(0, len(pending), self.max_batch):
+            self._loop.create_task(self._send(pending[start:start + self.max_batch]))
+
+    async def _send(self, batch: List[tuple]):
+        """Send queued queries as one request; each caller gets its own query's hits or error."""
+        try:
+            data = await self._request("POST", "/search", {"queries": [query for query, _ in batch]})
+        except Exception as e:
+            # The request itself failed (server unreachable, timeout): no query was answered
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batched_queries += len(batch)
+        for (query, future), outcome in zip(batch, data["results"]):
+            if future.done():
+                continue
+            if isinstance(outcome, dict):
+                future.set_exception(RemoteIndexError(
+                    f"Index server POST /search ({query['variant']}): HTTP {outcome['status']} {outcome['error'][:200]}"
+                ))
+            else:
+                future.set_result(outcome)
+
+    async def _search(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Queue one query for the next multi-query request (runs on the client loop)."""
+        future = self._loop.create_future()
+        self._pending.append((query, future))
+        if len(self._pending) >= self.max_batch:
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(self.batch_window, self._flush)
+        return await future
+
+    async def asearch(
+        self,
+        variant: str,
+        embedding,
+        k: int = 6,
+        topics: Optional[List[str]] = None,
+        candidates: int = 48,
+        articles: int = 0,
+        with_vectors: bool = False
+    ) -> List[tuple]:
+        """(Document, distance) pairs, or (Document, distance, vector) with ``with_vectors``.
+
+        With ``articles`` only the chunks of that many top articles are searched
+        (coarse-to-fine, see article_index.py).
+        """
+        query = {"variant": variant, "embedding": encode_vector(embedding), "k": k, "candidates": candidates,
+                 "topics": topics or None, "articles": articles, "with_vectors": with_vectors}
+        hits = await self.arun(self._search(query))
+        results = []
+        for hit in hits:
+            document = Document(page_content=hit["text"], metadata=hit["metadata"] or {})
+            if with_vectors:
+                results.append((document, hit["distance"], decode_vector(hit["vector"])))
+            else:
+                results.append((document, hit["distance"]))
+        return results
+
+    def search(self, *args, **kwargs) -> List[tuple]:
+        return self.run(self.asearch(*args, **kwargs))
+
+    async def alexical_search(self, variant: str, query: str, k: int = 6) -> List[tuple]:
+        """(Document, distance) pairs from the server's keyword index; no query embedding needed."""
+        data = await self.arun(self._request("POST", "/lexical", {"variant": variant, "query": query, "k": k}))
+        return [(Document(page_content=hit["text"], metadata=hit["metadata"] or {}), hit["distance"])
+                for hit in data["results"]]
+
+    def lexical_search(self, *args, **kwargs) -> List[tuple]:
+        return self.run(self.alexical_search(*args, **kwargs))
+
+    def stats(self, variant: str) -> Dict[str, Any]:
+        """Version and document count of the index the server serves for ``variant``."""
+        return self.run(self._request("GET", f"/variants/{variant}"))
+
+    def close(self):
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+
+
+# Clients by index server URL, shared by the vector stores of every variant
+_shared_clients: Dict[str, RemoteIndexClient] = {}
+
+def shared_remote_index(base_url: str = None) -> RemoteIndexClient:
+    base_url = base_url or os.getenv("MITO_INDEX_URL", "http://127.0.0.1:8100")
+    if base_url not in _shared_clients:
+        _shared_clients[base_url] = RemoteIndexClient.from_env(base_url)
+    return _shared_clients[base_url]
@@ -0,0 +1,97 @@
+import re
+from typing import List, Tuple
+
+# Lowercased words that are followed by a period without ending the sentence.
+# Units (mg, kg, nm, ...) are written without a period in Slovak, and "atď."
+# usually does end a sentence, so neither is listed.
+SLOVAK_ABBREVIATIONS = frozenset({
+    # Titles
+    'bc', 'dr', 'doc', 'ing', 'judr', 'mgr', 'mudr', 'mvdr', 'paeddr', 'phd', 'phdr',
+    'prof', 'rndr', 'thdr',
+    # Common abbreviations
+    'al', 'apod', 'cca', 'č', 'ev', 'hod', 'mil', 'mld', 'napr', 'obr', 'ods', 'písm',
+    'pod', 'pozn', 'príp', 'resp', 'roč', 'str', 'sv', 'tab', 'tis', 'tzn', 'tzv', 'vs',
+    'vyd', 'zák', 'zv'
+})
+
+UPPERCASE = "A-ZÁÄČĎÉÍĹĽŇÓÔŔŠŤÚÝŽ"
+LONGEST_ABBREVIATION = max(len(abbreviation) for abbreviation in SLOVAK_ABBREVIATIONS)
+
+# One pass over the text finds both kinds of boundaries:
+#   - sentence-final punctuation (with closing quotes/brackets) followed by
+#     whitespace and an uppercase letter, or by the end of the text
+#   - line breaks, which separate paragraphs and headings in the articles
+BOUNDARY_PATTERN = re.compile(
+    rf'(?P<punct>[.!?…]+)(?P<close>["\'“”»)\]]*)(?=\s+["„“«(\[]?[{UPPERCASE}]|\s*$)'
+    r'|(?P<newline>[^\S\n]*\n\s*)'
+)
+WORD_BEFORE_PATTERN = re.compile(r'\w+$')
+
+
+def _append_span(text: str, start: int, end: int, spans: List[Tuple[int, int]]):
+    """Append [start, end) trimmed of surrounding whitespace, if anything is left."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    if start < end:
+        spans.append((start, end))
+
+
+def _ends_with_abbreviation(text: str, end: int) -> bool:
+    """Whether the word right before position ``end`` is a known abbreviation."""
+    window_start = max(0, end - LONGEST_ABBREVIATION - 1)
+    word = WORD_BEFORE_PATTERN.search(text, window_start, end)
+    if word is None or (word.start() == window_start and window_start > 0):
+        # No word, or one longer than any abbreviation
+        return False
+    return word.group().lower() in SLOVAK_ABBREVIATIONS
+
+
+def split_sentence_spans(text: str) -> List[Tuple[int, int]]:
+    """Split Slovak text into sentences, returned as (start, end) character offsets.
+
+    Periods after known abbreviations ("napr.", "tzv.", "MUDr.") do not end a
+    sentence. Offsets index into ``text``, so callers can slice it lazily.
+    """
+    spans: List[Tuple[int, int]] = []
+    start = 0
+    for match in BOUNDARY_PATTERN.finditer(text):
+        if match.group('newline') is not None:
+            end = match.start()
+        else:
+            if match.group('punct') == '.' and _ends_with_abbreviation(text, match.start()):
+                continue
+            end = match.end()
+        _append_span(text, start, end, spans)
+        start = end
+    _append_span(text, start, len(text), spans)
+    return spans
+
+
+def merge_short_spans(spans: List[Tuple[int, int]], min_chars: int) -> List[Tuple[int, int]]:
+    """Attach spans shorter than ``min_chars`` (headings, "Prečo?") to the following span.
+
+    A short trailing span is attached to the previous one instead.
+    """
+    merged: List[Tuple[int, int]] = []
+    pending_start = None
+    for start, end in spans:
+        if pending_start is not None:
+            start, pending_start = pending_start, None
+        if end - start < min_chars:
+            pending_start = start
+            continue
+        merged.append((start, end))
+
+    if pending_start is not None:
+        if merged:
+            merged[-1] = (merged[-1][0], spans[-1][1])
+        else:
+            merged.append((pending_start, spans[-1][1]))
+    return merged
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split Slovak text into sentence strings."""
+    return [text[start:end] for start, end in split_sentence_spans(text)]
@@ -0,0 +1,43 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def fold_diacritics(text: str) -> str:
+    """Lowercase text and strip diacritics ("Hormóny" -> "hormony")."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase, diacritic-free word tokens."""
+    return TOKEN_PATTERN.findall(fold_diacritics(text))
+
+
+# Case and number endings of Slovak nouns and adjectives, diacritics folded,
+# longest first; a light stemmer only strips inflection, not derivation
+SUFFIXES = tuple(sorted((
+    "atami", "iami", "ovia", "ovej", "ovho", "ovym",
+    "ami", "ach", "ata", "aty", "eho", "emu", "iach", "iam", "iou", "och", "ych", "ymi", "imi",
+    "ove", "ova", "ovi", "ovu", "ej", "ou", "om", "ov", "mi", "ym", "im", "ia", "ie", "iu", "ii", "ho", "mu",
+    "a", "e", "i", "o", "u", "y"
+), key=len, reverse=True))
+MIN_STEM_LENGTH = 3
+
+
+@lru_cache(maxsize=65536)  # a corpus has a few ten thousand distinct words
+def stem(token: str) -> str:
+    """Strip the longest inflectional ending that leaves a stem of at least three letters
+    ("mitochondrie", "mitochondriach" -> "mitochondr")."""
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM_LENGTH:
+            return token[:-len(suffix)]
+    return token
+
+
+def stem_tokens(text: str) -> List[str]:
+    """Diacritic-free, stemmed word tokens for keyword search."""
+    return [stem(token) for token in tokenize(text)]
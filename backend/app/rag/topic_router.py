@@ -0,0 +1,73 @@
+import os
+from typing import Dict, List, Optional, Tuple
+from .slovak_text import tokenize
+
+# Query keyword stems per topic, matched as prefixes of diacritic-free tokens.
+# Topic names match the ones assigned to articles at ingest.
+TOPIC_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    'epigenetika': ("epigenet", "dna", "metylac", "transgenerac", "genom"),
+    'mitochondrie': ("mitochond", "atp", "redox", "elektron", "dychac"),
+    'hormóny': (
+        "hormon", "kortizol", "inzulin", "leptin", "melatonin", "estrogen",
+        "testosteron", "stitn", "tyreo", "cholesterol", "pregnenolon", "nadoblick"
+    ),
+    'kvantová biológia': ("kvant", "foton", "biofoton", "polovodic", "supravodiv", "tunelov"),
+}
+
+# Articles that match no topic; a keyword can't rule them out, so routed searches always include them
+FALLBACK_TOPIC = 'ostatné'
+
+
+def keyword_hits(text: str, keywords: Dict[str, Tuple[str, ...]] = None) -> Dict[str, int]:
+    """Count keyword hits per topic."""
+    tokens = tokenize(text)
+    hits = {}
+    for topic, stems in (keywords or TOPIC_KEYWORDS).items():
+        count = sum(1 for token in tokens if token.startswith(stems))
+        if count:
+            hits[topic] = count
+    return hits
+
+
+class TopicRouter:
+    """Cheap keyword router that maps a query to the topic partitions worth searching.
+
+    Returns no topics (i.e. search globally) unless the query contains enough
+    topic keywords and one topic set clearly dominates. Routed searches also
+    cover the FALLBACK_TOPIC partition.
+    """
+
+    def __init__(
+        self,
+        keywords: Dict[str, Tuple[str, ...]] = None,
+        min_hits: int = None,
+        min_confidence: float = None
+    ):
+        self.keywords = keywords or TOPIC_KEYWORDS
+        self.min_hits = min_hits if min_hits is not None else int(os.getenv("MITO_ROUTING_MIN_HITS", "1"))
+        self.min_confidence = (
+            min_confidence if min_confidence is not None
+            else float(os.getenv("MITO_ROUTING_MIN_CONFIDENCE", "0.6"))
+        )
+
+    def score(self, query: str) -> Dict[str, int]:
+        """Count keyword hits per topic."""
+        return keyword_hits(query, self.keywords)
+
+    def route(self, query: str) -> Tuple[Optional[List[str]], float]:
+        """Return (topics to search or None for global search, confidence)."""
+        hits = self.score(query)
+        total = sum(hits.values())
+        if total < self.min_hits:
+            return None, 0.0
+
+        best = max(hits.values())
+        confidence = best / total
+        if confidence < self.min_confidence:
+            return None, confidence
+
+        # Keep every topic that is at least half as strong as the best one
+        topics = sorted(topic for topic, count in hits.items() if count * 2 >= best)
+        if FALLBACK_TOPIC not in topics:
+            topics.append(FALLBACK_TOPIC)
+        return topics, confidence
@@ -0,0 +1,219 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Dict, List
+import numpy as np
+from .compact_index import StringTable
+from .hot_swap import HotSwapChain
+from .rag_factory import RAGServiceFactory
+from .variants import load_variant_configs
+
+
+def _process_rss_bytes() -> int:
+    """Resident set size of this process (Linux), 0 where it cannot be read."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def _mapped_rss_bytes(directory: str) -> int:
+    """Resident bytes of this process's mappings of files below ``directory`` (Linux)."""
+    prefix = os.path.abspath(directory) + os.sep
+    total, inside = 0, False
+    try:
+        with open("/proc/self/smaps", "r") as f:
+            for line in f:
+                parts = line.split()
+                if not parts[0].endswith(":"):
+                    # Mapping header: address range, perms, offset, device, inode[, path]
+                    inside = len(parts) > 5 and parts[5].startswith(prefix)
+                elif inside and parts[0] == "Rss:":
+                    total += int(parts[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        return 0
+    return total
+
+
+def index_resident_bytes(vector_store, load_rss_bytes: int) -> int:
+    """Memory an opened index holds in this process.
+
+    Artifact indexes are measured exactly: their in-memory arrays plus the pages
+    of their memory-mapped files that are resident. Chroma-backed indexes are
+    estimated by how much the process grew while opening them.
+    """
+    index = vector_store.compact_index
+    if index is None or vector_store.vectorstore is not None:
+        return load_rss_bytes
+    heap = sum(
+        array.nbytes for array in (index.compact, index.scales, index.full_vectors)
+        if array is not None and not isinstance(array, np.memmap)
+    )
+    if not isinstance(index.texts, StringTable):
+        heap += sum(len(text) for text in index.texts)
+    return int(heap + (_mapped_rss_bytes(index.path) if index.path else 0))
+
+
+class VariantRegistry:
+    """Serving chains of the configured variants, loaded on first use.
+
+    Each variant gets a HotSwapChain that opens its index on the first request.
+    With a memory budget, variants that have been idle for ``idle_seconds`` are
+    evicted, least recently used first, while the loaded indexes exceed the
+    budget; the next request for an evicted variant loads it again. The default
+    variant (served by /api/chat) and variants marked ``pinned`` stay loaded.
+    """
+
+    def __init__(
+        self,
+        configs: Dict[str, Dict[str, Any]],
+        default_variant: str = "fixed",
+        memory_budget_bytes: int = 0,
+        idle_seconds: float = 300.0
+    ):
+        self.configs = configs
+        self.default_variant = default_variant if default_variant in configs else next(iter(configs))
+        self.memory_budget_bytes = memory_budget_bytes
+        self.idle_seconds = idle_seconds
+        self.evictions = 0
+        self._managers: Dict[str, HotSwapChain] = {}
+        self._last_used: Dict[str, float] = {}
+        self._load_rss: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "VariantRegistry":
+        return cls(
+            load_variant_configs(),
+            default_variant=os.getenv("MITO_DEFAULT_VARIANT", "fixed"),
+            memory_budget_bytes=int(float(os.getenv("MITO_VARIANT_MEMORY_BUDGET_MB", "0")) * 1024 * 1024),
+            idle_seconds=float(os.getenv("MITO_VARIANT_IDLE_SECONDS", "300"))
+        )
+
+    def names(self) -> List[str]:
+        return list(self.configs)
+
+    def display_name(self, name: str) -> str:
+        return self.configs[name]["display_name"]
+
+    def compare_variants(self) -> List[str]:
+        """Variants /api/chat/compare answers with."""
+        return [name for name, config in self.configs.items() if config["compare"]]
+
+    def is_pinned(self, name: str) -> bool:
+        return name == self.default_variant or self.configs[name]["pinned"]
+
+    def manager(self, name: str) -> HotSwapChain:
+        """The variant's hot-swappable chain holder; raises KeyError for an unknown variant."""
+        if name not in self.configs:
+            raise KeyError(name)
+        with self._lock:
+            if name not in self._managers:
+                self._managers[name] = HotSwapChain(name, partial(self._load, name))
+            return self._managers[name]
+
+    def managers(self) -> Dict[str, HotSwapChain]:
+        """Holders of every variant requested so far (loaded or evicted)."""
+        with self._lock:
+            return dict(self._managers)
+
+    def _load(self, name: str):
+        before = _process_rss_bytes()
+        chain = RAGServiceFactory.create_rag_chain(name)
+        self._load_rss[name] = max(0, _process_rss_bytes() - before)
+        self._last_used[name] = time.monotonic()
+        return chain
+
+    def get(self, name: str):
+        """The variant's current chain, loading it (and enforcing the budget) if needed."""
+        manager = self.manager(name)
+        loaded = manager.loaded
+        chain = manager.get()
+        self._last_used[name] = time.monotonic()
+        if not loaded:
+            self.enforce_budget()
+        return chain
+
+    @contextmanager
+    def lease(self, name: str):
+        """Use a variant's chain for one request; it is not evicted while leased."""
+        manager = self.manager(name)
+        loaded = manager.loaded
+        with manager.lease() as chain:
+            self._last_used[name] = time.monotonic()
+            if not loaded:
+                self.enforce_budget()
+            try:
+                yield chain
+            finally:
+                self._last_used[name] = time.monotonic()
+
+    def preload(self):
+        """Open the indexes that should serve without a cold start.
+
+        Without a budget that is every variant; with one, the pinned ones.
+        """
+        for name in self.configs:
+            if not self.memory_budget_bytes or self.is_pinned(name):
+                self.get(name)
+
+    def resident_bytes(self, name: str) -> int:
+        manager = self._managers.get(name)
+        chain = manager.peek() if manager is not None else None
+        if chain is None:
+            return 0
+        try:
+            return index_resident_bytes(chain.vector_store, self._load_rss.get(name, 0))
+        except Exception:
+            return self._load_rss.get(name, 0)
+
+    def enforce_budget(self) -> List[str]:
+        """Evict idle, unpinned variants (least recently used first) while over the memory budget."""
+        if not self.memory_budget_bytes:
+            return []
+        sizes = {name: self.resident_bytes(name) for name, manager in self.managers().items() if manager.loaded}
+        total = sum(sizes.values())
+        now = time.monotonic()
+        evicted = []
+        for name in sorted(sizes, key=lambda name: self._last_used.get(name, 0.0)):
+            if total <= self.memory_budget_bytes:
+                break
+            if self.is_pinned(name) or now - self._last_used.get(name, 0.0) < self.idle_seconds:
+                continue
+            if self._managers[name].unload():
+                total -= sizes[name]
+                evicted.append(name)
+                self.evictions += 1
+                print(f"♻️  Evicted variant '{name}' ({sizes[name] / 1024 / 1024:.1f} MB, "
+                      f"idle {now - self._last_used[name]:.0f}s); loaded variants now use {total / 1024 / 1024:.1f} MB")
+        return evicted
+
+    def status(self) -> Dict[str, Any]:
+        """Loaded state, resident size and idle time of every configured variant."""
+        now = time.monotonic()
+        managers = self.managers()
+        variants = []
+        for name, config in self.configs.items():
+            manager = managers.get(name)
+            chain = manager.peek() if manager is not None else None
+            variants.append({
+                "name": name,
+                "display_name": config["display_name"],
+                "chunker": config["chunker"],
+                "loaded": chain is not None,
+                "pinned": self.is_pinned(name),
+                "index_version": chain.vector_store.index_version if chain is not None else None,
+                "resident_bytes": self.resident_bytes(name),
+                "in_flight": manager.in_flight if manager is not None else 0,
+                "idle_seconds": round(now - self._last_used[name], 1) if name in self._last_used else None
+            })
+        return {
+            "default_variant": self.default_variant,
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "resident_bytes": sum(variant["resident_bytes"] for variant in variants),
+            "evictions": self.evictions,
+            "variants": variants
+        }
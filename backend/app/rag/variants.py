@@ -0,0 +1,86 @@
+import json
+import os
+from typing import Any, Dict, List
+
+# The two variants served before variants became configurable; their indexes
+# keep their original directories
+DEFAULT_VARIANTS: List[Dict[str, Any]] = [
+    {
+        "name": "fixed",
+        "display_name": "Fixed-Size Chunking",
+        "chunker": "fixed_size",
+        "persist_directory": "./chroma_db"
+    },
+    {
+        "name": "semantic",
+        "display_name": "Semantic Chunking",
+        "chunker": "semantic",
+        "persist_directory": "./chroma_db_semantic"
+    }
+]
+
+CHUNKER_TYPES = ("fixed_size", "semantic")
+
+
+def _complete(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill in the defaults of one variant definition."""
+    if not entry.get("name"):
+        raise ValueError(f"Variant without a name: {entry}")
+    chunker = entry.get("chunker", "fixed_size")
+    if chunker not in CHUNKER_TYPES:
+        raise ValueError(f"Variant '{entry['name']}' has unknown chunker '{chunker}', expected one of {CHUNKER_TYPES}")
+    return {
+        "display_name": entry["name"],
+        "chunker_params": {},
+        "persist_directory": f"./chroma_db_{entry['name']}",
+        "compare": True,  # Answered by /api/chat/compare
+        "pinned": False,  # Never evicted from memory
+        **entry,
+        "chunker": chunker
+    }
+
+
+def load_variant_configs() -> Dict[str, Dict[str, Any]]:
+    """Variant definitions from MITO_VARIANTS (inline JSON) or MITO_VARIANTS_FILE, by name.
+
+    Each variant is a JSON object; only ``name`` is required::
+
+        [
+          {"name": "fixed"},
+          {"name": "semantic"},
+          {"name": "semantic_t80", "display_name": "Semantic 0.80", "chunker": "semantic",
+           "chunker_params": {"similarity_threshold": 0.8, "max_chunk_size": 1500}}
+        ]
+
+    ``fixed`` and ``semantic`` inherit their built-in settings. Without
+    configuration those two are served.
+    """
+    inline = os.getenv("MITO_VARIANTS")
+    path = os.getenv("MITO_VARIANTS_FILE")
+    entries = DEFAULT_VARIANTS
+    try:
+        if inline:
+            entries = json.loads(inline)
+        elif path:
+            with open(path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        builtin = {variant["name"]: variant for variant in DEFAULT_VARIANTS}
+        configs = {}
+        for entry in entries:
+            config = _complete({**builtin.get(entry.get("name"), {}), **entry})
+            configs[config["name"]] = config
+        if not configs:
+            raise ValueError("no variants defined")
+        return configs
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        print(f"❌ Invalid variant configuration ({e}), serving the built-in variants")
+        return {variant["name"]: _complete(variant) for variant in DEFAULT_VARIANTS}
+
+
+def create_chunker(config: Dict[str, Any]):
+    """The chunker a variant's index is built with."""
+    if config["chunker"] == "semantic":
+        from .chunkers.semantic import SemanticChunker
+        return SemanticChunker(**config["chunker_params"])
+    from .chunkers.fixed_size import FixedSizeChunker
+    return FixedSizeChunker(**config["chunker_params"])
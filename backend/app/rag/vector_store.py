@@ -1,29 +1,123 @@
 import os
+import time
+import uuid
+import asyncio
 from typing import List, Optional
+import numpy as np
 from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import Chroma
 from langchain.schema import Document
 from dotenv import load_dotenv
+from .compact_index import CompactIndex
+from .topic_router import TopicRouter
+from .index_artifact import load_artifact, read_current_version
+from .index_versions import VERSIONS_DIR, read_current
+from .mmr import mmr_select
+from .article_index import ArticleIndex
+from .lexical_index import LexicalIndex, lexical_distances, reciprocal_rank_fusion
+from .remote_index import RemoteIndexError, shared_remote_index
+from .chunk_corpus import load_article_corpus, update_article_corpus
+from .context_compression import SentenceIndex
 
 load_dotenv()
 
+# Embedding clients by model, shared by the vector stores of every variant
+_shared_embeddings = {}
+
+def shared_embeddings(model: str = "text-embedding-3-large") -> OpenAIEmbeddings:
+    if model not in _shared_embeddings:
+        _shared_embeddings[model] = OpenAIEmbeddings(
+            model=model,
+            chunk_size=100  # Process in smaller batches for reliability
+        )
+    return _shared_embeddings[model]
+
 class MitoVectorStore:
-    def __init__(self, persist_directory: str = "./chroma_db", variant: str = "fixed"):
-        self.persist_directory = persist_directory
+    def __init__(
+        self,
+        persist_directory: str = "./chroma_db",
+        variant: str = "fixed",
+        index_mode: Optional[str] = None,
+        version: Optional[str] = None
+    ):
+        # Rebuilds write into <persist_directory>/versions/<version> and the CURRENT
+        # pointer names the one to serve; without a pointer the legacy layout
+        # (collection directly in persist_directory) is used
+        self.base_directory = persist_directory
+        self.index_version = version or read_current(persist_directory)
+        if self.index_version:
+            self.persist_directory = os.path.join(persist_directory, VERSIONS_DIR, self.index_version)
+        else:
+            self.persist_directory = persist_directory
         self.variant = variant
         
+        # "chroma" searches the full-dimension Chroma collection, "compact" searches
+        # the truncated Matryoshka index and re-ranks with full vectors from disk,
+        # "artifact" serves a prebuilt read-only index artifact without opening Chroma,
+        # "remote" searches the artifacts an index server serves (index_server.py)
+        self.index_mode = index_mode or os.getenv("MITO_INDEX_MODE", "chroma")
+        self.rerank_candidates = int(os.getenv("MITO_RERANK_CANDIDATES", "48"))
+        self.compact_index = None
+        self.artifact_root = os.getenv("MITO_ARTIFACT_DIR", "./index_artifacts")
+        self.artifact_manifest = None
+        self.remote_index = None
+        self.remote_stats = {}
+        
+        # Route queries to topic partitions; needs chunks indexed with 'topic' metadata
+        self.router = TopicRouter() if os.getenv("MITO_TOPIC_ROUTING", "false").lower() == "true" else None
+        
+        # Diversify results with maximal marginal relevance over an over-fetched
+        # candidate set, using the stored chunk vectors (no extra embedding calls)
+        self.mmr_enabled = os.getenv("MITO_MMR", "false").lower() == "true"
+        self.mmr_candidates = int(os.getenv("MITO_MMR_CANDIDATES", "24"))
+        self.mmr_lambda = float(os.getenv("MITO_MMR_LAMBDA", "0.7"))
+        
+        # Coarse-to-fine search: rank articles by their chunk centroid first and
+        # search only the chunks of the top MITO_ARTICLE_CANDIDATES articles (0: all chunks)
+        self.article_candidates = int(os.getenv("MITO_ARTICLE_CANDIDATES", "0"))
+        self.article_index_dims = int(os.getenv("MITO_ARTICLE_INDEX_DIMS", "0")) or None
+        self._article_index = None
+        
+        # Keyword index for retrieval without an embedding call: "vector" searches
+        # embeddings only (the keyword index then only serves degraded answers while
+        # OpenAI is unavailable and is built on first use), "lexical" searches the
+        # keyword index alone, "hybrid" fuses both rankings by reciprocal rank
+        self.retrieval_mode = os.getenv("MITO_RETRIEVAL_MODE", "vector")
+        self.hybrid_candidates = int(os.getenv("MITO_HYBRID_CANDIDATES", "24"))
+        self._lexical_index = None
+        
+        # Sentence embeddings written at ingest (setup_rag.py --sentence-index), scored
+        # by the chain's context compression; loaded on first use
+        self._sentence_index = None
+        
         # Use the larger embedding model for better multilingual support
-        self.embeddings = OpenAIEmbeddings(
-            model="text-embedding-3-large",
-            chunk_size=100  # Process in smaller batches for reliability
-        )
+        self.embeddings = shared_embeddings("text-embedding-3-large")
         
         # Initialize or load existing vector store
         self.vectorstore = None
-        self._initialize_vectorstore()
+        if self.index_mode == "artifact":
+            self._load_artifact()
+        elif self.index_mode == "remote":
+            self._connect_remote_index()
+        
+        if self.compact_index is None and self.remote_index is None:
+            self._initialize_vectorstore()
+        
+        if self.index_mode == "compact":
+            self._load_compact_index()
+        
+        if self.retrieval_mode != "vector" and self.remote_index is None:
+            self.lexical_index()
+    
+    @property
+    def uses_embeddings(self) -> bool:
+        """Whether searches need the query embedded (not in lexical retrieval mode)."""
+        return self.retrieval_mode != "lexical"
     
     def _initialize_vectorstore(self):
         """Initialize or load existing ChromaDB vector store."""
+        # Only the chroma index mode (and ingestion) opens Chroma; artifact and
+        # remote serving never import langchain_community or chromadb
+        from langchain_community.vectorstores import Chroma
         try:
             # Create variant-specific collection name
             collection_name = f"mito_articles_sk_{self.variant}"
@@ -54,21 +148,153 @@ class MitoVectorStore:
                 persist_directory=self.persist_directory
             )
     
-    def add_documents(self, documents: List[Document]) -> bool:
-        """Add documents to the vector store."""
+    @property
+    def compact_index_path(self) -> str:
+        return os.path.join(self.persist_directory, "compact_index")
+    
+    def _load_compact_index(self):
+        """Load the compact index, falling back to Chroma search if it is missing."""
+        if not CompactIndex.exists(self.compact_index_path):
+            print(f"Compact index not found at {self.compact_index_path}, using Chroma search for '{self.variant}'")
+            return
+        try:
+            self.compact_index = CompactIndex.load(self.compact_index_path)
+            print(f"Loaded compact index for '{self.variant}' ({len(self.compact_index)} vectors, "
+                  f"{self.compact_index.dims} dims, {self.compact_index.quantization})")
+        except Exception as e:
+            print(f"Error loading compact index: {e}")
+            self.compact_index = None
+    
+    def _load_artifact(self):
+        """Open the variant's current index artifact; falls back to Chroma if it cannot be served."""
+        try:
+            self.compact_index, self.artifact_manifest = load_artifact(self.artifact_root, self.variant)
+            self.index_version = self.artifact_manifest["version"]
+            print(f"Loaded index artifact {self.artifact_manifest['version']} for '{self.variant}' "
+                  f"({len(self.compact_index)} documents, corpus {self.artifact_manifest['corpus_hash'][:12]})")
+        except Exception as e:
+            print(f"❌ Error loading index artifact for '{self.variant}' from {self.artifact_root}: {e}")
+            print(f"Falling back to Chroma at {self.persist_directory}")
+            self.compact_index = None
+            self.artifact_manifest = None
+    
+    def _connect_remote_index(self):
+        """Use the index server at MITO_INDEX_URL; nothing is loaded in this process.
+        
+        An unreachable server is not fatal: searches fail (and are retried) until
+        it answers, and the index watcher picks up its version once it does.
+        """
+        self.remote_index = shared_remote_index()
+        try:
+            self.remote_stats = self.remote_index.stats(self.variant)
+            self.index_version = self.remote_stats["version"]
+            print(f"Using remote index {self.index_version} for '{self.variant}' at {self.remote_index.base_url} "
+                  f"({self.remote_stats['document_count']} documents)")
+        except Exception as e:
+            print(f"❌ Index server {self.remote_index.base_url} has no index for '{self.variant}' yet: {e}")
+            self.index_version = None
+    
+    def latest_version(self) -> Optional[str]:
+        """The version a freshly opened store would serve, read from the CURRENT pointer."""
+        if self.remote_index is not None:
+            try:
+                return self.remote_index.stats(self.variant)["version"]
+            except Exception as e:
+                print(f"Error checking remote index version for '{self.variant}': {e}")
+                return self.index_version
+        if self.artifact_manifest is not None:
+            return read_current_version(self.artifact_root, self.variant)
+        return read_current(self.base_directory)
+    
+    def close(self):
+        """Drop references to the loaded index so its memory can be released."""
+        client = getattr(self.vectorstore, "_client", None)
+        if client is not None and hasattr(client, "close"):
+            # chromadb >= 1.0 keeps one system per directory until its last client closes
+            client.close()
+        self.vectorstore = None
+        self.compact_index = None
+        self._article_index = None
+        self._lexical_index = None
+        self._sentence_index = None
+        self.remote_index = None  # shared client, stays open for the other stores
+        print(f"Released {self.variant} index version {self.index_version or 'legacy'}")
+    
+    def get_all_embeddings(self) -> dict:
+        """Fetch ids, texts, metadata and full embeddings of the whole collection."""
+        return self.vectorstore._collection.get(include=["embeddings", "documents", "metadatas"])
+    
+    def build_compact_index(self, dims: int = 256, quantization: str = "float16") -> Optional[CompactIndex]:
+        """Build a compact index in memory from the vectors already stored in Chroma."""
+        data = self.get_all_embeddings()
+        if not data["ids"]:
+            print(f"  ⚠️  No vectors in {self.variant} collection, skipping compact index")
+            return None
+        
+        print(f"  🗜️  Building compact index for {self.variant} ({dims} dims, {quantization})...")
+        index = CompactIndex.build(
+            ids=list(data["ids"]),
+            texts=list(data["documents"]),
+            metadatas=list(data["metadatas"]),
+            embeddings=data["embeddings"],
+            dims=dims,
+            quantization=quantization,
+            # Chunks become spans of the article texts saved at ingest, when there are any
+            article_texts=load_article_corpus(self.persist_directory)
+        )
+        # Sentence embeddings kept at ingest travel with the index for context compression
+        index.sentences = self.sentence_index()
+        return index
+    
+    def export_compact_index(self, dims: int = 256, quantization: str = "float16") -> Optional[CompactIndex]:
+        """Build the compact index and save it next to the Chroma collection."""
+        try:
+            index = self.build_compact_index(dims, quantization)
+            if index is None:
+                return None
+            index.save(self.compact_index_path)
+            print(f"  ✅ Compact index saved to {self.compact_index_path} ({index.memory_bytes()})")
+            return index
+        except Exception as e:
+            print(f"  ❌ Error building compact index: {e}")
+            return None
+    
+    def add_documents(self, documents: List[Document], embeddings: Optional[list] = None) -> bool:
+        """Add documents to the vector store.
+        
+        ``embeddings`` optionally gives a precomputed vector per document (None for
+        documents still to be embedded), e.g. chunk vectors pooled from sentence
+        embeddings by the semantic chunker; those documents cost no embedding call.
+        """
         try:
             print(f"\n🗄️  Adding {len(documents)} documents to {self.variant} vector store...")
             
             # Add documents in batches to avoid memory issues
             batch_size = 50
             total_batches = (len(documents) + batch_size - 1) // batch_size
+            precomputed = 0
             
             for i in range(0, len(documents), batch_size):
                 batch_num = i // batch_size + 1
                 batch = documents[i:i + batch_size]
                 
                 print(f"  📦 Processing batch {batch_num}/{total_batches} ({len(batch)} documents)...")
-                self.vectorstore.add_documents(batch)
+                if embeddings is None:
+                    self.vectorstore.add_documents(batch)
+                else:
+                    vectors = list(embeddings[i:i + batch_size])
+                    missing = [j for j, vector in enumerate(vectors) if vector is None]
+                    if missing:
+                        embedded = self.embeddings.embed_documents([batch[j].page_content for j in missing])
+                        for j, vector in zip(missing, embedded):
+                            vectors[j] = vector
+                    precomputed += len(batch) - len(missing)
+                    self.vectorstore._collection.add(
+                        ids=[str(uuid.uuid4()) for _ in batch],
+                        embeddings=[[float(value) for value in vector] for vector in vectors],
+                        metadatas=[doc.metadata for doc in batch],
+                        documents=[doc.page_content for doc in batch]
+                    )
                 
                 # Show embedding progress
                 progress_percent = (batch_num / total_batches) * 100
@@ -78,55 +304,403 @@ class MitoVectorStore:
             print(f"  💾 Persisting {self.variant} vector store to disk...")
             self.vectorstore.persist()
             print(f"  ✅ Successfully added all {len(documents)} documents to {self.variant} vector store!")
+            if precomputed:
+                print(f"  ♻️  {precomputed} of them with precomputed vectors (no embedding calls)")
             return True
             
         except Exception as e:
             print(f"  ❌ Error adding documents to {self.variant} vector store: {e}")
             return False
     
+    def upsert_article(
+        self,
+        article_id: str,
+        documents: List[Document],
+        embeddings: Optional[list] = None,
+        article_text: Optional[str] = None,
+        sentences=None
+    ) -> dict:
+        """Replace the chunks of one article in the collection; searchable as soon as this returns.
+        
+        The chunks are stored under the stable IDs ``<article_id>:<n>`` after every
+        chunk stored for the article before (under any ID) is deleted. ``embeddings``
+        are optional precomputed vectors as in ``add_documents``; they are all ready
+        before anything is deleted. The article's text and, where the index keeps
+        sentence embeddings, its sentences (chunk_sweep.ArticleSentences) replace
+        the stored ones. Only indexes served from Chroma can be updated.
+        """
+        self._require_chroma_serving()
+        
+        vectors = list(embeddings) if embeddings is not None else [None] * len(documents)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            embedded = self.embeddings.embed_documents([documents[i].page_content for i in missing])
+            for i, vector in zip(missing, embedded):
+                vectors[i] = vector
+        
+        removed = self._delete_article_chunks(article_id)
+        if documents:
+            self.vectorstore._collection.upsert(
+                ids=[f"{article_id}:{n}" for n in range(len(documents))],
+                embeddings=[[float(value) for value in vector] for vector in vectors],
+                metadatas=[doc.metadata for doc in documents],
+                documents=[doc.page_content for doc in documents]
+            )
+        self._article_changed(article_id, article_text, sentences)
+        print(f"📝 Upserted article '{article_id}' into {self.variant}: {len(documents)} chunks "
+              f"({removed} replaced, {len(documents) - len(missing)} with precomputed vectors)")
+        return {"chunks": len(documents), "replaced": removed}
+    
+    def delete_article(self, article_id: str) -> int:
+        """Delete the chunks of one article from the collection; returns how many there were."""
+        self._require_chroma_serving()
+        removed = self._delete_article_chunks(article_id)
+        if removed:
+            self._article_changed(article_id)
+        print(f"🗑️  Deleted article '{article_id}' from {self.variant} ({removed} chunks)")
+        return removed
+    
+    @property
+    def serves_chroma(self) -> bool:
+        """Whether searches go to the Chroma collection (not a compact index, artifact or index server)."""
+        return self.vectorstore is not None and self.compact_index is None and self.remote_index is None
+    
+    def _require_chroma_serving(self):
+        # Compact indexes and artifacts are snapshots that other workers keep mapped;
+        # they change only by exporting or publishing a new version
+        if not self.serves_chroma:
+            raise RuntimeError(f"The {self.variant} index is served from a read-only {self.index_mode} index")
+    
+    def _delete_article_chunks(self, article_id: str) -> int:
+        ids = self.vectorstore._collection.get(where={"article_id": article_id}, include=[])["ids"]
+        if ids:
+            self.vectorstore._collection.delete(ids=ids)
+        return len(ids)
+    
+    def _article_changed(self, article_id: str, article_text: Optional[str] = None, sentences=None):
+        """Bring what is derived from the collection up to date after one article changed.
+        
+        Compact indexes and artifacts exported from it stay as they are until
+        they are exported again (setup_rag.py --export-compact / --export-artifact).
+        """
+        update_article_corpus(self.persist_directory, article_id, article_text)
+        sentence_index = self.sentence_index()
+        if sentence_index is not None:
+            # Without new sentences the article's chunks are sent uncompressed
+            self._sentence_index = sentence_index.replace_article(article_id, sentences)
+            self._sentence_index.save(self.persist_directory)
+        
+        self._article_index = None
+        self._lexical_index = None
+        # Rebuilt now rather than by the next query, where they are used up front
+        if self.article_candidates:
+            self.article_index()
+        if self.retrieval_mode != "vector":
+            self.lexical_index()
+    
     def similarity_search(self, query: str, k: int = 6) -> List[Document]:
         """Search for similar documents."""
         try:
+            if self.compact_index is not None or self.remote_index is not None:
+                return [doc for doc, _ in self.similarity_search_with_score(query, k=k)]
+            
             results = self.vectorstore.similarity_search(
                 query=query,
                 k=k
             )
             return results
+        except RemoteIndexError:
+            raise
         except Exception as e:
             print(f"Error in similarity search: {e}")
             return []
     
-    def similarity_search_with_score(self, query: str, k: int = 6) -> List[tuple]:
-        """Search for similar documents with relevance scores."""
+    def similarity_search_with_score(
+        self,
+        query: str,
+        k: int = 6,
+        topics: Optional[List[str]] = None,
+        query_embedding: Optional[List[float]] = None
+    ) -> List[tuple]:
+        """Search for similar documents with relevance scores.
+        
+        When topic routing is enabled and ``topics`` is not given, the router picks
+        the topic partitions to search; low-confidence queries search globally.
+        Pass ``query_embedding`` if the query was already embedded. Keyword
+        search (lexical and hybrid retrieval modes) is always global. Raises
+        RemoteIndexError when the index server cannot answer.
+        """
         try:
-            results = self.vectorstore.similarity_search_with_score(
-                query=query, 
-                k=k
-            )
-            return results
+            if self.retrieval_mode == "lexical":
+                return self.lexical_search(query, k)
+            
+            if topics is None and self.router is not None:
+                topics, confidence = self.router.route(query)
+                if topics:
+                    print(f"DEBUG [{self.variant}]: Routed query to topics {topics} (confidence: {confidence:.2f})")
+            
+            if query_embedding is None:
+                query_embedding = self.embeddings.embed_query(query)
+            if self.retrieval_mode == "hybrid":
+                fetch_k = max(k, self.hybrid_candidates)
+                return reciprocal_rank_fusion([
+                    self.similarity_search_by_vector_with_score(query_embedding, k=fetch_k, topics=topics),
+                    self.lexical_search(query, fetch_k)
+                ], k=k)
+            return self.similarity_search_by_vector_with_score(query_embedding, k=k, topics=topics)
+        except RemoteIndexError:
+            # The index server is a separate dependency: an outage must not look like "no matches"
+            raise
+        except Exception as e:
+            print(f"Error in similarity search with score: {e}")
+            return []
+    
+    async def asimilarity_search_with_score(
+        self,
+        query: str,
+        k: int = 6,
+        topics: Optional[List[str]] = None,
+        query_embedding: Optional[List[float]] = None
+    ) -> List[tuple]:
+        """``similarity_search_with_score`` for coroutines.
+        
+        A remote search is awaited without blocking the event loop, and concurrent
+        searches are batched into one index server request; local indexes are
+        searched inline as before. Raises RemoteIndexError when the index server
+        cannot answer.
+        """
+        if self.remote_index is None:
+            return self.similarity_search_with_score(query, k=k, topics=topics, query_embedding=query_embedding)
+        try:
+            if self.retrieval_mode == "lexical":
+                return await self.alexical_search(query, k)
+            
+            if topics is None and self.router is not None:
+                topics, confidence = self.router.route(query)
+                if topics:
+                    print(f"DEBUG [{self.variant}]: Routed query to topics {topics} (confidence: {confidence:.2f})")
+            
+            if query_embedding is None:
+                query_embedding = await asyncio.to_thread(self.embeddings.embed_query, query)
+            if self.retrieval_mode == "hybrid":
+                fetch_k = max(k, self.hybrid_candidates)
+                rankings = await asyncio.gather(
+                    self._asearch_remote_routed(query_embedding, fetch_k, topics),
+                    self.alexical_search(query, fetch_k)
+                )
+                return reciprocal_rank_fusion(list(rankings), k=k)
+            return await self._asearch_remote_routed(query_embedding, k, topics)
+        except RemoteIndexError:
+            raise
         except Exception as e:
             print(f"Error in similarity search with score: {e}")
             return []
     
-    def get_retriever(self, search_type: str = "similarity", k: int = 6):
-        """Get a retriever for the vector store."""
-        return self.vectorstore.as_retriever(
-            search_type=search_type,
-            search_kwargs={"k": k}
+    async def _asearch_remote_routed(self, embedding: List[float], k: int, topics: Optional[List[str]] = None) -> List[tuple]:
+        """Remote search of the topic partitions, falling back to a global search when they cannot fill ``k``."""
+        if topics:
+            results = await self._asearch_remote(embedding, k, topics)
+            if len(results) >= k:
+                return results
+            print(f"DEBUG [{self.variant}]: Topics {topics} returned {len(results)} results, falling back to global search")
+        return await self._asearch_remote(embedding, k)
+    
+    def similarity_search_by_vector_with_score(
+        self,
+        embedding: List[float],
+        k: int = 6,
+        topics: Optional[List[str]] = None
+    ) -> List[tuple]:
+        """Search by a precomputed query embedding, limited to ``topics`` if given.
+        
+        Falls back to a global search when the topic partitions cannot fill ``k`` results.
+        """
+        if topics:
+            results = self._search_by_vector(embedding, k, topics)
+            if len(results) >= k:
+                return results
+            print(f"DEBUG [{self.variant}]: Topics {topics} returned {len(results)} results, falling back to global search")
+        return self._search_by_vector(embedding, k)
+    
+    def _search_by_vector(self, embedding: List[float], k: int, topics: Optional[List[str]] = None) -> List[tuple]:
+        if self.remote_index is not None:
+            return self.remote_index.run(self._asearch_remote(embedding, k, topics))
+        
+        if self.mmr_enabled:
+            return self._search_by_vector_mmr(embedding, k, topics)
+        
+        if self.compact_index is not None:
+            rows = self._compact_rows(embedding, topics)
+            return self.compact_index.search(embedding, k=k, candidates=self.rerank_candidates, rows=rows)
+        
+        candidates, _ = self._chroma_query(embedding, k, self._chroma_filter(embedding, topics))
+        return candidates
+    
+    def _chroma_query(self, embedding: List[float], k: int, where: Optional[dict] = None, with_vectors: bool = False) -> tuple:
+        """(Document, distance) pairs from the Chroma collection, plus their vectors if asked for.
+        
+        Documents carry their chunk 'id' like compact and keyword hits do, so
+        hybrid fusion matches the same chunk from both rankings.
+        """
+        include = ["documents", "metadatas", "distances"] + (["embeddings"] if with_vectors else [])
+        results = self.vectorstore._collection.query(
+            query_embeddings=[embedding],
+            n_results=k,
+            where=where,
+            include=include
         )
+        candidates = [
+            (Document(page_content=text, metadata=dict(metadata or {}, id=(metadata or {}).get('id', chunk_id))), distance)
+            for chunk_id, text, metadata, distance in zip(
+                results["ids"][0], results["documents"][0], results["metadatas"][0], results["distances"][0]
+            )
+        ]
+        return candidates, results["embeddings"][0] if with_vectors else None
+    
+    def article_index(self) -> ArticleIndex:
+        """Article centroid index of the loaded index, built on first use."""
+        if self._article_index is None:
+            if self.compact_index is not None:
+                article_index = ArticleIndex.from_compact_index(self.compact_index, dims=self.article_index_dims)
+            else:
+                data = self.vectorstore._collection.get(include=["embeddings", "metadatas"])
+                article_index = ArticleIndex.from_vectors(
+                    [(metadata or {}).get('article_id') for metadata in data["metadatas"]], data["embeddings"],
+                    dims=self.article_index_dims
+                )
+            print(f"Built article index for '{self.variant}' ({len(article_index)} articles, "
+                  f"{article_index.dims} dims, {article_index.memory_bytes() / 1024:.0f} KB)")
+            self._article_index = article_index
+        return self._article_index
+    
+    def lexical_index(self) -> tuple:
+        """(LexicalIndex, row -> Document) over the loaded chunks, built on first use."""
+        if self._lexical_index is None:
+            start = time.perf_counter()
+            if self.compact_index is not None:
+                index = self.compact_index
+                lexical_index, get_document = LexicalIndex.build(index.texts), index.get_document
+            else:
+                data = self.vectorstore._collection.get(include=["documents", "metadatas"])
+                documents = [
+                    Document(page_content=text, metadata=dict(metadata or {}, id=(metadata or {}).get('id', chunk_id)))
+                    for chunk_id, text, metadata in zip(data["ids"], data["documents"], data["metadatas"])
+                ]
+                lexical_index, get_document = LexicalIndex.build(doc.page_content for doc in documents), documents.__getitem__
+            print(f"Built lexical index for '{self.variant}' ({len(lexical_index)} chunks, {len(lexical_index.vocabulary)} terms, "
+                  f"{lexical_index.memory_bytes() / 1024 / 1024:.1f} MB) in {time.perf_counter() - start:.2f}s")
+            self._lexical_index = (lexical_index, get_document)
+        return self._lexical_index
+    
+    def sentence_index(self) -> Optional[SentenceIndex]:
+        """Sentence embeddings of the loaded index, or None if it was built without them."""
+        if self.compact_index is not None:
+            return self.compact_index.sentences
+        if self._sentence_index is None and self.remote_index is None and SentenceIndex.exists(self.persist_directory):
+            self._sentence_index = SentenceIndex.load(self.persist_directory)
+        return self._sentence_index
+    
+    def lexical_search(self, query: str, k: int = 6) -> List[tuple]:
+        """(Document, distance) pairs by keyword match, without embedding the query."""
+        if self.remote_index is not None:
+            return self.remote_index.lexical_search(self.variant, query, k=k)
+        lexical_index, get_document = self.lexical_index()
+        return [(get_document(row), distance) for row, distance in lexical_distances(lexical_index.search(query, k))]
+    
+    async def alexical_search(self, query: str, k: int = 6) -> List[tuple]:
+        """``lexical_search`` for coroutines; building the index happens off the event loop."""
+        if self.remote_index is not None:
+            return await self.remote_index.alexical_search(self.variant, query, k=k)
+        return await asyncio.to_thread(self.lexical_search, query, k)
+    
+    def _compact_rows(self, embedding: List[float], topics: Optional[List[str]] = None) -> Optional[np.ndarray]:
+        """Rows a compact search is limited to (topic partitions, chunks of the top articles), None for all."""
+        rows = self.compact_index.partition_rows('topic', topics) if topics else None
+        if self.article_candidates:
+            article_rows = self.article_index().candidate_rows(embedding, self.article_candidates)
+            rows = article_rows if rows is None else np.intersect1d(rows, article_rows, assume_unique=True)
+        return rows
+    
+    def _chroma_filter(self, embedding: List[float], topics: Optional[List[str]] = None) -> Optional[dict]:
+        """Chroma ``where`` clause for the topic partitions and the top articles, None for all."""
+        conditions = []
+        if topics:
+            conditions.append({"topic": {"$in": topics}})
+        if self.article_candidates:
+            article_index = self.article_index()
+            top = article_index.top_articles(embedding, self.article_candidates)
+            keys = [article_index.keys[position] for position, _ in top if article_index.keys[position] is not None]
+            if keys:
+                conditions.append({"article_id": {"$in": keys}})
+        if not conditions:
+            return None
+        return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+    
+    def _search_by_vector_mmr(self, embedding: List[float], k: int, topics: Optional[List[str]] = None) -> List[tuple]:
+        """Over-fetch candidates with their stored vectors and keep a diverse top ``k``.
+        
+        Results keep their original distances to the query and come in MMR order.
+        """
+        fetch_k = max(k, self.mmr_candidates)
+        if self.compact_index is not None:
+            rows = self._compact_rows(embedding, topics)
+            hits = self.compact_index.search_ids(embedding, k=fetch_k, candidates=max(self.rerank_candidates, fetch_k), rows=rows)
+            candidates = [(self.compact_index.get_document(row), distance) for row, distance in hits]
+            vectors = self.compact_index.full_vectors[[row for row, _ in hits]]
+        else:
+            candidates, vectors = self._chroma_query(embedding, fetch_k, self._chroma_filter(embedding, topics), with_vectors=True)
+        
+        if not candidates:
+            return []
+        return [candidates[i] for i in mmr_select(embedding, vectors, k=k, lambda_mult=self.mmr_lambda)]
+    
+    async def _asearch_remote(self, embedding: List[float], k: int, topics: Optional[List[str]] = None) -> List[tuple]:
+        """Search on the index server; with MMR the candidates come with their vectors and are diversified here."""
+        if not self.mmr_enabled:
+            return await self.remote_index.asearch(
+                self.variant, embedding, k=k, topics=topics, candidates=self.rerank_candidates,
+                articles=self.article_candidates
+            )
+        
+        fetch_k = max(k, self.mmr_candidates)
+        hits = await self.remote_index.asearch(
+            self.variant, embedding, k=fetch_k, topics=topics,
+            candidates=max(self.rerank_candidates, fetch_k), articles=self.article_candidates, with_vectors=True
+        )
+        if not hits:
+            return []
+        candidates = [(doc, distance) for doc, distance, _ in hits]
+        vectors = [vector for _, _, vector in hits]
+        return [candidates[i] for i in mmr_select(embedding, vectors, k=k, lambda_mult=self.mmr_lambda)]
     
     def get_stats(self) -> dict:
         """Get statistics about the vector store."""
         try:
-            count = self.vectorstore._collection.count()
+            if self.vectorstore is not None:
+                count = self.vectorstore._collection.count()
+            elif self.remote_index is not None:
+                count = self.remote_stats.get("document_count", 0)
+            else:
+                count = len(self.compact_index)
             collection_name = f"mito_articles_sk_{self.variant}"
-            return {
+            stats = {
                 "document_count": count,
                 "collection_name": collection_name,
                 "variant": self.variant,
                 "embedding_model": "text-embedding-3-large",
-                "persist_directory": self.persist_directory
+                "persist_directory": self.persist_directory,
+                "index_mode": self.index_mode if self.compact_index is not None or self.remote_index is not None else "chroma",
+                "retrieval_mode": self.retrieval_mode
             }
+            if self.index_version:
+                stats["index_version"] = self.index_version
+            if self.artifact_manifest:
+                stats["corpus_hash"] = self.artifact_manifest["corpus_hash"]
+            if self.remote_index is not None:
+                stats["index_url"] = self.remote_index.base_url
+                if "corpus_hash" in self.remote_stats:
+                    stats["corpus_hash"] = self.remote_stats["corpus_hash"]
+            return stats
         except Exception as e:
             print(f"Error getting stats: {e}")
             return {"error": str(e)}
@@ -0,0 +1,19 @@
+import numpy as np
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows, leaving all-zero rows untouched."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def pool_sentence_vectors(embeddings: np.ndarray, lengths: np.ndarray, bounds: np.ndarray) -> np.ndarray:
+    """Chunk vectors as the length-weighted, renormalized mean of their sentence vectors.
+
+    ``bounds`` holds each chunk's [start, end) sentence rows, in order.
+    """
+    if len(bounds) == 0:
+        return np.empty((0, embeddings.shape[1]), dtype=np.float32)
+    weighted = embeddings * lengths[:, None].astype(np.float32)
+    return normalize(np.add.reduceat(weighted, bounds[:, 0], axis=0).astype(np.float32))
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark query-focused context compression (MITO_CONTEXT_COMPRESSION): prompt
+context tokens of the retrieved chunks as sent today vs. only their sentences
+most similar to the question within a token budget, and the time compression
+adds per request.
+
+Needs an index built with setup_rag.py --sentence-index. Without --embed no
+OpenAI calls are made and stored chunk vectors stand in for the questions;
+--generate also times gpt generation with the full and the compressed context.
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.rag.chain import format_context
+from app.rag.chunk_sweep import token_counter
+from app.rag.vectors import normalize
+from app.rag.context_compression import compress_documents
+from app.rag.vector_store import shared_embeddings
+from benchmark_lexical import open_index
+from evaluate_compact_index import percentile_ms
+from load_test import QUESTIONS
+
+GENERATION_PROMPT = "Kontext z článkov:\n{context}\n\nOtázka: {question}\n\nOdpoveď:"
+
+def time_generation(llm, question: str, context: str) -> float:
+    start = time.perf_counter()
+    llm.invoke(GENERATION_PROMPT.format(context=context, question=question))
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark query-focused context compression")
+    parser.add_argument("--variant", default="fixed")
+    parser.add_argument("--artifact-dir", help="Benchmark the variant's index artifact instead of its Chroma collection")
+    parser.add_argument("--queries", help="Text file with one question per line (default: the load test questions)")
+    parser.add_argument("--k", type=int, default=6)
+    parser.add_argument("--budgets", type=int, nargs="+", default=[300, 600, 900], help="Token budgets to compare")
+    parser.add_argument("--embed", action="store_true", help="Embed the questions via OpenAI")
+    parser.add_argument("--generate", action="store_true", help="Also time generation with full and compressed context")
+    parser.add_argument("--model", default="gpt-4-turbo-preview", help="Chat model for --generate")
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    print("✂️  MITO Context Compression Benchmark")
+    print("=" * 50)
+
+    index = open_index(args)
+    if index is None:
+        print(f"❌ The {args.variant} collection is empty, run setup_rag.py first")
+        return
+    if index.sentences is None:
+        print(f"❌ The {args.variant} index has no sentence embeddings, rebuild it with setup_rag.py --sentence-index")
+        return
+    sentences = index.sentences
+    print(f"📊 {len(index)} chunks, {len(sentences)} sentences "
+          f"({sentences.dims} dims, {sentences.memory_bytes() / 1024 / 1024:.1f} MB)")
+
+    if args.queries:
+        with open(args.queries, 'r', encoding='utf-8') as f:
+            questions = [line.strip() for line in f if line.strip()]
+    else:
+        questions = list(QUESTIONS)
+
+    if args.embed:
+        vectors = normalize(np.asarray(shared_embeddings(index.embedding_model).embed_documents(questions), dtype=np.float32))
+    else:
+        rng = np.random.default_rng(42)
+        rows = rng.choice(len(index), size=len(questions), replace=False)
+        vectors = normalize(np.asarray(index.full_vectors[rows], dtype=np.float32))
+
+    count_tokens = token_counter()
+    retrieved = [[doc for doc, _ in index.search(vector, k=args.k)] for vector in vectors]
+    full_tokens = [count_tokens(format_context(docs)) for docs in retrieved]
+
+    print("\n" + "-" * 78)
+    print(f"{'context':<22}{'tokens p50':>12}{'tokens p95':>12}{'vs full':>10}{'compress ms p50':>18}")
+    print("-" * 78)
+    print(f"{'full chunks':<22}{np.percentile(full_tokens, 50):>12.0f}{np.percentile(full_tokens, 95):>12.0f}"
+          f"{'':>10}{'-':>18}")
+    compressed_contexts = {}
+    for budget in args.budgets:
+        tokens, latencies, contexts = [], [], []
+        for docs, vector in zip(retrieved, vectors):
+            start = time.perf_counter()
+            compressed = compress_documents(docs, vector, sentences, budget)
+            latencies.append(time.perf_counter() - start)
+            contexts.append(format_context(compressed))
+            tokens.append(count_tokens(contexts[-1]))
+        compressed_contexts[budget] = contexts
+        print(f"{f'budget {budget}':<22}{np.percentile(tokens, 50):>12.0f}{np.percentile(tokens, 95):>12.0f}"
+              f"{np.mean(tokens) / np.mean(full_tokens):>10.0%}{percentile_ms(latencies, 50):>18.2f}")
+    print("-" * 78)
+    print("The budget counts sentence tokens; titles and document headers come on top.")
+
+    if args.generate:
+        from langchain_openai import ChatOpenAI
+        llm = ChatOpenAI(model=args.model, temperature=0.3, max_tokens=400)
+        budget = args.budgets[len(args.budgets) // 2]
+        full_latencies, compressed_latencies = [], []
+        for question, docs, context in zip(questions, retrieved, compressed_contexts[budget]):
+            full_latencies.append(time_generation(llm, question, format_context(docs)))
+            compressed_latencies.append(time_generation(llm, question, context))
+        print(f"\nGeneration with {args.model} over {len(questions)} questions (p50 / p95 ms):")
+        print(f"   full chunks: {percentile_ms(full_latencies, 50):>8.0f} / {percentile_ms(full_latencies, 95):.0f}")
+        print(f"   budget {budget}:  {percentile_ms(compressed_latencies, 50):>8.0f} / "
+              f"{percentile_ms(compressed_latencies, 95):.0f}")
+
+    print("\nExample (first question, middle budget):")
+    print(f"   {questions[0]}")
+    print("   " + compressed_contexts[args.budgets[len(args.budgets) // 2]][0][:600].replace("\n", "\n   "))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark the in-memory keyword index (MITO_RETRIEVAL_MODE=lexical/hybrid)
+against the vector path: build time, memory and per-query latency of BM25
+search vs. embedding the query plus a compact index search, and hybrid fusion.
+
+Without --embed no OpenAI calls are made: the vector search is timed with
+stored chunk vectors as stand-in queries and the embedding round trip is not
+measured (it is typically 100-400 ms, see /api/retrieve embedding_time_ms).
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.rag.compact_index import CompactIndex
+from app.rag.vectors import normalize
+from app.rag.lexical_index import LexicalIndex, lexical_distances, reciprocal_rank_fusion
+from app.rag.vector_store import shared_embeddings
+from evaluate_compact_index import percentile_ms
+from load_test import QUESTIONS
+
+def open_index(args) -> CompactIndex:
+    """The variant's artifact, or a compact index built from its Chroma collection."""
+    if args.artifact_dir:
+        from app.rag.index_artifact import load_artifact
+        index, manifest = load_artifact(args.artifact_dir, args.variant)
+        print(f"📦 Artifact {manifest['version']} for {args.variant}")
+        return index
+    from app.rag.rag_factory import RAGServiceFactory
+    vector_store = RAGServiceFactory.create_vector_store(args.variant)
+    return vector_store.build_compact_index()
+
+def time_queries(search, queries) -> list:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def row(label: str, latencies: list, note: str = ""):
+    print(f"{label:<34}{percentile_ms(latencies, 50):>10.2f}{percentile_ms(latencies, 95):>10.2f}  {note}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark keyword (BM25) retrieval against the vector path")
+    parser.add_argument("--variant", default="fixed")
+    parser.add_argument("--artifact-dir", help="Benchmark the variant's index artifact instead of its Chroma collection")
+    parser.add_argument("--queries", help="Text file with one question per line (default: the load test questions)")
+    parser.add_argument("--k", type=int, default=6)
+    parser.add_argument("--candidates", type=int, default=24, help="Results fused from each ranking in hybrid mode")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes over the questions")
+    parser.add_argument("--embed", action="store_true", help="Embed the questions via OpenAI (measures the round trip)")
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    print("🔎 MITO Lexical Retrieval Benchmark")
+    print("=" * 50)
+
+    index = open_index(args)
+    if index is None:
+        print(f"❌ The {args.variant} collection is empty, run setup_rag.py first")
+        return
+
+    if args.queries:
+        with open(args.queries, 'r', encoding='utf-8') as f:
+            questions = [line.strip() for line in f if line.strip()]
+    else:
+        questions = list(QUESTIONS)
+    queries = questions * args.repeat
+
+    start = time.perf_counter()
+    lexical = LexicalIndex.build(index.texts)
+    build_time = time.perf_counter() - start
+    memory = index.memory_bytes()
+    print(f"📊 {len(index)} chunks, {len(lexical.vocabulary):,} terms, {len(lexical.rows):,} postings")
+    print(f"   Lexical index: built in {build_time:.2f}s, {lexical.memory_bytes() / 1024 / 1024:.1f} MB in memory")
+    print(f"   Vector index:  {memory['compact_bytes'] / 1024 / 1024:.1f} MB compact matrix in memory, "
+          f"{memory['full_vector_bytes'] / 1024 / 1024:.1f} MB full vectors mapped from disk")
+
+    embedding_latencies = []
+    if args.embed:
+        embeddings = shared_embeddings(index.embedding_model)
+        vectors = []
+        for question in questions:
+            start = time.perf_counter()
+            vectors.append(embeddings.embed_query(question))
+            embedding_latencies.append(time.perf_counter() - start)
+        vectors = normalize(np.asarray(vectors, dtype=np.float32))
+    else:
+        rng = np.random.default_rng(42)
+        rows = rng.choice(len(index), size=len(questions), replace=False)
+        vectors = normalize(np.asarray(index.full_vectors[rows], dtype=np.float32))
+    vector_queries = list(zip(questions, vectors)) * args.repeat
+
+    def vector_search(query):
+        return index.search(query[1], k=args.k)
+
+    def lexical_search(question):
+        return [(index.get_document(row), distance)
+                for row, distance in lexical_distances(lexical.search(question, args.k))]
+
+    def hybrid_search(query):
+        question, vector = query
+        fetch_k = max(args.k, args.candidates)
+        lexical_hits = [(index.get_document(row), distance)
+                        for row, distance in lexical_distances(lexical.search(question, fetch_k))]
+        return reciprocal_rank_fusion([index.search(vector, k=fetch_k), lexical_hits], k=args.k)
+
+    print("\n" + "-" * 78)
+    print(f"{'path':<34}{'p50 ms':>10}{'p95 ms':>10}")
+    print("-" * 78)
+    row("lexical (BM25)", time_queries(lexical_search, queries), "no network")
+    vector_latencies = time_queries(vector_search, vector_queries)
+    row("vector search (compact + rerank)", vector_latencies, "after the embedding call")
+    if embedding_latencies:
+        row("  query embedding (OpenAI)", embedding_latencies, f"{len(embedding_latencies)} calls")
+        total = [embedding + search for embedding, search in zip(embedding_latencies * args.repeat, vector_latencies)]
+        row("  vector path total", total)
+    else:
+        print(f"{'  query embedding (OpenAI)':<34}{'-':>10}{'-':>10}  not measured (use --embed)")
+    row("hybrid (vector + lexical, RRF)", time_queries(hybrid_search, vector_queries), "after the embedding call")
+    print("-" * 78)
+
+    if args.embed:
+        overlap = []
+        for question, vector in zip(questions, vectors):
+            vector_articles = {doc.metadata.get('article_id') for doc, _ in vector_search((question, vector))}
+            lexical_articles = {doc.metadata.get('article_id') for doc, _ in lexical_search(question)}
+            overlap.append(len(vector_articles & lexical_articles) / max(1, len(vector_articles)))
+        print(f"Articles of the vector top-{args.k} also in the lexical top-{args.k}: {np.mean(overlap):.0%}")
+
+    print("\nExample (lexical):")
+    for doc, distance in lexical_search(questions[0])[:3]:
+        print(f"   {1 - distance:.2f}  {doc.metadata.get('title', 'Bez názvu')}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Measure MMR diversification of retrieved chunks.
+Reports the cost of mmr_select per query and, for sampled queries, how many
+distinct articles and how much redundancy (mean pairwise cosine) the top-k
+holds with plain similarity search vs. MMR, along with the mean distance to
+the query that diversification gives up.
+
+Uses the vectors of an index artifact (--artifact-dir) or the variant's Chroma
+collection; without either, a synthetic corpus of near-duplicate chunk
+clusters is generated.
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.rag.mmr import mmr_select
+from app.rag.vectors import normalize
+
+def load_corpus(args):
+    """Return (normalized vectors, article id per row, source description)."""
+    if args.artifact_dir:
+        from app.rag.index_artifact import load_artifact
+        index, manifest = load_artifact(args.artifact_dir, args.variant)
+        articles = [(metadata or {}).get('article_id') for metadata in index.metadatas]
+        return normalize(np.asarray(index.full_vectors, dtype=np.float32)), articles, f"artifact {manifest['version']}"
+
+    from app.rag.rag_factory import RAGServiceFactory
+    from app.models.types import RAGVariant
+    vector_store = RAGServiceFactory.create_vector_store(RAGVariant(args.variant))
+    if vector_store.vectorstore is not None and vector_store.vectorstore._collection.count() > 0:
+        data = vector_store.get_all_embeddings()
+        articles = [(metadata or {}).get('article_id') or (metadata or {}).get('url') for metadata in data["metadatas"]]
+        return normalize(np.asarray(data["embeddings"], dtype=np.float32)), articles, "Chroma collection"
+
+    # 20 topics x 10 articles x 12 chunks: chunks of one article are near-duplicates,
+    # articles of one topic are related
+    rng = np.random.default_rng(args.seed)
+    topics = rng.standard_normal((20, 3072)).astype(np.float32)
+    centers = np.repeat(topics, 10, axis=0) + rng.standard_normal((200, 3072)).astype(np.float32) * 0.8
+    articles = np.repeat(np.arange(200), 12)
+    vectors = centers[articles] + rng.standard_normal((len(articles), 3072)).astype(np.float32) * 0.5
+    return normalize(vectors), list(articles), "synthetic clusters (no index found)"
+
+def redundancy(vectors: np.ndarray) -> float:
+    """Mean pairwise cosine similarity between selected chunks."""
+    similarity = vectors @ vectors.T
+    n = len(vectors)
+    return float((similarity.sum() - n) / (n * (n - 1))) if n > 1 else 0.0
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Measure MMR cost and diversity")
+    parser.add_argument("--variant", choices=["fixed", "semantic"], default="fixed")
+    parser.add_argument("--artifact-dir", help="Read vectors from index artifacts in this directory")
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=2.0,
+                        help="Relative noise added to sampled query vectors (questions sit far from any one chunk)")
+    parser.add_argument("--k", type=int, default=6)
+    parser.add_argument("--candidates", type=int, nargs="+", default=[12, 24, 48])
+    parser.add_argument("--lambda-mult", type=float, default=0.7)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    full, articles, source = load_corpus(args)
+    rng = np.random.default_rng(args.seed)
+    rows = rng.choice(len(full), size=min(args.samples, len(full)), replace=False)
+    noise = rng.normal(scale=args.noise / np.sqrt(full.shape[1]), size=(len(rows), full.shape[1]))
+    queries = normalize((full[rows] + noise).astype(np.float32))
+
+    print(f"\n🔀 MMR over {len(full):,} chunks from {source}, {len(queries)} queries, k={args.k}, lambda={args.lambda_mult}\n")
+    print(f"{'mode':<14}{'articles':>10}{'redundancy':>12}{'distance':>10}{'p50 µs':>10}{'p99 µs':>10}")
+
+    for candidates in [None] + args.candidates:
+        unique, redundant, distances, timings = [], [], [], []
+        for query in queries:
+            scores = full @ query
+            top = np.argpartition(-scores, (candidates or args.k) - 1)[:candidates or args.k]
+            top = top[np.argsort(-scores[top])]
+            if candidates is None:
+                picked = top
+            else:
+                vectors = full[top]
+                start = time.perf_counter()
+                positions = mmr_select(query, vectors, k=args.k, lambda_mult=args.lambda_mult)
+                timings.append(time.perf_counter() - start)
+                picked = top[positions]
+            unique.append(len({articles[row] for row in picked}))
+            redundant.append(redundancy(full[picked]))
+            distances.append(float(np.mean(2 - 2 * scores[picked])))
+
+        name = "similarity" if candidates is None else f"mmr@{candidates}"
+        p50 = f"{np.percentile(timings, 50) * 1e6:.0f}" if timings else "-"
+        p99 = f"{np.percentile(timings, 99) * 1e6:.0f}" if timings else "-"
+        print(f"{name:<14}{np.mean(unique):>10.2f}{np.mean(redundant):>12.3f}{np.mean(distances):>10.3f}{p50:>10}{p99:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark response payload size and serialization time.
+Compares the legacy ChatResponse/ComparisonResponse JSON with the compact schema
+served through orjson, with and without gzip. Runs offline on chunks built from
+data/articles with the fixed-size chunker.
+"""
+
+import os
+import sys
+import gzip
+import time
+import random
+import argparse
+from datetime import datetime
+from fastapi.responses import JSONResponse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.api.compact import FastJSONResponse, compact_chat_payload, compact_comparison_payload
+from app.models.types import ChatResponse, ComparisonResponse, VariantResponse, UsageData, RAGVariant
+from app.rag.chain import MitoRAGChain
+from app.rag.chunkers.fixed_size import FixedSizeChunker
+from app.rag.data_processor import SlovakArticleProcessor
+
+def build_sources(documents, variant: RAGVariant, k: int):
+    """Run the real source extraction on k random chunks with synthetic distances."""
+    chain = MitoRAGChain.__new__(MitoRAGChain)  # only the source extraction is needed
+    chain.variant = variant.value
+    docs_with_scores = [(doc, random.uniform(0.6, 1.2)) for doc in random.sample(documents, k)]
+    return chain._extract_sources_with_scores(docs_with_scores)
+
+def time_call(func, repeat: int) -> float:
+    """Mean wall time of func() in microseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def report(label: str, legacy_func, compact_func, repeat: int):
+    legacy_body = legacy_func()
+    compact_body = compact_func()
+    print(f"\n📦 {label}")
+    print(f"  {'':<10}{'bytes':>10}{'gzip bytes':>12}{'serialize µs':>15}")
+    for name, func, body in (("legacy", legacy_func, legacy_body), ("compact", compact_func, compact_body)):
+        print(f"  {name:<10}{len(body):>10,}{len(gzip.compress(body)):>12,}{time_call(func, repeat):>15.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response payloads and serialization")
+    parser.add_argument("--articles", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "articles"))
+    parser.add_argument("--k", type=int, default=6, help="Retrieved chunks per variant (default: 6)")
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    processor = SlovakArticleProcessor(FixedSizeChunker())
+    documents = processor.process_articles(args.articles)
+    usage = UsageData(model="gpt-4-turbo-preview", prompt_tokens=2100, completion_tokens=380,
+                      total_tokens=2480, response_time_ms=9100)
+    answer = "Odpoveď " * 200
+
+    chat = ChatResponse(response=answer, sources=build_sources(documents, RAGVariant.FIXED_SIZE, args.k),
+                        session_id="benchmark", timestamp=datetime.now(), usage=usage)
+    comparison = ComparisonResponse(
+        responses=[
+            VariantResponse(variant_name=name, response=answer, sources=build_sources(documents, variant, args.k),
+                            processing_time=9.3, usage=usage)
+            for variant, name in ((RAGVariant.FIXED_SIZE, "Fixed-Size Chunking"), (RAGVariant.SEMANTIC, "Semantic Chunking"))
+        ],
+        session_id="benchmark",
+        timestamp=datetime.now()
+    )
+
+    print("\n" + "=" * 50)
+    print("🧬 MITO Response Serialization Benchmark")
+    print("=" * 50)
+
+    # Legacy path: what FastAPI does for response_model responses
+    report(
+        "/api/chat",
+        lambda: JSONResponse(ChatResponse.model_validate(chat).model_dump(mode="json")).body,
+        lambda: FastJSONResponse(compact_chat_payload(chat)).body,
+        args.repeat
+    )
+    report(
+        "/api/chat/compare",
+        lambda: JSONResponse(ComparisonResponse.model_validate(comparison).model_dump(mode="json")).body,
+        lambda: FastJSONResponse(compact_comparison_payload(comparison)).body,
+        args.repeat
+    )
+
+if __name__ == "__main__":
+    main()
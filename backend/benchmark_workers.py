@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark multi-worker serving with shared memory-mapped index artifacts.
+Starts uvicorn with 1..N workers in artifact mode, replays /api/chat/compare
+against mock_openai_server.py, and reports throughput, latency
+and memory per worker count. RSS counts the shared artifact pages in every
+worker; PSS splits them between the workers that map them, so the PSS total
+is what the machine actually spends.
+
+Without --artifact-dir a synthetic artifact is built from data/articles
+(fixed-size chunks, deterministic fake embeddings) for both variants.
+Linux only (reads /proc).
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import numpy as np
+import httpx
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from load_test import (
+    QUESTIONS, free_port, start_mock_openai, start_backend, stop_process, build_synthetic_artifacts
+)
+
+# The mock answers instantly, so the server is what is measured
+MOCK_ARGS = ["--embedding-ms", "0", "--ttft-ms", "0", "--token-ms", "0", "--tokens", "40"]
+
+def process_tree(root_pid: int) -> list:
+    """root_pid and all of its descendants."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    pids, stack = [], [root_pid]
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        stack.extend(children.get(pid, []))
+    return pids
+
+def memory_kb(pid: int, artifact_root: str) -> dict:
+    """Total RSS/PSS of a process and the part that maps artifact files."""
+    usage = {"rss": 0, "pss": 0, "index_rss": 0, "index_pss": 0}
+    try:
+        with open(f"/proc/{pid}/smaps") as f:
+            in_index = False
+            for line in f:
+                fields = line.split()
+                if not fields[0].endswith(":"):
+                    in_index = len(fields) >= 6 and fields[5].startswith(artifact_root)
+                    continue
+                if fields[0] in ("Rss:", "Pss:"):
+                    key = fields[0][:-1].lower()
+                    usage[key] += int(fields[1])
+                    if in_index:
+                        usage[f"index_{key}"] += int(fields[1])
+    except OSError:
+        pass
+    return usage
+
+async def run_load(base_url: str, concurrency: int, duration: float) -> dict:
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+
+    async def client_loop(client, offset):
+        nonlocal errors
+        i = offset
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await client.post("/api/chat/compare",
+                                             json={"message": QUESTIONS[i % len(QUESTIONS)], "compact": True})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+            except httpx.HTTPError:
+                errors += 1
+            i += 1
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        await asyncio.gather(*[client_loop(client, i) for i in range(concurrency)])
+
+    return {
+        "throughput": len(latencies) / duration,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000) if latencies else 0.0,
+        "p95_ms": float(np.percentile(latencies, 95) * 1000) if latencies else 0.0,
+        "errors": errors
+    }
+
+def benchmark_workers(workers: int, args, artifact_root: str, mock_url: str) -> dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    process = start_backend(port, mock_url, artifact_root, workers)
+    try:
+        asyncio.run(run_load(base_url, args.concurrency, args.warmup))
+        result = asyncio.run(run_load(base_url, args.concurrency, args.duration))
+
+        usage = [memory_kb(pid, artifact_root) for pid in process_tree(process.pid)]
+        for key in ("rss", "pss", "index_rss", "index_pss"):
+            result[key] = sum(u[key] for u in usage) / 1024
+        return result
+    finally:
+        stop_process(process)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark throughput and memory across uvicorn worker counts")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients (default: 16)")
+    parser.add_argument("--duration", type=float, default=20, help="Measured seconds per worker count")
+    parser.add_argument("--warmup", type=float, default=5, help="Warm-up seconds per worker count")
+    parser.add_argument("--artifact-dir", help="Serve existing artifacts instead of synthetic ones")
+    parser.add_argument("--replicate", type=int, default=4, help="Copies of the corpus in the synthetic artifact")
+    args = parser.parse_args()
+
+    mock_port = free_port()
+    mock = start_mock_openai(mock_port, MOCK_ARGS)
+    mock_url = f"http://127.0.0.1:{mock_port}/v1"
+
+    with tempfile.TemporaryDirectory(prefix="mito_artifacts_") as tmp:
+        artifact_root = os.path.abspath(args.artifact_dir or tmp)
+        if not args.artifact_dir:
+            count = build_synthetic_artifacts(artifact_root, args.replicate)
+            print(f"📦 Synthetic artifacts: {count:,} chunks per variant in {artifact_root}")
+
+        print(f"\n🧪 {os.cpu_count()} CPUs, {args.concurrency} clients, {args.duration:.0f}s per run\n")
+        print(f"{'workers':>7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'errors':>8}"
+              f"{'RSS MB':>10}{'PSS MB':>10}{'index RSS':>11}{'index PSS':>11}")
+        for workers in args.workers:
+            r = benchmark_workers(workers, args, artifact_root, mock_url)
+            print(f"{workers:>7}{r['throughput']:>9.1f}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['errors']:>8}"
+                  f"{r['rss']:>10.1f}{r['pss']:>10.1f}{r['index_rss']:>11.1f}{r['index_pss']:>11.1f}")
+
+    stop_process(mock)
+    print("\nindex RSS counts the mapped artifact pages once per worker; index PSS is the single shared copy.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Report what passage deduplication (app/rag/dedup.py, setup_rag.py --dedup)
+removes from the corpus and what it saves at ingest, without API calls:
+
+- fixed-size chunks, and so chunk embeddings, before and after;
+- sentences SemanticChunker embeds (its sentence embedding calls) before and after;
+- redundant chunks: fixed-size chunks with a near-duplicate chunk in another
+  article, which is what crowds distinct context out of the top-k window.
+"""
+
+import os
+import sys
+import time
+import math
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.rag.data_processor import MIN_CONTENT_CHARS, SlovakArticleProcessor, build_article_text
+from app.rag.dedup import PassageDeduplicator
+from app.rag.chunkers.fixed_size import FixedSizeChunker
+from app.rag.segmentation import split_sentence_spans, merge_short_spans
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ARTICLES_PATH = os.path.join(SCRIPT_DIR, "data", "articles")
+
+# Batch sizes the ingest uses: MitoVectorStore.add_documents and SemanticChunker
+CHUNK_BATCH = 50
+SENTENCE_BATCH = 20
+
+def corpus_counts(articles: list, deduplicator: PassageDeduplicator) -> dict:
+    chunker = FixedSizeChunker()
+    chunks, owners, sentences, sentence_calls = [], [], 0, 0
+    for index, article in enumerate(articles):
+        if len((article.get('content') or '').strip()) < MIN_CONTENT_CHARS:
+            continue  # skipped by SlovakArticleProcessor as well
+        text = build_article_text(article)
+        article_chunks = [doc.page_content for doc in chunker.chunk_text(text, {})]
+        chunks.extend(article_chunks)
+        owners.extend([index] * len(article_chunks))
+        article_sentences = len(merge_short_spans(split_sentence_spans(text), 40))
+        sentences += article_sentences
+        sentence_calls += math.ceil(article_sentences / SENTENCE_BATCH)
+
+    redundant = 0
+    for members in deduplicator.cluster(chunks):
+        if len({owners[i] for i in members}) > 1:
+            redundant += len(members) - 1
+    return {
+        "chunks": len(chunks),
+        "chunk_calls": math.ceil(len(chunks) / CHUNK_BATCH),
+        "chars": sum(len(chunk) for chunk in chunks),
+        "sentences": sentences,
+        "sentence_calls": sentence_calls,
+        "redundant": redundant
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the savings of passage deduplication at ingest")
+    parser.add_argument("--articles", default=ARTICLES_PATH)
+    parser.add_argument("--threshold", type=float, default=0.7, help="Jaccard similarity of near-duplicates")
+    parser.add_argument("--boilerplate-min-articles", type=int, default=3,
+                        help="Passages repeated in this many articles are removed everywhere")
+    parser.add_argument("--show", type=int, default=10, help="Boilerplate passages to list")
+    args = parser.parse_args()
+
+    deduplicator = PassageDeduplicator(threshold=args.threshold, boilerplate_min_articles=args.boilerplate_min_articles)
+    articles = SlovakArticleProcessor().load_articles(args.articles)
+
+    start = time.perf_counter()
+    deduplicated, report = deduplicator.deduplicate(articles)
+    elapsed = time.perf_counter() - start
+    print(f"\n🧹 Deduplication ({elapsed:.2f}s): {report.summary()}")
+    for item in report.boilerplate[:args.show]:
+        print(f"   {item['articles']:>3} articles  {item['text'][:90]!r}")
+
+    before = corpus_counts(articles, deduplicator)
+    after = corpus_counts(deduplicated, deduplicator)
+    print(f"\n{'':<32}{'before':>10}{'after':>10}{'saved':>10}")
+    for key, label in (("chunks", "Fixed-size chunks (embeddings)"), ("chunk_calls", f"  embedding requests (by {CHUNK_BATCH})"),
+                       ("chars", "Indexed characters"), ("sentences", "Semantic sentence embeddings"),
+                       ("sentence_calls", f"  embedding requests (by {SENTENCE_BATCH})"),
+                       ("redundant", "Redundant chunks")):
+        saved = before[key] - after[key]
+        share = saved / before[key] if before[key] else 0.0
+        print(f"{label:<32}{before[key]:>10,}{after[key]:>10,}{saved:>10,} ({share:.1%})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Check the import budget of the serving path: importing app.main in a fresh
+interpreter must stay under a wall-time and module-count budget and must not
+load ingestion-only dependencies (chunkers, scikit-learn, pandas, Chroma).
+Exits with status 1 when a budget is exceeded, so it can run in CI.
+
+The time budget depends on the machine; pass --max-seconds for slower runners.
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from collections import Counter
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules the API process must not import: ingestion, chunking and Chroma are
+# loaded by setup_rag.py or in the chroma index mode only when a store opens
+FORBIDDEN_MODULES = (
+    "sklearn", "scipy", "pandas", "chromadb", "langchain_community", "langchain_text_splitters",
+    "app.rag.chunkers.fixed_size", "app.rag.chunkers.semantic", "app.rag.data_processor",
+    "app.rag.dedup", "app.rag.chunk_sweep"
+)
+
+CHILD = """
+import json, sys, time, resource
+start = time.perf_counter()
+import app.main
+seconds = time.perf_counter() - start
+print(json.dumps({
+    "seconds": seconds,
+    "modules": sorted(sys.modules),
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+}))
+"""
+
+def measure(module_env: dict) -> dict:
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD], cwd=SCRIPT_DIR, env=module_env,
+                            capture_output=True, text=True, check=True)
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    # -X importtime lines: "import time: self [us] | cumulative | imported package"; a
+    # package root's cumulative time includes the dependencies it imported first
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and line.count("|") == 2:
+            _, total, name = line.split("|")
+            name = name.strip()
+            if total.strip().isdigit() and "." not in name:
+                cumulative[name] = int(total) / 1e6
+    data["packages"] = cumulative
+    return data
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import time and module count of app.main")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time (median is checked)")
+    parser.add_argument("--max-seconds", type=float, default=2.0, help="Budget for importing app.main")
+    parser.add_argument("--max-modules", type=int, default=1600, help="Budget for modules loaded by app.main")
+    parser.add_argument("--show", type=int, default=8, help="Slowest imports and largest packages to list")
+    args = parser.parse_args()
+
+    module_env = dict(os.environ, OPENAI_API_KEY=os.getenv("OPENAI_API_KEY") or "import-budget-check")
+
+    print("⏱️  MITO Import Budget Check")
+    print("=" * 50)
+    runs = [measure(module_env) for _ in range(args.runs)]
+    seconds = float(np.median([run["seconds"] for run in runs]))
+    modules = runs[-1]["modules"]
+    rss_mb = np.median([run["max_rss_kb"] for run in runs]) / 1024
+
+    print(f"import app.main: {seconds:.2f}s median of {args.runs} (budget {args.max_seconds:.2f}s), "
+          f"{len(modules)} modules (budget {args.max_modules}), {rss_mb:.0f} MB max RSS")
+
+    slowest = sorted(runs[-1]["packages"].items(), key=lambda item: -item[1])[:args.show]
+    print("\nSlowest packages (cumulative import time):")
+    for name, elapsed in slowest:
+        print(f"   {elapsed * 1000:>8.0f} ms  {name}")
+    print("\nPackages with most modules:")
+    for package, count in Counter(name.split(".")[0] for name in modules).most_common(args.show):
+        print(f"   {count:>8}  {package}")
+
+    failures = []
+    if seconds > args.max_seconds:
+        failures.append(f"import took {seconds:.2f}s, budget {args.max_seconds:.2f}s")
+    if len(modules) > args.max_modules:
+        failures.append(f"{len(modules)} modules loaded, budget {args.max_modules}")
+    forbidden = sorted(name for name in modules if name.split(".")[0] in FORBIDDEN_MODULES or name in FORBIDDEN_MODULES)
+    if forbidden:
+        failures.append(f"ingestion-only modules loaded: {', '.join(forbidden[:10])}")
+
+    print()
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ app.main is within its import budget")
+
+if __name__ == "__main__":
+    main()
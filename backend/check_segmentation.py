@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Check the Slovak sentence segmenter against the golden corpus.
+Verifies data/segmentation_golden.json (passages taken from data/articles) and
+reports sentence counts and timing for the whole corpus against the regex
+splitting SemanticChunker used before app/rag/segmentation.py. The merged count
+is what SemanticChunker embeds (short fragments joined to the next sentence).
+"""
+
+import os
+import re
+import sys
+import json
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.rag.segmentation import split_sentences, split_sentence_spans, merge_short_spans
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_PATH = os.path.join(SCRIPT_DIR, "data", "segmentation_golden.json")
+ARTICLES_PATH = os.path.join(SCRIPT_DIR, "data", "articles")
+
+def legacy_split(text: str) -> list:
+    """The previous SemanticChunker._split_into_sentences, kept for comparison."""
+    text = re.sub(r'\b(Dr|Prof|Mgr|Ing|PhD|RNDr|MUDr|MVDr|JUDr|PhDr|PaedDr|ThDr|etc|tzn|napr|resp|tzv|apod|č|s|r|o|z|v|k|na|po|pre|pri|cca|min|max|kg|g|mg|ml|l|cm|m|km|°C|%)\\.', r'\\1<DOT>', text)
+    sentences = re.split(r'[.!?]+(?=\s+[A-ZÁČĎÉÍĹĽŇÓŔŠŤÚÝŽ]|\s*$)', text)
+    return [re.sub(r'<DOT>', '.', sentence.strip()) for sentence in sentences if sentence.strip()]
+
+def chunker_split(text: str) -> list:
+    """Sentences as SemanticChunker embeds them, with its default min_sentence_chars."""
+    return [text[start:end] for start, end in merge_short_spans(split_sentence_spans(text), 40)]
+
+def check_golden() -> bool:
+    with open(GOLDEN_PATH, 'r', encoding='utf-8') as f:
+        cases = json.load(f)
+
+    failures = 0
+    for case in cases:
+        actual = split_sentences(case["text"])
+        if actual != case["sentences"]:
+            failures += 1
+            print(f"❌ {case['source_file']}")
+            print(f"   expected: {case['sentences']}")
+            print(f"   actual:   {actual}")
+
+    print(f"{'✅' if failures == 0 else '❌'} Golden corpus: {len(cases) - failures}/{len(cases)} passages segmented correctly")
+    return failures == 0
+
+def corpus_stats():
+    texts = []
+    for filename in sorted(os.listdir(ARTICLES_PATH)):
+        if filename.endswith('.json'):
+            with open(os.path.join(ARTICLES_PATH, filename), 'r', encoding='utf-8') as f:
+                article = json.load(f)
+            texts.append(f"Názov: {article.get('title', '')}\n\n{article.get('content', '')}")
+
+    print(f"\n📊 Corpus: {len(texts)} articles")
+    for name, splitter in (("legacy", legacy_split), ("segmentation", split_sentences), ("merged", chunker_split)):
+        start = time.perf_counter()
+        sentences = [sentence for text in texts for sentence in splitter(text)]
+        elapsed = time.perf_counter() - start
+        tiny = sum(1 for sentence in sentences if len(sentence) < 20)
+        print(f"  {name:<14}{len(sentences):>8,} sentences{tiny:>8,} under 20 chars{elapsed * 1000:>10.1f} ms")
+
+def main():
+    ok = check_golden()
+    corpus_stats()
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
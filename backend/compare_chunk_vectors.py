@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Compare pooled semantic chunk vectors with re-embedded chunks before choosing
+how the semantic variant is ingested (SemanticChunker chunk_vectors).
+
+"embedded" sends every chunk text to text-embedding-3-large after its
+sentences were already embedded for chunking; "pooled" uses the
+length-weighted, re-normalized mean of the sentence vectors and saves those
+calls. Both are built for the variant's chunker settings from the shared
+sentence cache. The script reports how much the two rankings agree on a
+question set, plus recall@k and MRR if the questions are labelled (see
+sweep_chunking.py), and recommends a setting.
+
+Usage:
+  python compare_chunk_vectors.py
+  python compare_chunk_vectors.py --questions labelled_questions.json --variant semantic_t80
+"""
+
+import os
+import sys
+import json
+import argparse
+from datetime import datetime
+import numpy as np
+from dotenv import load_dotenv
+from langchain_openai import OpenAIEmbeddings
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.rag.chunk_sweep import (
+    SentenceCache, ChunkSet, RelevanceLabels, load_labelled_questions, cached_question_vectors,
+    score_chunk_set, config_name
+)
+from app.rag.vectors import normalize
+from app.rag.rag_factory import RAGServiceFactory
+from load_test import QUESTIONS
+from sweep_chunking import load_sentences, print_row
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def embedded_chunk_vectors(cache_dir: str, config: dict, texts: list, embeddings: OpenAIEmbeddings) -> np.ndarray:
+    """Chunk embeddings of a configuration, reusing the ones sweep_chunking.py --promote saved."""
+    path = os.path.join(cache_dir, "promoted", config_name(config))
+    if os.path.exists(os.path.join(path, "chunks.json")):
+        with open(os.path.join(path, "chunks.json"), 'r', encoding='utf-8') as f:
+            if json.load(f)["texts"] == texts:
+                print(f"♻️  Reusing chunk embeddings from {path}")
+                return np.load(os.path.join(path, "embeddings.npy"))
+    print(f"🚀 Embedding {len(texts):,} chunks...")
+    vectors = normalize(np.asarray(embeddings.embed_documents(texts), dtype=np.float32))
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "embeddings.npy"), vectors)
+    with open(os.path.join(path, "chunks.json"), 'w', encoding='utf-8') as f:
+        json.dump({"config": config, "texts": texts}, f, ensure_ascii=False)
+    return vectors
+
+def top_rows(query_vectors: np.ndarray, chunk_vectors: np.ndarray, k: int) -> np.ndarray:
+    scores = query_vectors @ chunk_vectors.T
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(top, order, axis=1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare pooled sentence vectors with re-embedded semantic chunks")
+    parser.add_argument("--variant", default="semantic", help="Semantic variant whose chunker settings are compared")
+    parser.add_argument("--articles", default=os.path.join(SCRIPT_DIR, "data", "articles"))
+    parser.add_argument("--cache-dir", default=os.path.join(SCRIPT_DIR, "chunk_sweep_cache"))
+    parser.add_argument("--questions", help="Labelled questions (JSON list, see sweep_chunking.py)")
+    parser.add_argument("--queries", help="Unlabelled questions, one per line (default: the load test questions)")
+    parser.add_argument("--k", type=int, nargs="+", default=[3, 6])
+    parser.add_argument("--max-recall-drop", type=float, default=0.02,
+                        help="Largest recall@k loss of pooled vectors still recommended (labelled questions)")
+    parser.add_argument("--min-overlap", type=float, default=0.8,
+                        help="Smallest top-k overlap with embedded chunks still recommended (unlabelled questions)")
+    args = parser.parse_args()
+
+    load_dotenv()
+    if not os.getenv('OPENAI_API_KEY'):
+        print("❌ Error: OPENAI_API_KEY not found in environment variables")
+        return
+
+    print("🧪 MITO Pooled vs. Embedded Chunk Vectors")
+    print("=" * 50)
+
+    chunker = RAGServiceFactory.create_chunker(args.variant)
+    if not hasattr(chunker, "chunk_vectors"):
+        print(f"❌ Variant '{args.variant}' doesn't use the semantic chunker")
+        return
+    config = {
+        "similarity_threshold": chunker.similarity_threshold,
+        "min_chunk_size": chunker.min_chunk_size,
+        "max_chunk_size": chunker.max_chunk_size
+    }
+    print(f"🔧 {args.variant}: {config_name(config)}, currently chunk_vectors=\"{chunker.chunk_vectors}\"")
+
+    # Same model and batch size as SemanticChunker's sentence embeddings
+    embeddings = OpenAIEmbeddings(model="text-embedding-3-large", chunk_size=50)
+    cache = SentenceCache(args.cache_dir, embeddings.model, chunker.min_sentence_chars)
+    articles = load_sentences(cache, args.articles, embeddings)
+
+    chunk_set = ChunkSet(config, articles)
+    texts = chunk_set.texts()
+    pooled = chunk_set.pooled_vectors()
+    embedded = embedded_chunk_vectors(args.cache_dir, config, texts, embeddings)
+    similarity = np.sum(pooled * embedded, axis=1)
+    print(f"📊 {len(texts):,} chunks; cosine(pooled, embedded) mean {similarity.mean():.3f}, "
+          f"5th percentile {np.percentile(similarity, 5):.3f}")
+
+    k_values = sorted(set(args.k))
+    report = {"variant": args.variant, "config": config, "chunks": len(texts),
+              "mean_cosine": float(similarity.mean()), "created_at": datetime.now().isoformat()}
+
+    if args.questions:
+        questions = load_labelled_questions(args.questions)
+        query_vectors = cached_question_vectors(args.cache_dir, [entry["question"] for entry in questions],
+                                                embeddings.embed_documents)
+        labels = RelevanceLabels(questions, articles)
+        real = score_chunk_set(chunk_set, embedded, query_vectors, labels, k_values)
+        approximate = score_chunk_set(chunk_set, pooled, query_vectors, labels, k_values)
+        header_recalls = "".join(f"{f'recall@{k}':>11}" for k in k_values)
+        header_tokens = "".join(f"{f'tokens@{k}':>11}" for k in k_values)
+        print(f"\n{'chunk vectors':<26}{'chunks':>8}{'tok/ch':>8}{header_recalls}{'mrr':>7}{header_tokens}")
+        print_row("embedded", real, k_values)
+        print_row("pooled", approximate, k_values)
+        key = f"recall@{k_values[-1]}"
+        recommended = "pooled" if real[key] - approximate[key] <= args.max_recall_drop else "embedded"
+        reason = f"{key} {approximate[key]:.1%} pooled vs. {real[key]:.1%} embedded"
+        report.update({"embedded": real, "pooled": approximate})
+    else:
+        if args.queries:
+            with open(args.queries, 'r', encoding='utf-8') as f:
+                questions = [line.strip() for line in f if line.strip()]
+        else:
+            questions = list(QUESTIONS)
+        query_vectors = cached_question_vectors(args.cache_dir, questions, embeddings.embed_documents)
+        print(f"\n{'k':>4}{'top-k overlap':>16}{'same top-1':>12}")
+        overlaps = {}
+        for k in k_values:
+            real_top, pooled_top = top_rows(query_vectors, embedded, k), top_rows(query_vectors, pooled, k)
+            overlaps[k] = float(np.mean([len(set(a) & set(b)) / k for a, b in zip(real_top, pooled_top)]))
+            same_top = float(np.mean(real_top[:, 0] == pooled_top[:, 0]))
+            print(f"{k:>4}{overlaps[k]:>16.1%}{same_top:>12.1%}")
+        overlap = overlaps[k_values[-1]]
+        recommended = "pooled" if overlap >= args.min_overlap else "embedded"
+        reason = f"pooled vectors share {overlap:.0%} of the embedded top-{k_values[-1]} (no labels, agreement only)"
+        report.update({"overlap": overlaps})
+
+    report["recommended"] = recommended
+    print(f"\n🏁 Recommended: chunk_vectors=\"{recommended}\" ({reason})")
+    print(f"   \"pooled\" saves {len(texts):,} embedding inputs per full semantic ingest.")
+    if recommended != chunker.chunk_vectors:
+        print(f"   Set \"chunk_vectors\": \"{recommended}\" in the chunker_params of '{args.variant}' "
+              f"(MITO_VARIANTS or MITO_VARIANTS_FILE, see app/rag/variants.py)")
+
+    report_path = os.path.join(args.cache_dir, f"chunk_vectors_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📄 Results saved to {report_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Evaluate the compact Matryoshka index against today's full-dimension search.
+Reports recall@k versus exact 3072-dimension search, memory footprint and
+per-query latency for each (dims, quantization) setting and for Chroma itself.
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.rag.compact_index import CompactIndex, QUANTIZATIONS
+from app.rag.vectors import normalize
+from app.rag.rag_factory import RAGServiceFactory
+from app.models.types import RAGVariant
+
+def directory_size(path: str) -> int:
+    """Total size of all files below a directory."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+def load_queries(args, vector_store, full: np.ndarray) -> np.ndarray:
+    """Embed the questions file, or sample stored chunk vectors as queries."""
+    if args.queries:
+        with open(args.queries, 'r', encoding='utf-8') as f:
+            questions = [line.strip() for line in f if line.strip()]
+        print(f"🔤 Embedding {len(questions)} questions from {args.queries}...")
+        return normalize(np.asarray(vector_store.embeddings.embed_documents(questions), dtype=np.float32))
+
+    # Without a questions file use perturbed chunk vectors, so the query is
+    # close to, but not identical with, a stored vector
+    rng = np.random.default_rng(args.seed)
+    rows = rng.choice(len(full), size=min(args.samples, len(full)), replace=False)
+    noise = rng.normal(scale=args.noise / np.sqrt(full.shape[1]), size=(len(rows), full.shape[1]))
+    print(f"🎲 Using {len(rows)} perturbed chunk vectors as queries (no --queries file given)")
+    return normalize((full[rows] + noise).astype(np.float32))
+
+def percentile_ms(latencies: list, percentile: float) -> float:
+    return float(np.percentile(latencies, percentile) * 1000) if latencies else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate compact index recall, memory and latency")
+    parser.add_argument("--variant", choices=["fixed", "semantic"], default="fixed")
+    parser.add_argument("--queries", help="Text file with one question per line (embedded via OpenAI)")
+    parser.add_argument("--samples", type=int, default=200, help="Sampled queries when no --queries file is given")
+    parser.add_argument("--noise", type=float, default=0.5, help="Relative noise added to sampled query vectors")
+    parser.add_argument("--k", type=int, default=6, help="Number of results compared (default: 6)")
+    parser.add_argument("--candidates", type=int, default=48, help="Candidates re-ranked with full vectors")
+    parser.add_argument("--dims", type=int, nargs="+", default=[256, 512])
+    parser.add_argument("--quantizations", nargs="+", choices=QUANTIZATIONS, default=list(QUANTIZATIONS))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    print("🧬 MITO Compact Index Evaluation")
+    print("=" * 50)
+
+    variant = RAGVariant(args.variant)
+    vector_store = RAGServiceFactory.create_vector_store(variant)
+    data = vector_store.get_all_embeddings()
+    if not data["ids"]:
+        print(f"❌ The {variant.value} collection is empty, run setup_rag.py first")
+        return
+
+    full = normalize(np.asarray(data["embeddings"], dtype=np.float32))
+    queries = load_queries(args, vector_store, full)
+    k = min(args.k, len(full))
+    print(f"📊 {len(full)} vectors x {full.shape[1]} dims, {len(queries)} queries, k={k}")
+
+    # Ground truth: exact full-dimension search
+    exact_latencies = []
+    truth = []
+    for query in queries:
+        start = time.perf_counter()
+        scores = full @ query
+        top = np.argpartition(-scores, k - 1)[:k]
+        exact_latencies.append(time.perf_counter() - start)
+        truth.append(set(top.tolist()))
+
+    # Today's setup: Chroma query by vector
+    chroma_latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        vector_store.vectorstore._collection.query(query_embeddings=[query.tolist()], n_results=k)
+        chroma_latencies.append(time.perf_counter() - start)
+
+    print("\n" + "-" * 78)
+    print(f"{'setup':<24}{'recall@k':>10}{'memory MB':>12}{'p50 ms':>10}{'p95 ms':>10}")
+    print("-" * 78)
+    print(f"{'chroma (today)':<24}{1.0:>10.3f}{directory_size(vector_store.persist_directory) / 1e6:>12.2f}"
+          f"{percentile_ms(chroma_latencies, 50):>10.2f}{percentile_ms(chroma_latencies, 95):>10.2f}")
+    print(f"{'exact numpy float32':<24}{1.0:>10.3f}{full.nbytes / 1e6:>12.2f}"
+          f"{percentile_ms(exact_latencies, 50):>10.2f}{percentile_ms(exact_latencies, 95):>10.2f}")
+
+    ids = list(data["ids"])
+    for dims in args.dims:
+        for quantization in args.quantizations:
+            index = CompactIndex.build(ids, list(data["documents"]), list(data["metadatas"]), full, dims, quantization)
+            latencies = []
+            hits = 0
+            for query, expected in zip(queries, truth):
+                start = time.perf_counter()
+                rows = index.search_ids(query, k=k, candidates=args.candidates)
+                latencies.append(time.perf_counter() - start)
+                hits += len(expected.intersection(row for row, _ in rows))
+
+            recall = hits / (len(queries) * k)
+            memory_mb = index.memory_bytes()["compact_bytes"] / 1e6
+            label = f"{dims}d {quantization}"
+            print(f"{label:<24}{recall:>10.3f}{memory_mb:>12.2f}"
+                  f"{percentile_ms(latencies, 50):>10.2f}{percentile_ms(latencies, 95):>10.2f}")
+
+    print("-" * 78)
+    print("Memory for compact setups counts only the in-memory prefix matrix; full vectors")
+    print(f"({full.nbytes / 1e6:.2f} MB) stay on disk and are memory-mapped for re-ranking.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Evaluate coarse-to-fine retrieval (MITO_ARTICLE_CANDIDATES) against flat search.
+Ranks articles by chunk centroid, searches only the chunks of the top M
+articles and reports recall@k versus a flat search over every chunk, the rows
+scored per query and per-query latency for each M.
+"""
+
+import os
+import sys
+import time
+import argparse
+from types import SimpleNamespace
+import numpy as np
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.rag.article_index import ArticleIndex
+from app.rag.compact_index import CompactIndex
+from app.rag.vectors import normalize
+from app.rag.index_artifact import load_artifact
+from app.rag.rag_factory import RAGServiceFactory
+from app.rag.vector_store import shared_embeddings
+from evaluate_compact_index import load_queries, percentile_ms
+
+def open_index(args):
+    """The variant's artifact, or a compact index built from its Chroma collection; plus its vector store."""
+    if args.artifact_dir:
+        index, manifest = load_artifact(args.artifact_dir, args.variant)
+        print(f"📦 Artifact {manifest['version']} for {args.variant}")
+        return index, None
+    vector_store = RAGServiceFactory.create_vector_store(args.variant)
+    data = vector_store.get_all_embeddings()
+    if not data["ids"]:
+        return None, vector_store
+    index = CompactIndex.build(list(data["ids"]), list(data["documents"]), list(data["metadatas"]), data["embeddings"])
+    return index, vector_store
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate article-centroid coarse-to-fine retrieval against flat search")
+    parser.add_argument("--variant", default="fixed")
+    parser.add_argument("--artifact-dir", help="Evaluate the variant's index artifact instead of its Chroma collection")
+    parser.add_argument("--queries", help="Text file with one question per line (embedded via OpenAI)")
+    parser.add_argument("--samples", type=int, default=200, help="Sampled queries when no --queries file is given")
+    parser.add_argument("--noise", type=float, default=0.5, help="Relative noise added to sampled query vectors")
+    parser.add_argument("--k", type=int, default=6, help="Number of results compared (default: 6)")
+    parser.add_argument("--candidates", type=int, default=48, help="Candidates re-ranked with full vectors")
+    parser.add_argument("--articles", type=int, nargs="+", default=[2, 4, 8, 16, 32], help="Values of M to evaluate")
+    parser.add_argument("--article-dims", type=int, default=0,
+                        help="Centroid dimensions, 0 for all (MITO_ARTICLE_INDEX_DIMS)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    print("🧬 MITO Coarse-to-Fine Retrieval Evaluation")
+    print("=" * 50)
+
+    index, vector_store = open_index(args)
+    if index is None:
+        print(f"❌ The {args.variant} collection is empty, run setup_rag.py first")
+        return
+
+    start = time.perf_counter()
+    article_index = ArticleIndex.from_compact_index(index, dims=args.article_dims or None)
+    build_time = time.perf_counter() - start
+    print(f"📊 {len(index)} chunks in {len(article_index)} articles; article index ({article_index.dims} dims) "
+          f"built in {build_time * 1000:.0f} ms ({article_index.memory_bytes() / 1024:.0f} KB)")
+
+    # load_queries only needs an object with the embeddings client to embed a questions file
+    embedder = vector_store or SimpleNamespace(embeddings=shared_embeddings(index.embedding_model))
+    queries = load_queries(args, embedder, normalize(np.asarray(index.full_vectors, dtype=np.float32)))
+    k = min(args.k, len(index))
+
+    # Ground truth: today's flat search over every chunk
+    flat_latencies, truth = [], []
+    for query in queries:
+        start = time.perf_counter()
+        rows = [row for row, _ in index.search_ids(query, k=k, candidates=args.candidates)]
+        flat_latencies.append(time.perf_counter() - start)
+        truth.append(rows)
+
+    print("\n" + "-" * 78)
+    print(f"{'setup':<16}{'recall@k':>10}{'top-1':>8}{'rows/query':>12}{'p50 ms':>10}{'p95 ms':>10}")
+    print("-" * 78)
+    print(f"{'flat':<16}{1.0:>10.3f}{1.0:>8.3f}{len(index):>12,}"
+          f"{percentile_ms(flat_latencies, 50):>10.2f}{percentile_ms(flat_latencies, 95):>10.2f}")
+
+    for m in args.articles:
+        latencies, hits, top_hits, scanned = [], 0, 0, 0
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            rows = article_index.candidate_rows(query, m)
+            results = index.search_ids(query, k=k, candidates=args.candidates, rows=rows)
+            latencies.append(time.perf_counter() - start)
+            scanned += len(article_index) + len(rows)
+            found = [row for row, _ in results]
+            hits += len(set(expected).intersection(found))
+            top_hits += bool(found) and bool(expected) and found[0] == expected[0]
+        print(f"{f'M={m}':<16}{hits / (len(queries) * k):>10.3f}{top_hits / len(queries):>8.3f}"
+              f"{scanned // len(queries):>12,}{percentile_ms(latencies, 50):>10.2f}{percentile_ms(latencies, 95):>10.2f}")
+
+    print("-" * 78)
+    print("Rows per query counts article centroids plus the chunks searched in the top M articles.")
+    print("top-1: share of queries whose best flat result is also the best coarse-to-fine result.")
+
+if __name__ == "__main__":
+    main()
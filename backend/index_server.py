@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Index server: serves the variants' index artifacts over HTTP to API replicas
+running with MITO_INDEX_MODE=remote (see app/rag/remote_index.py).
+
+One process maps each variant's current artifact once and answers batched
+multi-query searches, so API replicas hold no index, start without loading one
+and scale independently of it. Queries without topic filters that share a
+variant and k are scored in one pass over the compact matrix. The server
+follows the CURRENT pointers (--watch-interval, or POST /reload) and keeps
+answering from the previous version until the new one has loaded.
+
+Endpoints:
+  POST /search           {"queries": [{"variant", "embedding" (base64 float32), "k",
+                          "candidates", "topics", "articles", "with_vectors"}]} -> {"results": [[hit, ...], ...]},
+                         one entry per query; a query that cannot be answered gets
+                         {"error", "status"} (404 no artifact, 400 malformed) instead
+  POST /lexical          {"variant", "query", "k"} -> {"results": [hit, ...]}, keyword search
+                         for degraded answers while embeddings are unavailable
+  GET  /variants/{name}  version and document count of the served artifact
+  POST /reload           switch variants whose CURRENT pointer changed
+  GET  /health
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import threading
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.api.compact import FastJSONResponse
+from app.rag.article_index import ArticleIndex
+from app.rag.lexical_index import LexicalIndex, lexical_distances
+from app.rag.index_artifact import ArtifactError, load_artifact, read_current_version
+from app.rag.remote_index import decode_vector, encode_vector
+
+load_dotenv()
+
+
+# Errors that concern one query of a batch: its variant has no artifact, or it is malformed
+QUERY_ERRORS = (ArtifactError, KeyError, ValueError, TypeError)
+
+def query_error(error: Exception) -> dict:
+    """A failed query's entry in /search results, with the HTTP status it would have had on its own."""
+    if isinstance(error, ArtifactError):
+        return {"error": str(error), "status": 404}
+    return {"error": f"Invalid query: {error}", "status": 400}
+
+
+class ArtifactIndexes:
+    """The current artifact of every requested variant, opened on first use."""
+
+    def __init__(self, artifact_root: str, default_candidates: int = 48):
+        self.artifact_root = artifact_root
+        self.default_candidates = default_candidates
+        self.indexes = {}
+        self.article_indexes = {}  # by (variant, version)
+        self.lexical_indexes = {}  # by (variant, version)
+        self._lock = threading.Lock()
+
+    def get(self, variant: str):
+        """(index, manifest) of the variant; raises ArtifactError if it has no artifact."""
+        loaded = self.indexes.get(variant)
+        if loaded is None:
+            with self._lock:
+                if variant not in self.indexes:
+                    self.indexes[variant] = self._open(variant)
+                loaded = self.indexes[variant]
+        return loaded
+
+    def _open(self, variant: str, version: str = None):
+        index, manifest = load_artifact(self.artifact_root, variant, version)
+        print(f"📂 Serving {variant} artifact {manifest['version']} ({len(index)} documents)")
+        return index, manifest
+
+    def reload(self) -> list:
+        """Open the version each loaded variant's CURRENT pointer names, if it changed.
+
+        In-flight searches keep the previous index until they finish.
+        """
+        results = []
+        for variant, (_, manifest) in list(self.indexes.items()):
+            version = read_current_version(self.artifact_root, variant)
+            if not version or version == manifest["version"]:
+                continue
+            try:
+                self.indexes[variant] = self._open(variant, version)
+                results.append({"variant": variant, "swapped": True, "version": version,
+                                "previous_version": manifest["version"]})
+            except Exception as e:
+                print(f"❌ Error loading {variant} artifact {version}: {e}")
+                results.append({"variant": variant, "swapped": False, "error": str(e)})
+        return results
+
+    def article_index(self, variant: str) -> ArticleIndex:
+        """Article centroid index of the variant's served version, built on first use."""
+        index, manifest = self.get(variant)
+        key = (variant, manifest["version"])
+        if key not in self.article_indexes:
+            self.article_indexes = {cached: value for cached, value in self.article_indexes.items() if cached[0] != variant}
+            dims = int(os.getenv("MITO_ARTICLE_INDEX_DIMS", "0")) or None
+            self.article_indexes[key] = ArticleIndex.from_compact_index(index, dims=dims)
+        return self.article_indexes[key]
+
+    def lexical_search(self, variant: str, query: str, k: int = 6) -> list:
+        """Keyword search of the variant's served version; its index is built on first use."""
+        index, manifest = self.get(variant)
+        key = (variant, manifest["version"])
+        if key not in self.lexical_indexes:
+            self.lexical_indexes = {cached: value for cached, value in self.lexical_indexes.items() if cached[0] != variant}
+            self.lexical_indexes[key] = LexicalIndex.build(index.texts)
+        hits = lexical_distances(self.lexical_indexes[key].search(query, k))
+        return [self._hit(index, row, distance, False) for row, distance in hits]
+
+    def _hit(self, index, row: int, distance: float, with_vector: bool) -> dict:
+        metadata = dict(index.metadatas[row] or {})
+        metadata.setdefault('id', index.ids[row])
+        hit = {"id": index.ids[row], "text": index.texts[row], "metadata": metadata, "distance": distance}
+        if with_vector:
+            hit["vector"] = encode_vector(index.full_vectors[row])
+        return hit
+
+    def search(self, queries: list) -> list:
+        """Answer a batch of queries; unfiltered queries per (variant, k, candidates) share one scan.
+
+        Queries limited to topics or to their top ``articles`` search only those rows.
+        Every query gets its own outcome, a list of hits or a query error (see
+        query_error), so one bad query in a batch never fails the others.
+        """
+        results = [None] * len(queries)
+        groups = {}
+        for position, query in enumerate(queries):
+            try:
+                index, _ = self.get(query["variant"])
+                embedding = decode_vector(query["embedding"])
+                if len(embedding) != index.full_vectors.shape[1]:
+                    raise ValueError(f"embedding has {len(embedding)} dimensions, the index {index.full_vectors.shape[1]}")
+                k = int(query.get("k", 6))
+                candidates = int(query.get("candidates") or self.default_candidates)
+                if query.get("topics") or query.get("articles"):
+                    rows = index.partition_rows('topic', query["topics"]) if query.get("topics") else None
+                    if query.get("articles"):
+                        article_rows = self.article_index(query["variant"]).candidate_rows(embedding, int(query["articles"]))
+                        rows = article_rows if rows is None else np.intersect1d(rows, article_rows, assume_unique=True)
+                    hits = index.search_ids(embedding, k=k, candidates=candidates, rows=rows)
+                    results[position] = [self._hit(index, row, distance, query.get("with_vectors"))
+                                         for row, distance in hits]
+                else:
+                    groups.setdefault((query["variant"], k, candidates), []).append((position, embedding))
+            except QUERY_ERRORS as e:
+                results[position] = query_error(e)
+
+        for (variant, k, candidates), members in groups.items():
+            index, _ = self.get(variant)
+            try:
+                batches = index.search_ids_many([embedding for _, embedding in members], k=k, candidates=candidates)
+            except QUERY_ERRORS as e:
+                for position, _ in members:
+                    results[position] = query_error(e)
+                continue
+            for (position, _), hits in zip(members, batches):
+                results[position] = [self._hit(index, row, distance, queries[position].get("with_vectors"))
+                                     for row, distance in hits]
+        return results
+
+def create_app(args) -> FastAPI:
+    app = FastAPI(title="MITO index server")
+    indexes = ArtifactIndexes(args.artifact_dir, int(os.getenv("MITO_RERANK_CANDIDATES", "48")))
+    stats = {"requests": 0, "queries": 0, "search_ms": 0.0}
+
+    @app.on_event("startup")
+    async def preload():
+        for variant in args.variants.split(",") if args.variants else []:
+            try:
+                indexes.get(variant)
+            except ArtifactError as e:
+                print(f"⚠️  {e}")
+        if args.watch_interval > 0:
+            app.state.watcher = asyncio.create_task(watch())
+
+    async def watch():
+        while True:
+            await asyncio.sleep(args.watch_interval)
+            await asyncio.to_thread(indexes.reload)
+
+    @app.post("/search")
+    async def search(request: Request):
+        body = await request.json()
+        queries = body.get("queries") or []
+        started = time.perf_counter()
+        if not isinstance(queries, list) or not all(isinstance(query, dict) for query in queries):
+            raise HTTPException(status_code=400, detail="Invalid query: \"queries\" must be a list of objects")
+        # Scoring releases the GIL in numpy, so batches from several replicas overlap
+        results = await asyncio.to_thread(indexes.search, queries)
+        stats["requests"] += 1
+        stats["queries"] += len(queries)
+        stats["search_ms"] += (time.perf_counter() - started) * 1000
+        return FastJSONResponse({"results": results})
+
+    @app.post("/lexical")
+    async def lexical(request: Request):
+        body = await request.json()
+        try:
+            results = await asyncio.to_thread(indexes.lexical_search, body["variant"], body["query"], int(body.get("k", 6)))
+        except ArtifactError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        except (KeyError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid query: {e}")
+        return FastJSONResponse({"results": results})
+
+    @app.get("/variants/{variant}")
+    async def variant_stats(variant: str):
+        try:
+            index, manifest = await asyncio.to_thread(indexes.get, variant)
+        except ArtifactError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        return {
+            "variant": variant,
+            "version": manifest["version"],
+            "document_count": len(index),
+            "corpus_hash": manifest["corpus_hash"],
+            "embedding_model": manifest["embedding_model"],
+            "compact_dims": index.dims,
+            "quantization": index.quantization
+        }
+
+    @app.post("/reload")
+    async def reload():
+        return {"results": await asyncio.to_thread(indexes.reload)}
+
+    @app.get("/health")
+    async def health():
+        return {
+            "status": "ok",
+            "variants": {variant: manifest["version"] for variant, (_, manifest) in indexes.indexes.items()},
+            **stats
+        }
+
+    return app
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Serve index artifacts to API replicas in remote index mode")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--artifact-dir", default=os.getenv("MITO_ARTIFACT_DIR", "./index_artifacts"),
+                        help="Artifact root written by setup_rag.py --export-artifact")
+    parser.add_argument("--variants", default="fixed,semantic", help="Variants to open at startup (others open on first use)")
+    parser.add_argument("--watch-interval", type=float, default=10.0,
+                        help="Seconds between checks of the CURRENT pointers (0 disables)")
+    return parser
+
+def main():
+    args = build_parser().parse_args()
+    uvicorn.run(create_app(args), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Load-test /api/chat and /api/chat/compare at increasing concurrency.
+By default this starts mock_openai_server.py and the backend (artifact mode,
+synthetic artifacts built from data/articles unless --artifact-dir is given)
+and replays questions against it. With --target it drives an already running
+server instead. Reports throughput, p50/p95/p99 latency and error rate per
+endpoint and concurrency level.
+
+A request counts as an error on a non-200 status, a timeout, or a 200 whose
+answer is the backend's error message (chat errors are returned as answers).
+"""
+
+import os
+import sys
+import time
+import signal
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+import httpx
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ARTICLES_PATH = os.path.join(SCRIPT_DIR, "data", "articles")
+
+QUESTIONS = [
+    "Čo je epigenetika?",
+    "Ako fungujú mitochondrie?",
+    "Aký vplyv má svetlo na hormóny?",
+    "Čo je kvantová biológia?",
+    "Prečo je dôležitý spánok?",
+    "Ako ovplyvňuje chlad metabolizmus?",
+    "Čo je leptín a ako súvisí s hladom?",
+    "Ako modré svetlo ovplyvňuje melatonín?",
+    "Kedy je najlepšie chodiť na slnko?",
+    "Čo robí DHA v mozgu?",
+]
+
+ENDPOINTS = {
+    "chat": "/api/chat",
+    "compare": "/api/chat/compare",
+}
+
+# Answers the backend returns instead of an HTTP error when generation fails
+ERROR_ANSWER_PREFIXES = ("Prepáčte, nastala chyba", "Chyba pri spracovaní")
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_process(args: list, env: dict = None) -> subprocess.Popen:
+    return subprocess.Popen(args, cwd=SCRIPT_DIR, env=env, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL, start_new_session=True)
+
+def stop_process(process: subprocess.Popen):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+    process.wait(timeout=30)
+
+def start_mock_openai(port: int, mock_args: list = ()) -> subprocess.Popen:
+    process = start_process([sys.executable, "mock_openai_server.py", "--port", str(port), *mock_args])
+    wait_until_ready(f"http://127.0.0.1:{port}/stats", process)
+    return process
+
+def start_backend(port: int, mock_url: str, artifact_root: str = None, workers: int = 1, env: dict = None) -> subprocess.Popen:
+    """Start uvicorn serving app.main with OpenAI calls going to the mock server."""
+    server_env = dict(os.environ, OPENAI_API_KEY="load-test", OPENAI_BASE_URL=mock_url,
+                      OPENAI_API_BASE=mock_url, MITO_WORKERS=str(workers), MITO_INDEX_WATCH_INTERVAL="0")
+    if artifact_root:
+        server_env.update(MITO_INDEX_MODE="artifact", MITO_ARTIFACT_DIR=artifact_root)
+    server_env.update(env or {})
+    process = start_process(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=server_env
+    )
+    wait_until_ready(f"http://127.0.0.1:{port}/api/stats", process)
+    return process
+
+def wait_until_ready(url: str, process: subprocess.Popen, timeout: float = 120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Process for {url} exited during startup")
+        try:
+            if httpx.get(url, timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"{url} did not become ready")
+
+def build_synthetic_artifacts(artifact_root: str, replicate: int = 1) -> int:
+    """Export both variants from fixed-size chunks with the mock server's embeddings."""
+    from app.rag.compact_index import CompactIndex
+    from app.rag.index_artifact import export_artifact, compute_corpus_hash
+    from app.rag.data_processor import SlovakArticleProcessor
+    from app.rag.chunkers.fixed_size import FixedSizeChunker
+    from mock_openai_server import fake_embedding
+
+    processor = SlovakArticleProcessor(chunker=FixedSizeChunker())
+    documents = processor.process_articles(ARTICLES_PATH) * replicate
+    texts = [doc.page_content for doc in documents]
+    metadatas = [doc.metadata for doc in documents]
+    ids = [f"chunk_{i}" for i in range(len(documents))]
+    embeddings = np.stack([fake_embedding(text) for text in texts])
+    corpus_hash = compute_corpus_hash(ARTICLES_PATH)
+    for variant in ("fixed", "semantic"):
+        index = CompactIndex.build(ids, texts, metadatas, embeddings, article_texts=processor.article_texts)
+        export_artifact(index, artifact_root, variant, {"chunker_name": "synthetic"}, corpus_hash)
+    return len(ids)
+
+def is_error_answer(endpoint: str, payload: dict) -> bool:
+    """Whether a 200 response still failed: an error answer, or a degraded one without generation."""
+    responses = payload.get("responses", []) if endpoint == "compare" else [payload]
+    return any(
+        response.get("response", "").startswith(ERROR_ANSWER_PREFIXES) or response.get("degraded", False)
+        for response in responses
+    )
+
+async def run_level(base_url: str, endpoint: str, concurrency: int, requests: int,
+                    questions: list, timeout: float) -> dict:
+    """Send ``requests`` requests with ``concurrency`` clients and summarize them."""
+    latencies, errors = [], 0
+    counter = iter(range(requests))
+
+    async def client_loop(client):
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                response = await client.post(ENDPOINTS[endpoint], json={"message": questions[i % len(questions)]})
+                if response.status_code != 200 or is_error_answer(endpoint, response.json()):
+                    errors += 1
+            except (httpx.HTTPError, ValueError):
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        await asyncio.gather(*[client_loop(client) for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    def percentile_ms(p):
+        return float(np.percentile(latencies, p) * 1000) if latencies else 0.0
+
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": percentile_ms(50),
+        "p95_ms": percentile_ms(95),
+        "p99_ms": percentile_ms(99),
+        "error_rate": errors / len(latencies) if latencies else 0.0,
+    }
+
+def load_questions(path: str = None) -> list:
+    if not path:
+        return QUESTIONS
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the chat endpoints at increasing concurrency")
+    parser.add_argument("--target", help="Base URL of a running backend (otherwise one is started)")
+    parser.add_argument("--endpoints", nargs="+", choices=list(ENDPOINTS), default=list(ENDPOINTS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--requests", type=int, default=64, help="Requests per concurrency level")
+    parser.add_argument("--questions", help="Text file with one question per line")
+    parser.add_argument("--timeout", type=float, default=30, help="Client timeout in seconds (Rails uses 30)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers of the started backend")
+    parser.add_argument("--artifact-dir", help="Serve these artifacts instead of synthetic ones")
+    parser.add_argument("--mock-args", default="",
+                        help="Arguments for mock_openai_server.py, e.g. \"--ttft-ms 800 --error-rate 0.02\"")
+    args = parser.parse_args()
+    questions = load_questions(args.questions)
+
+    processes = []
+    with tempfile.TemporaryDirectory(prefix="mito_load_") as tmp:
+        try:
+            base_url = args.target
+            if not base_url:
+                mock_port, backend_port = free_port(), free_port()
+                processes.append(start_mock_openai(mock_port, args.mock_args.split()))
+                artifact_root = os.path.abspath(args.artifact_dir or tmp)
+                if not args.artifact_dir:
+                    count = build_synthetic_artifacts(artifact_root)
+                    print(f"📦 Synthetic artifacts with {count:,} chunks per variant")
+                processes.append(start_backend(backend_port, f"http://127.0.0.1:{mock_port}/v1",
+                                               artifact_root, args.workers))
+                base_url = f"http://127.0.0.1:{backend_port}"
+
+            print(f"\n🔥 Load test against {base_url}, {args.requests} requests per level\n")
+            print(f"{'endpoint':<10}{'clients':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}")
+            for endpoint in args.endpoints:
+                for concurrency in args.concurrency:
+                    r = asyncio.run(run_level(base_url, endpoint, concurrency, args.requests, questions, args.timeout))
+                    print(f"{endpoint:<10}{concurrency:>8}{r['throughput']:>9.2f}{r['p50_ms']:>10.0f}"
+                          f"{r['p95_ms']:>10.0f}{r['p99_ms']:>10.0f}{r['error_rate']:>8.1%}")
+        finally:
+            for process in reversed(processes):
+                stop_process(process)
+
+if __name__ == "__main__":
+    main()
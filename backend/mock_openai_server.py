@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Mock OpenAI API for load tests and benchmarks.
+Serves /v1/embeddings and /v1/chat/completions (plain and streamed) with
+configurable latency, a slow tail and injected errors, so the backend can be
+driven hard without API keys or costs. Point the backend at it with
+OPENAI_BASE_URL=http://127.0.0.1:<port>/v1.
+
+Embeddings are deterministic unit vectors derived from the input, so the same
+text always gets the same vector. GET /stats returns request and error counts.
+"""
+
+import json
+import time
+import zlib
+import base64
+import random
+import asyncio
+import argparse
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+ANSWER_WORDS = ("Podľa", "kontextu", "mitochondrie", "ovplyvňujú", "energiu", "bunky", "a", "svetlo",
+                "riadi", "hormóny", "cez", "cirkadiánny", "rytmus.")
+
+def fake_embedding(item, dims: int = 3072) -> np.ndarray:
+    """Deterministic unit vector for any embeddings API input item (text or token ids)."""
+    seed = zlib.crc32(json.dumps(item, ensure_ascii=False).encode("utf-8"))
+    vector = np.random.default_rng(seed).standard_normal(dims).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+def create_app(args) -> FastAPI:
+    app = FastAPI(title="Mock OpenAI API")
+    rng = random.Random(args.seed)
+    stats = {"embeddings": 0, "chat": 0, "streamed": 0, "errors": 0, "slow": 0}
+
+    def injected_error():
+        """An error response according to the configured rates, or None."""
+        roll = rng.random()
+        if roll < args.error_rate:
+            stats["errors"] += 1
+            return JSONResponse({"error": {"message": "Mock server error", "type": "server_error"}}, status_code=500)
+        if roll < args.error_rate + args.rate_limit_rate:
+            stats["errors"] += 1
+            return JSONResponse({"error": {"message": "Mock rate limit", "type": "rate_limit_error"}},
+                                status_code=429, headers={"retry-after": "1"})
+        return None
+
+    def first_token_delay() -> float:
+        """Log-normal time to first token in seconds, with an occasional slow outlier."""
+        delay = args.ttft_ms / 1000 * rng.lognormvariate(0, args.ttft_sigma)
+        if rng.random() < args.slow_rate:
+            stats["slow"] += 1
+            delay *= args.slow_factor
+        return delay
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        stats["embeddings"] += 1
+        await asyncio.sleep(args.embedding_ms / 1000)
+        error = injected_error()
+        if error:
+            return error
+
+        items = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        if items and isinstance(items[0], int):
+            items = [items]  # a single tokenized input
+        as_base64 = body.get("encoding_format") == "base64"
+        data = []
+        for index, item in enumerate(items):
+            vector = fake_embedding(item, body.get("dimensions") or args.dims)
+            embedding = base64.b64encode(vector.tobytes()).decode() if as_base64 else vector.tolist()
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+        return {"object": "list", "data": data, "model": body.get("model"),
+                "usage": {"prompt_tokens": 8 * len(items), "total_tokens": 8 * len(items)}}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["chat"] += 1
+        error = injected_error()
+        if error:
+            return error
+
+        model = body.get("model")
+        words = [ANSWER_WORDS[i % len(ANSWER_WORDS)] for i in range(args.tokens)]
+        prompt_tokens = sum(len(str(message.get("content", ""))) for message in body.get("messages", [])) // 4
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                 "total_tokens": prompt_tokens + len(words)}
+        delay = first_token_delay()
+
+        if not body.get("stream"):
+            await asyncio.sleep(delay + len(words) * args.token_ms / 1000)
+            return {
+                "id": "chatcmpl-mock", "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": " ".join(words)}}],
+                "usage": usage
+            }
+
+        stats["streamed"] += 1
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+        async def events():
+            def chunk(choices, **extra):
+                payload = {"id": "chatcmpl-mock", "object": "chat.completion.chunk",
+                           "created": int(time.time()), "model": model, "choices": choices, **extra}
+                return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+            await asyncio.sleep(delay)
+            yield chunk([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+            for i, word in enumerate(words):
+                if i:
+                    await asyncio.sleep(args.token_ms / 1000)
+                yield chunk([{"index": 0, "delta": {"content": word if i == 0 else " " + word}, "finish_reason": None}])
+            yield chunk([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+            if include_usage:
+                yield chunk([], usage=usage)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Mock OpenAI API with configurable latency and errors")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--dims", type=int, default=3072, help="Embedding dimensions")
+    parser.add_argument("--embedding-ms", type=float, default=80, help="Latency of an embeddings call")
+    parser.add_argument("--ttft-ms", type=float, default=600, help="Median time to first token")
+    parser.add_argument("--ttft-sigma", type=float, default=0.3, help="Log-normal spread of the first-token time")
+    parser.add_argument("--token-ms", type=float, default=15, help="Delay between streamed tokens")
+    parser.add_argument("--tokens", type=int, default=120, help="Tokens per answer")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Share of completions in the slow tail")
+    parser.add_argument("--slow-factor", type=float, default=10.0, help="First-token slowdown of the slow tail")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of calls answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of calls answered with HTTP 429")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser
+
+def main():
+    args = build_parser().parse_args()
+    uvicorn.run(create_app(args), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
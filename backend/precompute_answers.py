@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Precompute answers for the most frequent questions.
+Clusters historical questions (one per line, repeats count as traffic) by
+embedding similarity, then answers the top N clusters with each variant's
+MitoRAGChain against its current index version. /api/chat serves these
+answers for close matches. setup_rag.py reruns the answer step after a
+reindex, reusing the stored clusters.
+
+Run with the same MITO_INDEX_MODE as the server, since answers are keyed by
+the index version the server reports.
+
+Usage:
+  python precompute_answers.py --questions questions.txt --top 50
+  python precompute_answers.py --regenerate     # answers only, stored clusters
+"""
+
+import os
+import sys
+import asyncio
+import argparse
+from dotenv import load_dotenv
+from langchain_openai import OpenAIEmbeddings
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.rag.precomputed_answers import cluster_questions, save_clusters, answer_clusters, precomputed_root
+from app.rag.rag_factory import RAGServiceFactory
+
+def build_clusters(questions_path: str, root: str, threshold: float, max_members: int):
+    """Embed the distinct questions and store their clusters."""
+    with open(questions_path, 'r', encoding='utf-8') as f:
+        questions = [" ".join(line.split()) for line in f if line.strip()]
+    distinct = list(dict.fromkeys(questions))
+    print(f"🔤 Embedding {len(distinct):,} distinct questions ({len(questions):,} total)...")
+
+    # Same model the vector stores embed queries with
+    embeddings = OpenAIEmbeddings(model="text-embedding-3-large", chunk_size=100)
+    vectors = embeddings.embed_documents(distinct)
+    clusters, member_vectors = cluster_questions(questions, vectors, threshold, max_members)
+    save_clusters(root, clusters, member_vectors, embeddings.model)
+
+    covered = sum(cluster["count"] for cluster in clusters[:10])
+    print(f"🧩 {len(clusters):,} clusters; the 10 largest cover {covered / len(questions):.1%} of questions")
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute answers for frequent questions")
+    parser.add_argument("--questions", help="Historical questions, one per line (repeats count)")
+    parser.add_argument("--regenerate", action="store_true", help="Only re-answer the stored clusters")
+    parser.add_argument("--top", type=int, default=int(os.getenv("MITO_PRECOMPUTED_TOP", "50")),
+                        help="Clusters answered per variant (default: 50)")
+    parser.add_argument("--variant", default="both",
+                        help="A configured variant, \"both\" (fixed and semantic) or \"all\" (default: both)")
+    parser.add_argument("--cluster-threshold", type=float, default=0.9,
+                        help="Cosine similarity for joining a cluster (default: 0.9)")
+    parser.add_argument("--max-members", type=int, default=50, help="Stored wordings per cluster")
+    parser.add_argument("--output", default=None, help="Output directory (default: MITO_PRECOMPUTED_DIR)")
+    args = parser.parse_args()
+
+    load_dotenv()
+    if not os.getenv('OPENAI_API_KEY'):
+        print("❌ Error: OPENAI_API_KEY not found in environment variables")
+        return
+    if not args.questions and not args.regenerate:
+        parser.error("give --questions or --regenerate")
+
+    root = args.output or precomputed_root()
+    if args.questions:
+        build_clusters(args.questions, root, args.cluster_threshold, args.max_members)
+
+    configured = RAGServiceFactory.get_all_variants()
+    if args.variant == "all":
+        variants = list(configured)
+    elif args.variant == "both":
+        variants = [name for name in ("fixed", "semantic") if name in configured]
+    else:
+        variants = [args.variant]
+    for variant in variants:
+        asyncio.run(answer_clusters(variant, root, args.top))
+
+if __name__ == "__main__":
+    main()
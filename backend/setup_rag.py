@@ -13,63 +13,162 @@ from dotenv import load_dotenv
 sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 
 from app.rag.data_processor import SlovakArticleProcessor
+from app.rag.dedup import PassageDeduplicator
 from app.rag.vector_store import MitoVectorStore
 from app.rag.rag_factory import RAGServiceFactory
-from app.models.types import RAGVariant
+from app.rag.index_artifact import compute_corpus_hash, export_artifact
+from app.rag.index_versions import VERSIONS_DIR, new_version_name, prune_versions, write_current
+from app.rag.chunk_corpus import save_article_corpus
+from app.rag.chunk_sweep import SentenceCache
+from app.rag.context_compression import SentenceIndex
 
-def setup_variant(variant: RAGVariant, articles_path: str, force_rebuild: bool = False):
-    """Setup a specific RAG variant."""
-    print(f"\n🔧 Setting up {RAGServiceFactory.get_variant_display_name(variant)} variant...")
+def export_indexes(vector_store: MitoVectorStore, chunker_config: dict, articles_path: str, export_options: dict = None):
+    """Export the compact index and/or a versioned index artifact if requested."""
+    if not export_options:
+        return
+    
+    index = None
+    if export_options.get("compact"):
+        index = vector_store.export_compact_index(
+            dims=export_options["dims"],
+            quantization=export_options["quantization"]
+        )
+    
+    if export_options.get("artifact_dir"):
+        try:
+            if index is None:
+                index = vector_store.build_compact_index(
+                    dims=export_options["dims"],
+                    quantization=export_options["quantization"]
+                )
+            if index is None:
+                print(f"❌ Could not export index artifact for {vector_store.variant} variant")
+                return
+            path = export_artifact(
+                index,
+                artifact_root=export_options["artifact_dir"],
+                variant=vector_store.variant,
+                chunker_config=chunker_config,
+                corpus_hash=compute_corpus_hash(articles_path)
+            )
+            print(f"📦 Exported index artifact for {vector_store.variant} to {path}")
+        except Exception as e:
+            print(f"❌ Error exporting index artifact for {vector_store.variant} variant: {e}")
+
+def publish_version(vector_store: MitoVectorStore, expected_count: int, keep_versions: int) -> bool:
+    """Validate a freshly built version and point CURRENT at it; running servers then swap to it."""
+    count = vector_store.get_stats().get('document_count', 0)
+    if count != expected_count:
+        print(f"❌ Version {vector_store.index_version} has {count} documents, expected {expected_count}; not publishing")
+        return False
+    
+    write_current(vector_store.base_directory, vector_store.index_version)
+    print(f"🚦 Published {vector_store.variant} index version {vector_store.index_version}")
+    print("   Running servers switch on SIGHUP, POST /api/admin/reload-index or the MITO_INDEX_WATCH_INTERVAL watcher")
+    
+    deleted = prune_versions(
+        os.path.join(vector_store.base_directory, VERSIONS_DIR),
+        keep=keep_versions,
+        protect=[vector_store.index_version]
+    )
+    if deleted:
+        print(f"🧹 Removed old {vector_store.variant} versions: {', '.join(deleted)}")
+    return True
+
+def setup_variant(variant: str, articles_path: str, force_rebuild: bool = False, export_options: dict = None,
+                  keep_versions: int = 2, precompute: bool = True, dedup: bool = False, sentence_options: dict = None):
+    """Setup a specific RAG variant (a name from the variant configuration)."""
+    config = RAGServiceFactory.get_variant_config(variant)
+    print(f"\n🔧 Setting up {config['display_name']} variant...")
     
     # Create chunker for this variant
     chunker = RAGServiceFactory.create_chunker(variant)
     
+    # Sentence embeddings for context compression go through the cache sweep_chunking.py
+    # uses, so every variant (and the semantic chunker itself) embeds each sentence once
+    sentence_cache = None
+    if sentence_options:
+        sentence_cache = SentenceCache(
+            sentence_options["cache_dir"],
+            min_sentence_chars=getattr(chunker, "min_sentence_chars", 40)
+        )
+    
     # Initialize data processor with the chunker
-    processor = SlovakArticleProcessor(chunker)
+    processor = SlovakArticleProcessor(chunker, PassageDeduplicator() if dedup else None, sentence_cache)
+    
+    # Recorded in the artifact manifest: how the indexed text was produced
+    chunker_config = chunker.get_config()
+    if dedup:
+        chunker_config["dedup"] = processor.deduplicator.get_config()
     
     # Process articles into documents
     print(f"🔨 Creating document chunks using {chunker.get_chunker_name()} strategy...")
     
     # Show detailed progress for semantic chunking
-    if variant == RAGVariant.SEMANTIC:
+    if config["chunker"] == "semantic":
         print("⚠️  SEMANTIC CHUNKING: This process generates embeddings for each sentence and may take several minutes...")
         print("📊 Progress will be shown for each article below:")
     
     documents = processor.process_articles(articles_path)
     
     if not documents:
-        print(f"❌ No documents were processed for {variant.value} variant")
+        print(f"❌ No documents were processed for {variant} variant")
         return False
     
     # Initialize vector store for this variant
-    print(f"🗄️  Setting up vector database for {variant.value} variant...")
-    if variant == RAGVariant.SEMANTIC:
-        persist_dir = "./chroma_db_semantic"
-    else:
-        persist_dir = "./chroma_db"
+    print(f"🗄️  Setting up vector database for {variant} variant...")
+    persist_dir = config["persist_directory"]
     
-    vector_store = MitoVectorStore(persist_directory=persist_dir, variant=variant.value)
+    vector_store = MitoVectorStore(persist_directory=persist_dir, variant=variant, index_mode="chroma")
     
     # Check if vector store already has documents
     stats = vector_store.get_stats()
     if stats.get('document_count', 0) > 0 and not force_rebuild:
-        print(f"ℹ️  Vector store for {variant.value} already contains {stats['document_count']} documents")
+        print(f"ℹ️  Vector store for {variant} already contains {stats['document_count']} documents")
+        export_indexes(vector_store, chunker_config, articles_path, export_options)
         return True
-    elif stats.get('document_count', 0) > 0 and force_rebuild:
-        print(f"🗑️  Deleting existing {variant.value} collection...")
-        vector_store.delete_collection()
-        vector_store = MitoVectorStore(persist_directory=persist_dir, variant=variant.value)
+    
+    # Build into a new version directory; the live version keeps serving until this one is published
+    version = new_version_name()
+    if stats.get('document_count', 0) > 0:
+        print(f"🆕 Building {variant} version {version} next to live version {vector_store.index_version or 'legacy'}...")
+    vector_store = MitoVectorStore(
+        persist_directory=persist_dir,
+        variant=variant,
+        index_mode="chroma",
+        version=version
+    )
     
     # Add documents to vector store
-    print(f"⚡ Adding {len(documents)} documents to {variant.value} vector store...")
-    success = vector_store.add_documents(documents)
+    print(f"⚡ Adding {len(documents)} documents to {variant} vector store...")
+    # Chunk vectors the chunker derived itself (chunk_vectors="pooled") are stored as they are
+    chunk_vectors = processor.chunk_vectors if any(vector is not None for vector in processor.chunk_vectors) else None
+    success = vector_store.add_documents(documents, chunk_vectors)
+    
+    if success:
+        # The article texts chunk offsets point into; compact indexes store chunks as spans of them
+        save_article_corpus(vector_store.persist_directory, processor.article_texts)
+        if processor.article_sentences:
+            sentence_index = SentenceIndex.from_articles(processor.article_sentences, dims=sentence_options["dims"])
+            sentence_index.save(vector_store.persist_directory)
+            print(f"🧩 Saved {len(sentence_index)} sentence embeddings ({sentence_index.dims} dims, "
+                  f"{sentence_index.memory_bytes() / 1024 / 1024:.1f} MB) for context compression")
+        # Derived indexes go into the new version before it is published
+        export_indexes(vector_store, chunker_config, articles_path, export_options)
+        success = publish_version(vector_store, len(documents), keep_versions)
+    
+    if success and precompute:
+        from app.rag.precomputed_answers import regenerate_answers
+        if regenerate_answers(variant):
+            # Precomputed answers are keyed by index version, so the new one needs its own
+            print(f"💬 Regenerated precomputed answers for {variant} index version {vector_store.index_version}")
     
     if success:
-        print(f"✅ {RAGServiceFactory.get_variant_display_name(variant)} variant setup complete!")
+        print(f"✅ {config['display_name']} variant setup complete!")
         print(f"📊 Vector store statistics: {vector_store.get_stats()}")
         return True
     else:
-        print(f"❌ Failed to setup {variant.value} variant")
+        print(f"❌ Failed to setup {variant} variant")
         return False
 
 def main():
@@ -77,14 +176,75 @@ def main():
     parser = argparse.ArgumentParser(description="Setup MITO RAG System with different variants")
     parser.add_argument(
         "--variant", 
-        choices=["fixed", "semantic", "both"], 
         default="both",
-        help="Which variant to setup (default: both)"
+        help="Variant to setup: a configured variant name, \"both\" (fixed and semantic) "
+             "or \"all\" configured variants (default: both)"
     )
     parser.add_argument(
         "--force", 
         action="store_true", 
-        help="Force rebuild existing vector stores"
+        help="Rebuild existing vector stores into a new version while the current one keeps serving"
+    )
+    parser.add_argument(
+        "--keep-versions",
+        type=int,
+        default=2,
+        help="Index versions kept on disk per variant for rollback (default: 2)"
+    )
+    parser.add_argument(
+        "--export-compact",
+        action="store_true",
+        help="Also export a compact Matryoshka index (used with MITO_INDEX_MODE=compact)"
+    )
+    parser.add_argument(
+        "--export-artifact",
+        action="store_true",
+        help="Also export a versioned, self-contained index artifact (served with MITO_INDEX_MODE=artifact)"
+    )
+    parser.add_argument(
+        "--artifact-dir",
+        default="./index_artifacts",
+        help="Where index artifacts are written (default: ./index_artifacts)"
+    )
+    parser.add_argument(
+        "--compact-dims",
+        type=int,
+        default=256,
+        help="Embedding prefix length kept in the compact index (default: 256)"
+    )
+    parser.add_argument(
+        "--compact-quantization",
+        choices=["float32", "float16", "int8"],
+        default="float16",
+        help="Storage type of the compact index (default: float16)"
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Strip boilerplate and near-duplicate passages across articles before chunking "
+             "(check_dedup.py reports what it saves)"
+    )
+    parser.add_argument(
+        "--sentence-index",
+        action="store_true",
+        help="Embed every sentence and store the embeddings with the index for context compression "
+             "(MITO_CONTEXT_COMPRESSION); free for the semantic variant, which embeds sentences anyway"
+    )
+    parser.add_argument(
+        "--sentence-dims",
+        type=int,
+        default=256,
+        help="Embedding prefix length stored per sentence (default: 256)"
+    )
+    parser.add_argument(
+        "--sentence-cache-dir",
+        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "chunk_sweep_cache"),
+        help="Sentence embedding cache, shared with sweep_chunking.py (default: ./chunk_sweep_cache)"
+    )
+    parser.add_argument(
+        "--skip-precompute",
+        action="store_true",
+        help="Don't regenerate precomputed answers for the new index versions"
     )
     
     args = parser.parse_args()
@@ -135,18 +295,38 @@ def main():
     print(f"📊 Total words: {stats['total_words']:,}")
     print(f"📊 Topics: {stats['topics']}")
     
+    export_options = None
+    if args.export_compact or args.export_artifact:
+        export_options = {
+            "compact": args.export_compact,
+            "artifact_dir": args.artifact_dir if args.export_artifact else None,
+            "dims": args.compact_dims,
+            "quantization": args.compact_quantization
+        }
+    
+    sentence_options = None
+    if args.sentence_index:
+        sentence_options = {"cache_dir": args.sentence_cache_dir, "dims": args.sentence_dims}
+    
     # Setup variants based on arguments
     success_count = 0
     total_variants = 0
     
-    if args.variant in ["fixed", "both"]:
-        total_variants += 1
-        if setup_variant(RAGVariant.FIXED_SIZE, articles_path, args.force):
-            success_count += 1
+    configured = RAGServiceFactory.get_all_variants()
+    if args.variant == "all":
+        variants = list(configured)
+    elif args.variant == "both":
+        variants = [name for name in ("fixed", "semantic") if name in configured]
+    elif args.variant in configured:
+        variants = [args.variant]
+    else:
+        print(f"❌ Unknown variant '{args.variant}', configured: {', '.join(configured)}")
+        return
     
-    if args.variant in ["semantic", "both"]:
+    for variant in variants:
         total_variants += 1
-        if setup_variant(RAGVariant.SEMANTIC, articles_path, args.force):
+        if setup_variant(variant, articles_path, args.force, export_options, args.keep_versions,
+                         not args.skip_precompute, args.dedup, sentence_options):
             success_count += 1
     
     # Summary
@@ -158,7 +338,7 @@ def main():
         print("\n📚 Available endpoints:")
         print("   POST /api/chat - Single variant response")
         print("   POST /api/chat/compare - Compare all variants")
-        print("   GET /api/rag/variants - List available variants")
+        print("   GET /api/variants - List configured variants and their memory use")
     else:
         print(f"⚠️  Setup completed with issues: {success_count}/{total_variants} variants successful")
 
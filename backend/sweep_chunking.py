@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Sweep chunking parameters without rebuilding the index.
+Articles are segmented and their sentences embedded once (cached in
+--cache-dir). Every semantic (similarity threshold, min size, max size) and
+fixed-size (chunk size, overlap) configuration is then re-chunked locally, and
+its chunk vectors are approximated from the cached sentence vectors: the
+length-weighted mean of a semantic chunk's sentences, or of the sentences a
+fixed-size chunk overlaps weighted by the overlap. Each configuration is scored
+on a labelled question set with recall@k, MRR and context tokens per query.
+
+Chunks are only embedded for configurations passed to --promote, which are
+scored again with their real chunk embeddings to confirm the approximation.
+
+Labelled questions are a JSON list:
+  [{"question": "Čo je leptín?", "article_ids": ["LEPTIN_slug"], "answer": "Leptín je hormón ..."}]
+"answer" is optional; with it a chunk must contain the excerpt to count.
+
+Usage:
+  python sweep_chunking.py --questions labelled_questions.json
+  python sweep_chunking.py --questions labelled_questions.json --promote 0.75:600:1000 fixed:800:200
+  python sweep_chunking.py --questions labelled_questions.json --chunkers fixed_size --chunk-sizes 600 800 1000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+import numpy as np
+from dotenv import load_dotenv
+from langchain_openai import OpenAIEmbeddings
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.rag.chunk_sweep import (
+    SentenceCache, RelevanceLabels, load_labelled_questions, cached_question_vectors, build_chunk_set,
+    score_chunk_set, parameter_grid, fixed_parameter_grid, config_name, token_counter
+)
+from app.rag.vectors import normalize
+from app.rag.data_processor import MIN_CONTENT_CHARS, SlovakArticleProcessor, build_article_text, get_article_id
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def load_sentences(cache: SentenceCache, articles_path: str, embeddings: OpenAIEmbeddings) -> list:
+    """Cached sentences of every article, embedding only new or changed articles."""
+    articles = SlovakArticleProcessor().load_articles(articles_path)
+    count_tokens = token_counter()
+    result, embedded = [], 0
+    for article in articles:
+        # Same articles SlovakArticleProcessor chunks
+        if len((article.get('content') or '').strip()) < MIN_CONTENT_CHARS:
+            continue
+
+        def embed_documents(sentences):
+            nonlocal embedded
+            embedded += len(sentences)
+            print(f"  📊 Embedding {len(sentences)} sentences of {get_article_id(article)}...")
+            return embeddings.embed_documents(sentences)
+
+        result.append(cache.get(get_article_id(article), build_article_text(article), embed_documents, count_tokens))
+    print(f"🧠 {sum(len(sentences) for sentences in result):,} sentences from {len(result)} articles "
+          f"({embedded:,} newly embedded)")
+    return result
+
+def parse_promoted(value: str) -> dict:
+    if value.startswith("fixed:"):
+        _, chunk_size, overlap = value.split(":")
+        return {"chunk_size": int(chunk_size), "chunk_overlap": int(overlap)}
+    threshold, min_size, max_size = value.split(":")
+    return {"similarity_threshold": float(threshold), "min_chunk_size": int(min_size), "max_chunk_size": int(max_size)}
+
+def print_row(name: str, scores: dict, k_values: list):
+    recalls = "".join(f"{scores[f'recall@{k}']:>11.1%}" for k in k_values)
+    tokens = "".join(f"{scores[f'tokens@{k}']:>11.0f}" for k in k_values)
+    print(f"{name:<26}{scores['chunks']:>8}{scores['mean_chunk_tokens']:>8.0f}{recalls}{scores['mrr']:>7.3f}{tokens}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep chunking parameters on cached sentence embeddings")
+    parser.add_argument("--questions", required=True, help="Labelled questions (JSON list)")
+    parser.add_argument("--articles", default=os.path.join(SCRIPT_DIR, "data", "articles"))
+    parser.add_argument("--cache-dir", default=os.path.join(SCRIPT_DIR, "chunk_sweep_cache"))
+    parser.add_argument("--chunkers", nargs="+", choices=["semantic", "fixed_size"], default=["semantic", "fixed_size"])
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.6, 0.65, 0.7, 0.75, 0.8, 0.85])
+    parser.add_argument("--min-sizes", type=int, nargs="+", default=[300, 600, 900])
+    parser.add_argument("--max-sizes", type=int, nargs="+", default=[800, 1000, 1500, 2000])
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[500, 800, 1000, 1200, 1500],
+                        help="FixedSizeChunker chunk_size values")
+    parser.add_argument("--overlaps", type=int, nargs="+", default=[0, 100, 200, 300],
+                        help="FixedSizeChunker chunk_overlap values")
+    parser.add_argument("--min-sentence-chars", type=int, default=40,
+                        help="Sentence merging of the cached segmentation (SemanticChunker default: 40)")
+    parser.add_argument("--k", type=int, nargs="+", default=[3, 6], help="Cut-offs for recall and context tokens")
+    parser.add_argument("--promote", nargs="+", default=[], metavar="T:MIN:MAX|fixed:SIZE:OVERLAP",
+                        help="Embed these configurations' chunks and score them with real vectors")
+    args = parser.parse_args()
+
+    load_dotenv()
+    if not os.getenv('OPENAI_API_KEY'):
+        print("❌ Error: OPENAI_API_KEY not found in environment variables")
+        return
+
+    print("🧬 MITO Chunking Parameter Sweep")
+    print("=" * 50)
+
+    # Same model and batch size as SemanticChunker's sentence embeddings
+    embeddings = OpenAIEmbeddings(model="text-embedding-3-large", chunk_size=50)
+    cache = SentenceCache(args.cache_dir, embeddings.model, args.min_sentence_chars)
+    articles = load_sentences(cache, args.articles, embeddings)
+
+    questions = load_labelled_questions(args.questions)
+    query_vectors = cached_question_vectors(args.cache_dir, [entry["question"] for entry in questions],
+                                            embeddings.embed_documents)
+    labels = RelevanceLabels(questions, articles)
+    k_values = sorted(set(args.k))
+
+    configs = []
+    if "semantic" in args.chunkers:
+        configs += parameter_grid(args.thresholds, args.min_sizes, args.max_sizes)
+    if "fixed_size" in args.chunkers:
+        configs += fixed_parameter_grid(args.chunk_sizes, args.overlaps)
+    print(f"\n🔬 {len(configs)} configurations x {len(questions)} questions\n")
+    header_recalls = "".join(f"{f'recall@{k}':>11}" for k in k_values)
+    header_tokens = "".join(f"{f'tokens@{k}':>11}" for k in k_values)
+    print(f"{'configuration':<26}{'chunks':>8}{'tok/ch':>8}{header_recalls}{'mrr':>7}{header_tokens}")
+
+    started = time.perf_counter()
+    results = []
+    for config in configs:
+        chunk_set = build_chunk_set(config, articles)
+        scores = score_chunk_set(chunk_set, chunk_set.pooled_vectors(), query_vectors, labels, k_values)
+        results.append({"name": config_name(config), "config": config, **scores})
+        print_row(config_name(config), scores, k_values)
+    elapsed = time.perf_counter() - started
+
+    # Best recall at the largest cut-off first, fewer context tokens breaking ties
+    top_k = k_values[-1]
+    results.sort(key=lambda result: (-result[f"recall@{top_k}"], result[f"tokens@{top_k}"]))
+    print(f"\n⏱️  Swept {len(configs)} configurations in {elapsed:.1f}s")
+    print("🏆 Best by recall@{}: {}".format(top_k, ", ".join(result["name"] for result in results[:3])))
+
+    promoted = []
+    for value in args.promote:
+        config = parse_promoted(value)
+        chunk_set = build_chunk_set(config, articles)
+        texts = chunk_set.texts()
+        print(f"\n🚀 Promoting {config_name(config)}: embedding {len(texts):,} chunks...")
+        chunk_vectors = normalize(np.asarray(embeddings.embed_documents(texts), dtype=np.float32))
+        approximate = score_chunk_set(chunk_set, chunk_set.pooled_vectors(), query_vectors, labels, k_values)
+        real = score_chunk_set(chunk_set, chunk_vectors, query_vectors, labels, k_values)
+        print_row("  pooled sentence vectors", approximate, k_values)
+        print_row("  chunk embeddings", real, k_values)
+
+        path = os.path.join(args.cache_dir, "promoted", config_name(config))
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "embeddings.npy"), chunk_vectors)
+        with open(os.path.join(path, "chunks.json"), 'w', encoding='utf-8') as f:
+            json.dump({
+                "config": config,
+                "article_ids": [articles[owner].article_id for owner in chunk_set.owners],
+                "texts": texts
+            }, f, ensure_ascii=False)
+        promoted.append({"name": config_name(config), "config": config, "approximate": approximate, "real": real})
+        print(f"💾 Saved promoted chunks and embeddings to {path}")
+
+    report_path = os.path.join(args.cache_dir, f"sweep_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "questions": args.questions,
+            "min_sentence_chars": args.min_sentence_chars,
+            "results": results,
+            "promoted": promoted
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\n📄 Results saved to {report_path}")
+
+if __name__ == "__main__":
+    main()